@@ -0,0 +1,284 @@
+"""
+Content Analyzer - Büyük Araç Çıktıları için Map-Reduce Analiz
+PDF / pano / OCR çıktısını token sınırlı parçalara böler, parçaları özetler
+(map), özetleri kullanıcının sorusuna göre birleştirir (reduce).
+Parça özetleri içerik hash'iyle önbelleğe alınır.
+"""
+import re
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from core.inference_scheduler import PRIORITY_ANALYSIS
+from modules.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Özet prompt'u değişirse eski önbellek kullanılmasın
+SUMMARY_VERSION = "v1"
+
+ANSWER_TEMPLATE = """Araç '{tool_name}' bu veriyi döndürdü:
+
+{content}
+
+Kullanıcı '{user_input}' demişti. Bu veriyi ona açıkla."""
+
+REDUCE_TEMPLATE = """Araç '{tool_name}' uzun bir içerik döndürdü. İçeriğin bölüm bölüm özeti:
+
+{content}
+
+Kullanıcı '{user_input}' demişti. Bu özetlere dayanarak ona cevap ver."""
+
+
+class ContentAnalyzer:
+    """
+    Uzun içerik analizi.
+    İçerik tek prompt'a sığıyorsa doğrudan, sığmıyorsa map-reduce ile
+    işlenir; hiçbir bölüm sessizce atılmaz.
+    """
+
+    def __init__(
+        self,
+        brain,
+        memory_manager=None,
+        chunk_tokens: int = 800,
+        summary_tokens: int = 160,
+        max_workers: int = 2,
+        cache_size: int = 256
+    ):
+        """
+        Args:
+            brain: QwenBrain
+            memory_manager: Özet önbelleğinin kalıcı tutulacağı veritabanı (opsiyonel)
+            chunk_tokens: Map aşamasındaki parça boyu
+            summary_tokens: Parça özeti için en fazla token
+            max_workers: Aynı anda kuyruğa verilecek map işi sayısı
+            cache_size: RAM'deki özet sayısı
+        """
+        self.brain = brain
+        self.memory = memory_manager
+        self.chunk_tokens = chunk_tokens
+        self.summary_tokens = summary_tokens
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Model tek thread'de çalışır; havuz, map işlerini zamanlayıcıda
+        # arka arkaya hazır tutar (parçalar arasında boşluk kalmaz)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyzer")
+
+        self.stats = {
+            "analyses": 0,
+            "single_pass": 0,
+            "map_reduce": 0,
+            "chunks": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "reduce_rounds": 0
+        }
+
+    # === ANA AKIŞ ===
+
+    def analyze(
+        self,
+        content: str,
+        user_input: str,
+        tool_name: str,
+        max_tokens: int = 300,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        İçeriği kullanıcının sorusuna göre açıklar.
+
+        Args:
+            max_tokens: Son cevap için token sınırı
+            on_token: Son cevap (reduce) akış halinde iletilir
+        """
+        self.stats["analyses"] += 1
+
+        reserve = self.brain.count_tokens(
+            ANSWER_TEMPLATE.format(tool_name=tool_name, content="", user_input=user_input)
+        ) + 32
+        available = self.brain.prompt_budget - max_tokens - reserve
+
+        # Sığıyorsa tek geçiş
+        if self.brain.count_tokens(content) <= available:
+            self.stats["single_pass"] += 1
+            prompt = ANSWER_TEMPLATE.format(tool_name=tool_name, content=content, user_input=user_input)
+            return self._answer(prompt, max_tokens, on_token)
+
+        # Map: parça özetleri
+        self.stats["map_reduce"] += 1
+        chunks = self._split(content)
+        summaries = self._summarize_all(chunks)
+        logger.info(f"📚 {len(chunks)} parça özetlendi")
+
+        # Özetler de sığmıyorsa bir tur daha özetlenir
+        combined = self._join(summaries)
+        rounds = 0
+        while self.brain.count_tokens(combined) > available and len(summaries) > 1 and rounds < 3:
+            rounds += 1
+            self.stats["reduce_rounds"] += 1
+            summaries = self._summarize_all(self._split(combined))
+            combined = self._join(summaries)
+
+        combined = self.brain.truncate_tokens(combined, available)
+
+        # Reduce: soruya göre son cevap
+        prompt = REDUCE_TEMPLATE.format(tool_name=tool_name, content=combined, user_input=user_input)
+        return self._answer(prompt, max_tokens, on_token)
+
+    def _answer(self, prompt: str, max_tokens: int, on_token) -> str:
+        return self.brain.simple_chat(
+            prompt,
+            max_tokens=max_tokens,
+            on_token=on_token,
+            priority=PRIORITY_ANALYSIS
+        )
+
+    @staticmethod
+    def _join(summaries: List[str]) -> str:
+        return "\n\n".join(f"[Bölüm {i + 1}]\n{s}" for i, s in enumerate(summaries))
+
+    # === PARÇALAMA ===
+
+    def _split(self, text: str) -> List[str]:
+        """
+        Paragraf sınırlarını koruyarak token sınırlı parçalar üretir.
+        Tek başına sınırı aşan paragraf token'larından bölünür.
+        """
+        paragraphs = [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for paragraph in paragraphs:
+            tokens = self.brain.count_tokens(paragraph)
+
+            if tokens > self.chunk_tokens:
+                if current:
+                    chunks.append("\n\n".join(current))
+                    current, current_tokens = [], 0
+                chunks.extend(self.brain.split_tokens(paragraph, self.chunk_tokens))
+                continue
+
+            if current and current_tokens + tokens > self.chunk_tokens:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+
+            current.append(paragraph)
+            current_tokens += tokens
+
+        if current:
+            chunks.append("\n\n".join(current))
+
+        self.stats["chunks"] += len(chunks)
+        return chunks
+
+    # === MAP + ÖNBELLEK ===
+
+    def _summarize_all(self, chunks: List[str]) -> List[str]:
+        """Parçaları sırası korunarak özetler; önbellekte olanlar modele gitmez"""
+        keys = [self._key(chunk) for chunk in chunks]
+        results: Dict[int, str] = {}
+        pending = {}
+
+        for i, (chunk, key) in enumerate(zip(chunks, keys)):
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending[i] = self._executor.submit(tracer.bind(self._summarize_chunk, chunk, key))
+
+        for i, future in pending.items():
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                logger.error(f"Parça özetlenemedi: {e}")
+                # Özet alınamazsa parçanın başı kullanılır, bölüm kaybolmaz
+                results[i] = self.brain.truncate_tokens(chunks[i], self.summary_tokens)
+
+        return [results[i] for i in range(len(chunks))]
+
+    def _summarize_chunk(self, chunk: str, key: str) -> str:
+        summary = self.brain.summarize_chunk(
+            chunk,
+            max_tokens=self.summary_tokens,
+            priority=PRIORITY_ANALYSIS
+        )
+        self._cache_put(key, summary)
+        return summary
+
+    @staticmethod
+    def _key(chunk: str) -> str:
+        return hashlib.sha1(f"{SUMMARY_VERSION}\n{chunk}".encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return self._cache[key]
+
+        summary = None
+        if self.memory is not None:
+            try:
+                row = self.memory.db.query_one(
+                    "SELECT summary FROM content_summaries WHERE hash = ?", (key,)
+                )
+                summary = row[0] if row else None
+            except sqlite3.Error as e:
+                logger.warning(f"Özet önbelleği okunamadı: {e}")
+
+        with self._lock:
+            if summary is None:
+                self.stats["cache_misses"] += 1
+                return None
+            self.stats["cache_hits"] += 1
+            self._remember(key, summary)
+        return summary
+
+    def _cache_put(self, key: str, summary: str):
+        with self._lock:
+            self._remember(key, summary)
+
+        if self.memory is None:
+            return
+
+        # Kalıcı kayıt toplu yazıcıya bırakılır
+        writer = getattr(self.memory, "writer", None)
+        if writer is not None:
+            writer.submit(self._insert_summary, key, summary)
+            return
+        try:
+            self.memory.db.write(
+                "INSERT OR REPLACE INTO content_summaries (hash, summary) VALUES (?, ?)",
+                (key, summary)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Özet önbelleğe yazılamadı: {e}")
+
+    @staticmethod
+    def _insert_summary(cursor, key: str, summary: str):
+        cursor.execute(
+            "INSERT OR REPLACE INTO content_summaries (hash, summary) VALUES (?, ?)",
+            (key, summary)
+        )
+
+    def _remember(self, key: str, summary: str):
+        """RAM LRU (kilit altında çağrılır)"""
+        self._cache[key] = summary
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats["cache_hits"] + self.stats["cache_misses"]
+        return {
+            **self.stats,
+            "cached_summaries": len(self._cache),
+            "cache_hit_rate": round(self.stats["cache_hits"] / lookups, 3) if lookups else 0.0
+        }
@@ -2,9 +2,12 @@
 Context Builder - Dinamik Bağlam Oluşturma Motoru
 LLM'e gönderilecek tam bağlamı hazırlar
 """
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 import logging
+from core.context_providers import ContextGatherer
+from memory.codec import decode_text
+from modules.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +17,27 @@ class ContextBuilder:
     Her sorgu için kullanıcı durumuna göre optimize edilmiş bağlam üretir.
     """
     
-    def __init__(self, memory_manager, profile_manager):
+    def __init__(
+        self,
+        memory_manager,
+        profile_manager,
+        memory_index=None,
+        summarizer=None,
+        screen_source: Optional[Callable[[], Dict]] = None
+    ):
         self.memory = memory_manager
         self.profile = profile_manager
+        self.memory_index = memory_index
+        self.summarizer = summarizer  # Pencereden düşen turları özetler
+        self.screen_source = screen_source  # GhostObserver.get_current_state
         self.conversation_history = []
         self.max_history = 5
+        # Geçmiş her değiştiğinde artar (istek birleştirme anahtarında kullanılır)
+        self.revision = 0
+        
+        # Kaynaklar eşzamanlı toplanır; yavaş olanlar süre sınırında atlanır
+        self.gatherer = ContextGatherer()
+        self._register_providers()
         
         logger.info("🔧 Context Builder hazır")
     
@@ -34,26 +53,66 @@ class ContextBuilder:
             {
                 "profile": {...},
                 "conversation": [...],
+                "conversation_summary": "...",
                 "screen_info": {...},
                 "relevant_memories": [...],
                 "temporal": {...}
             }
         """
-        context = {
-            "profile": self._get_profile_context(),
-            "conversation": self._get_conversation_history(),
-            "temporal": self._get_temporal_context()
-        }
+        # Ekran verisi dışarıdan geldiyse ekran kaynağı çalıştırılmaz
+        names = None
+        if screen_data:
+            names = [n for n in self.gatherer.providers if n != "screen_info"]
+        
+        with tracer.span("context.build"):
+            context = self.gatherer.gather(user_input, names)
+            
+            # Kaynak süreleri ayrı aşamalar olarak ize eklenir
+            if tracer.enabled:
+                for name, r in self.gatherer.last_report.items():
+                    if name != "_total":
+                        tracer.record(f"context.{name}", r["ms"], status=r["status"])
         
-        # Ekran verisi varsa ekle
         if screen_data:
             context["screen_info"] = self._format_screen_data(screen_data)
         
-        # Semantik arama (opsiyonel, şimdilik basit hafıza)
-        context["relevant_memories"] = self._get_relevant_memories(user_input)
+        # Ekran verisi yoksa anahtar hiç eklenmez
+        if not context.get("screen_info"):
+            context.pop("screen_info", None)
+        
+        logger.debug(
+            "Bağlam süreleri: " + ", ".join(
+                f"{name}={r['ms']}ms({r['status']})" for name, r in self.gatherer.last_report.items()
+            )
+        )
         
         return context
     
+    def _register_providers(self):
+        """Varsayılan bağlam kaynakları (süreler saniye cinsinden)"""
+        g = self.gatherer
+        
+        # RAM'den okunanlar: çağıran thread'de
+        g.register("profile", lambda q: self._get_profile_context(), inline=True, fallback={})
+        g.register("conversation", lambda q: self._get_conversation_history(), inline=True, fallback=[])
+        g.register(
+            "conversation_summary",
+            lambda q: self.summarizer.summary if self.summarizer else "",
+            inline=True, fallback=""
+        )
+        g.register("temporal", lambda q: self._get_temporal_context(), inline=True, fallback={})
+        
+        # G/Ç yapanlar: havuzda, süre sınırlı
+        g.register("relevant_memories", self._get_relevant_memories, deadline=0.25, fallback=[])
+        g.register("screen_info", lambda q: self._get_screen_context(), deadline=0.05, fallback=None)
+    
+    def _get_screen_context(self) -> Optional[Dict]:
+        """Ekran kaynağı (pencere yoklama) varsa anlık durumu alır"""
+        if not self.screen_source:
+            return None
+        screen_data = self.screen_source()
+        return self._format_screen_data(screen_data) if screen_data else None
+    
     def _get_profile_context(self) -> Dict:
         """Kullanıcı profilini çeker"""
         profile_data = self.profile.get_all()
@@ -81,19 +140,37 @@ class ContextBuilder:
     def _get_relevant_memories(self, query: str, top_k: int = 2) -> List[str]:
         """
         Sorguya alakalı anıları bulur.
-        Şimdilik basit SQL sorgusu, ileride semantik arama eklenebilir.
+        Semantik indeks varsa benzerlik eşiğini geçen ilk top_k kayıt,
+        yoksa tam metin aramasının (bm25) ilk top_k kaydı, o da yoksa
+        en yeni top_k kayıt döner.
         """
         try:
-            # Hafızadan en son 5 kaydı al
-            self.memory.cursor.execute("""
+            matches = self.memory_index.search(query, top_k) if self.memory_index else None
+            
+            if matches is not None:
+                if not matches:
+                    return []
+                keys = [key for key, _ in matches]
+                placeholders = ",".join("?" * len(keys))
+                rows = self.memory.db.query(f"""
+                    SELECT key, value FROM memory 
+                    WHERE status = 'valid' AND key IN ({placeholders})
+                """, keys)
+                values = {row[0]: decode_text(row[1]) for row in rows}
+                return [values[key] for key in keys if key in values]
+            
+            # İndeks yok: tam metin araması, o da boşsa en son kayıtlar
+            hits = self.memory.search_memory(query, top_k)
+            if hits:
+                return [hit["value"] for hit in hits]
+            
+            results = self.memory.db.query("""
                 SELECT value FROM memory 
                 WHERE status = 'valid' 
                 ORDER BY created_at DESC 
-                LIMIT 5
-            """)
-            
-            results = self.memory.cursor.fetchall()
-            return [row[0] for row in results]
+                LIMIT ?
+            """, (top_k,))
+            return [decode_text(row[0]) for row in results]
         
         except Exception as e:
             logger.warning(f"Hafıza sorgusu başarısız: {e}")
@@ -115,21 +192,35 @@ class ContextBuilder:
     
     def add_to_history(self, role: str, content: str):
         """Konuşma geçmişine ekler"""
+        self.revision += 1
         self.conversation_history.append({
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat()
         })
         
-        # Limit aşılırsa eski konuşmaları sil
-        if len(self.conversation_history) > self.max_history * 2:
-            self.conversation_history = self.conversation_history[-self.max_history * 2:]
+        # Limit aşılırsa eski konuşmalar özete katılır (özetleyici yoksa silinir)
+        if len(self.conversation_history) > self.max_history:
+            evicted = self.conversation_history[:-self.max_history]
+            self.conversation_history = self.conversation_history[-self.max_history:]
+            if self.summarizer:
+                self.summarizer.add_evicted(evicted)
     
     def clear_history(self):
         """Konuşma geçmişini temizler"""
         self.conversation_history = []
+        self.revision += 1
+        if self.summarizer:
+            self.summarizer.reset()
         logger.info("Konuşma geçmişi temizlendi")
     
+    def get_stats(self) -> Dict:
+        """Bağlam kaynağı gecikmeleri (son istek + toplam)"""
+        return {
+            "last": self.gatherer.last_report,
+            "providers": self.gatherer.get_stats()
+        }
+    
     def get_context_summary(self, context: Dict) -> str:
         """Debug için bağlam özeti"""
         profile = context.get("profile", {})
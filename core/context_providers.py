@@ -0,0 +1,185 @@
+"""
+Context Providers - Eşzamanlı Bağlam Toplama
+Her bağlam kaynağı (profil, hafıza, ekran...) ayrı bir sağlayıcıdır;
+yavaş kaynaklar süre sınırını aşınca yedek değerle atlanır
+"""
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ContextProvider:
+    """Tek bir bağlam kaynağı"""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[str], Any],
+        deadline: Optional[float] = None,
+        fallback: Any = None,
+        inline: bool = False
+    ):
+        """
+        Args:
+            name: Bağlam anahtarı (context[name])
+            fn: fn(user_input) -> değer
+            deadline: Saniye cinsinden süre sınırı (None = bekle)
+            fallback: Süre aşımı / hata durumunda kullanılacak değer
+            inline: Ucuz kaynaklar (RAM'den okuma) thread havuzuna gönderilmez
+        """
+        self.name = name
+        self.fn = fn
+        self.deadline = deadline
+        self.fallback = fallback
+        self.inline = inline
+        self.enabled = True
+
+    def default(self) -> Any:
+        """Yedek değerin kopyası (paylaşılan liste/dict değişmesin)"""
+        if isinstance(self.fallback, (list, dict)):
+            return type(self.fallback)(self.fallback)
+        return self.fallback
+
+
+class ContextGatherer:
+    """
+    Sağlayıcıları eşzamanlı çalıştırır.
+    Toplam bekleme, en uzun süre sınırı kadardır; sınırı aşan kaynağın
+    sonucu beklenmez (thread arka planda bitirir, gecikmesi yine kaydedilir).
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.providers: Dict[str, ContextProvider] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="context")
+        self._lock = threading.Lock()
+        self.last_report: Dict[str, Dict] = {}
+        self.stats: Dict[str, Dict] = {}
+
+    def register(
+        self,
+        name: str,
+        fn: Callable[[str], Any],
+        deadline: Optional[float] = None,
+        fallback: Any = None,
+        inline: bool = False
+    ) -> ContextProvider:
+        """Sağlayıcı ekler (aynı isim varsa değiştirir)"""
+        provider = ContextProvider(name, fn, deadline, fallback, inline)
+        self.providers[name] = provider
+        with self._lock:
+            self.stats.setdefault(name, {
+                "calls": 0,
+                "timeouts": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0
+            })
+        return provider
+
+    def set_enabled(self, name: str, enabled: bool):
+        if name in self.providers:
+            self.providers[name].enabled = enabled
+
+    def gather(self, user_input: str, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Sağlayıcıları çalıştırır.
+
+        Returns:
+            {sağlayıcı_adı: değer} - zamanında bitmeyenler için yedek değer
+        """
+        started = time.time()
+        selected = [
+            p for p in self.providers.values()
+            if p.enabled and (names is None or p.name in names)
+        ]
+
+        # Havuz işleri önce gönderilir, ucuz kaynaklar beklerken çalışır
+        futures = []
+        for provider in selected:
+            if not provider.inline:
+                futures.append((provider, self._executor.submit(self._timed, provider, user_input)))
+
+        results: Dict[str, Any] = {}
+        report: Dict[str, Dict] = {}
+
+        for provider in selected:
+            if provider.inline:
+                results[provider.name], report[provider.name] = self._run_inline(provider, user_input)
+
+        for provider, future in futures:
+            timeout = None
+            if provider.deadline is not None:
+                timeout = max(0.0, provider.deadline - (time.time() - started))
+
+            try:
+                value, elapsed = future.result(timeout=timeout)
+                results[provider.name] = value
+                report[provider.name] = {"ms": round(elapsed, 1), "status": "ok"}
+
+            except FutureTimeout:
+                results[provider.name] = provider.default()
+                report[provider.name] = {
+                    "ms": round((time.time() - started) * 1000, 1),
+                    "status": "timeout"
+                }
+                self._record(provider.name, "timeouts")
+                logger.warning(f"⏱️ Bağlam kaynağı süreyi aştı: {provider.name}")
+
+            except Exception as e:
+                results[provider.name] = provider.default()
+                report[provider.name] = {"ms": 0.0, "status": "error"}
+                logger.warning(f"Bağlam kaynağı hatası ({provider.name}): {e}")
+
+        report["_total"] = {"ms": round((time.time() - started) * 1000, 1), "status": "ok"}
+        self.last_report = report
+        return results
+
+    def _run_inline(self, provider: ContextProvider, user_input: str) -> Tuple[Any, Dict]:
+        try:
+            value, elapsed = self._timed(provider, user_input)
+            return value, {"ms": round(elapsed, 1), "status": "ok"}
+        except Exception as e:
+            logger.warning(f"Bağlam kaynağı hatası ({provider.name}): {e}")
+            return provider.default(), {"ms": 0.0, "status": "error"}
+
+    def _timed(self, provider: ContextProvider, user_input: str) -> Tuple[Any, float]:
+        """Sağlayıcıyı çalıştırır, gerçek süresini istatistiğe yazar"""
+        started = time.time()
+        try:
+            return provider.fn(user_input), (time.time() - started) * 1000
+        except Exception:
+            self._record(provider.name, "errors")
+            raise
+        finally:
+            elapsed = (time.time() - started) * 1000
+            with self._lock:
+                stats = self.stats[provider.name]
+                stats["calls"] += 1
+                stats["total_ms"] += elapsed
+                stats["max_ms"] = max(stats["max_ms"], elapsed)
+
+    def _record(self, name: str, counter: str):
+        with self._lock:
+            self.stats[name][counter] += 1
+
+    def get_stats(self) -> Dict:
+        """Sağlayıcı bazında ortalama / en yüksek gecikme"""
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "avg_ms": round(stats["total_ms"] / stats["calls"], 2) if stats["calls"] else 0.0,
+                    "deadline_ms": (
+                        self.providers[name].deadline * 1000
+                        if self.providers[name].deadline is not None else None
+                    )
+                }
+                for name, stats in self.stats.items()
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
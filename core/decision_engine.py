@@ -2,13 +2,26 @@
 Decision Engine - ADAM'ın Merkezi Karar Motoru
 Kullanıcı → Bağlam → LLM → Tool → Cevap akışını yönetir
 """
+import json
+import asyncio
 import logging
-from typing import Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from core.qwen_brain import QwenBrain
 from core.context_builder import ContextBuilder
+from core.json_stream import ResponseFieldStreamer
+from core.intent_router import IntentRouter
+from core.summarizer import ConversationSummarizer
+from core.content_analyzer import ContentAnalyzer
 from tools.registry import registry
+from tools.selector import ToolSelector
+from memory.embeddings import TextEmbedder
+from memory.embedding_index import MemoryIndex
 from memory.manager import MemoryManager
 from memory.profile_manager import ProfileManager
+from modules.tracing import tracer
+from modules.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -23,99 +36,416 @@ class DecisionEngine:
         self,
         memory_manager: MemoryManager,
         profile_manager: ProfileManager,
-        model_path: str = "models/qwen_agent.gguf"
+        model_path: str = "models/qwen_agent.gguf",
+        use_grammar: bool = False,
+        embedder: Optional[TextEmbedder] = None
     ):
         self.memory = memory_manager
         self.profile = profile_manager
         
+        # Araç seçimi ve hafıza araması aynı embedding modelini paylaşır
+        self.embedder = embedder or TextEmbedder()
+        self.memory_index = MemoryIndex(memory_manager, self.embedder)
+        memory_manager.attach_index(self.memory_index)
+        # Model yükleme + backfill ilk sorguda değil, açılışta arka planda
+        self.memory_index.warm_up()
+        
         # Alt modülleri başlat
-        self.context_builder = ContextBuilder(memory_manager, profile_manager)
-        self.qwen = QwenBrain(model_path=model_path)
+        self.context_builder = ContextBuilder(memory_manager, profile_manager, self.memory_index)
+        self.qwen = QwenBrain(model_path=model_path, use_grammar=use_grammar)
+        
+        # Pencereden düşen konuşma turları arka planda özetlenir
+        self.summarizer = ConversationSummarizer(self.qwen, memory_manager)
+        self.context_builder.summarizer = self.summarizer
+        
+        # İçerik analizi cevabı için token sınırı
+        self.analysis_max_tokens = 300
+        self.content_analyzer = ContentAnalyzer(self.qwen, memory_manager)
+        
+        # Kesin komutlar için LLM'siz hızlı yol
+        self.router = IntentRouter(
+            temporal_provider=self.context_builder._get_temporal_context
+        )
+        self.fast_path_enabled = True
+        
+        # Araçlar LLM üretimiyle paralel çalışabilsin diye ayrı havuz
+        self.tool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool")
+        self.early_dispatch_enabled = True
+        
+        # Engelleyen aşamalar (bağlam, model bekleme, veritabanı) için havuz
+        self.io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="engine-io")
+        # Kayıtlar yazıcı kuyruğuna buradan girer; kuyruk doluysa döngü beklemez
+        self.db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="engine-db")
+        
+        # Asenkron işlem hattının olay döngüsü (kendi thread'inde)
+        self._loop = asyncio.new_event_loop()
+        self._background_tasks = set()
+        self._loop_thread = threading.Thread(
+            target=self._run_loop,
+            name="engine-loop",
+            daemon=True
+        )
+        self._loop_thread.start()
+        
+        # Prompt'a sadece isteğe uygun araç şemaları girer
+        self.tool_selector = ToolSelector(registry, embedder=self.embedder)
+        self.tool_selection_enabled = True
+        
+        # Aynı anda gelen özdeş istekler (çift Enter, tekrar gönderilen ses
+        # kaydı...) tek üretimde birleştirilir
+        self.inflight = SingleFlight("requests")
+        self.coalescing_enabled = True
         
         logger.info("🚀 Decision Engine başlatıldı")
     
     def process_input(
         self,
         user_input: str,
-        screen_data: Optional[Dict] = None
+        screen_data: Optional[Dict] = None,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> str:
         """
-        Ana işlem fonksiyonu.
+        Ana işlem fonksiyonu (senkron sarmalayıcı).
+        İşi motorun olay döngüsündeki aprocess_input'a devreder ve cevabı bekler.
+        
+        Args:
+            on_token: Verilirse kullanıcıya gösterilecek metin üretildikçe
+                parça parça bu fonksiyona iletilir. Dönüş değeri yine
+                nihai cevaptır; arayüz akışı bununla değiştirmelidir.
         
         Returns:
             Kullanıcıya gösterilecek cevap
         """
+        future = asyncio.run_coroutine_threadsafe(
+            self.aprocess_input(user_input, screen_data, on_token),
+            self._loop
+        )
+        return future.result()
+    
+    async def aprocess_input(
+        self,
+        user_input: str,
+        screen_data: Optional[Dict] = None,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Asenkron işlem hattı.
+        Bağımsız aşamalar (bağlam, araç seçimi) paralel çalışır; engelleyen
+        işler (LLM, araçlar, veritabanı) thread havuzlarında yürür. Birden
+        fazla istek aynı anda işlenebilir, model erişimini zamanlayıcı sıralar.
+        Hafıza kaydı ve geçmiş güncellemesi cevap döndükten sonra yapılır.
+        Aynı bağlamda özdeş bir istek zaten işleniyorsa yeni üretim
+        başlatılmaz, onun cevabı beklenir.
+        """
         
-        logger.info(f"📥 Input: {user_input[:50]}...")
+        if not self.coalescing_enabled:
+            return await self._run_pipeline(user_input, screen_data, on_token)
         
-        # 1. Bağlam oluştur
-        context = self.context_builder.build_context(user_input, screen_data)
+        key = self._request_key(user_input, screen_data)
+        response, shared = await self.inflight.ado(
+            key, lambda: self._run_pipeline(user_input, screen_data, on_token)
+        )
         
-        # 2. Mevcut araçları al
-        available_tools = registry.get_tools_schema()
+        if shared:
+            # Takipçi akışı görmedi: cevabın tamamı tek parça iletilir
+            logger.info(f"🔗 Özdeş istek birleştirildi: {user_input[:50]}")
+            if on_token:
+                on_token(response)
         
-        # 3. LLM'e sor
-        decision = self.qwen.generate_with_context(
-            user_input=user_input,
-            context=context,
-            available_tools=available_tools
-        )
+        return response
+    
+    def _request_key(self, user_input: str, screen_data: Optional[Dict]) -> Tuple:
+        """
+        Birleştirme anahtarı: normalize girdi + bağlam parmak izi.
+        Geçmiş veya profil değiştiyse aynı cümle farklı istek sayılır.
+        """
+        normalized = " ".join(user_input.replace("İ", "i").replace("I", "ı").lower().split())
+        screen = json.dumps(screen_data, sort_keys=True, default=str) if screen_data else ""
+        return (normalized, screen, self.context_builder.revision, self.profile.version)
+    
+    async def _run_pipeline(
+        self,
+        user_input: str,
+        screen_data: Optional[Dict],
+        on_token: Optional[Callable[[str], None]]
+    ) -> str:
+        """Tek isteğin işlem hattı (yönlendirme → karar → araçlar → kayıt)"""
         
-        logger.info(f"Karar: {decision.get('intent')} | Tool: {decision.get('tool_call')}")
+        logger.info(f"📥 Input: {user_input[:50]}...")
         
-        # 4. Kararı uygula
-        final_response = self._execute_decision(decision, user_input, context)
+        with tracer.trace("request", chars=len(user_input)) as trace:
+            # 0. Hızlı yol: kesin komutlar modele gitmeden çalışır
+            with tracer.span("route"):
+                decision = self.router.route(user_input) if self.fast_path_enabled else None
+            
+            early_tools = None
+            if decision is not None:
+                context = {}
+                trace.set(path="fast")
+                if on_token and decision.get("response"):
+                    on_token(decision["response"])
+            else:
+                trace.set(path="llm")
+                context, decision, early_tools = await self._decide_with_llm(user_input, screen_data, on_token)
+            
+            tool_names = [c["name"] for c in self._normalize_tool_calls(decision)]
+            logger.info(f"Karar: {decision.get('intent')} | Tools: {tool_names or None}")
+            trace.set(intent=decision.get("intent"), tools=tool_names)
+            
+            # 4. Kararı uygula
+            final_response = await self._execute_decision(decision, user_input, context, on_token, early_tools)
+            
+            # 5-6. Hafıza ve geçmiş cevabı bekletmez
+            self._spawn(self._finalize(user_input, final_response, decision))
         
-        # 5. Hafızaya kaydet
-        self._save_to_memory(user_input, final_response, decision)
+        return final_response
+    
+    async def _finalize(self, user_input: str, final_response: str, decision: Dict):
+        """Cevap döndükten sonraki işler"""
         
-        # 6. Konuşma geçmişine ekle
+        # Konuşma geçmişine ekle (RAM, bir sonraki istekten önce işlenir)
         self.context_builder.add_to_history("user", user_input)
         self.context_builder.add_to_history("assistant", final_response)
         
-        return final_response
+        # Hafızaya kaydet (sadece kuyruğa alınır, commit arka planda)
+        with tracer.span("memory.save"):
+            await self._loop.run_in_executor(
+                self.db_executor, self._save_to_memory, user_input, final_response, decision
+            )
+        
+        # Kesilmiş bir özetleme varsa model boşta iken tekrar dene
+        self.summarizer.schedule()
+    
+    def _spawn(self, coro) -> "asyncio.Task":
+        """Arka plan görevi başlatır, bitene kadar referansını tutar"""
+        task = self._loop.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+        return task
+    
+    def _on_background_done(self, task: "asyncio.Task"):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Arka plan görevi hatası: {task.exception()}")
+    
+    def drain(self, timeout: Optional[float] = None):
+        """Bekleyen arka plan görevlerinin (hafıza kaydı vb.) bitmesini bekler"""
+        async def wait_all():
+            while self._background_tasks:
+                await asyncio.gather(*list(self._background_tasks), return_exceptions=True)
+        
+        asyncio.run_coroutine_threadsafe(wait_all(), self._loop).result(timeout)
     
-    def _execute_decision(
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+    
+    async def _decide_with_llm(
+        self,
+        user_input: str,
+        screen_data: Optional[Dict],
+        on_token: Optional[Callable[[str], None]]
+    ):
+        """
+        Bağlamı oluşturup kararı LLM'e verdirir.
+        
+        Returns:
+            (context, decision, early_tools) - early_tools, üretim sürerken
+            başlatılan araçların {sıra: {"call", "future"}} bilgisidir (yoksa None)
+        """
+        
+        loop = self._loop
+        
+        # 1-2. Bağlam ve araç seçimi birbirinden bağımsız: paralel
+        # (tracer.bind: havuz thread'lerindeki span'ler bu isteğe bağlanır)
+        context, tool_names = await asyncio.gather(
+            loop.run_in_executor(
+                self.io_executor,
+                tracer.bind(self.context_builder.build_context, user_input, screen_data)
+            ),
+            loop.run_in_executor(self.io_executor, tracer.bind(self._select_tools, user_input))
+        )
+        available_tools = registry.get_tools_schema(tool_names)
+        tools_json = registry.get_tools_schema_json(tool_names)
+        
+        # 3. LLM'e sor (akış varsa sadece "response" alanı iletilir)
+        decision_stream = None
+        if on_token:
+            streamer = ResponseFieldStreamer()
+            
+            def decision_stream(chunk: str):
+                visible = streamer.feed(chunk)
+                if visible:
+                    on_token(visible)
+        
+        # "tool_calls" alanı kapanır kapanmaz bağımlılığı olmayan yan etkisiz
+        # araçlar başlatılır; model "response" alanını yazarken G/Ç paralel ilerler
+        early_tools = {}
+        
+        def on_field(key: str, value: Any):
+            if key not in ("tool_calls", "tool_call") or not self.early_dispatch_enabled:
+                return
+            for i, call in enumerate(self._normalize_tool_calls({key: value})):
+                if call["depends_on"] or not registry.is_read_only(call["name"]):
+                    continue
+                logger.info(f"⏩ Erken araç başlatma: {call['name']}")
+                early_tools[i] = {
+                    "call": call,
+                    "future": self.tool_executor.submit(
+                        tracer.bind(registry.execute_tool, call["name"], call["arguments"])
+                    )
+                }
+        
+        # Model çağrısı zamanlayıcıda sıra bekler; döngü bu sırada serbest
+        decision = await loop.run_in_executor(
+            self.io_executor,
+            tracer.bind(
+                self.qwen.generate_with_context,
+                user_input=user_input,
+                context=context,
+                available_tools=available_tools,
+                on_token=decision_stream,
+                on_field=on_field,
+                tools_json=tools_json
+            )
+        )
+        
+        return context, decision, early_tools or None
+    
+    def _select_tools(self, user_input: str) -> Optional[List[str]]:
+        """Prompt'a girecek araçlar (seçim kapalıysa None = hepsi)"""
+        if not self.tool_selection_enabled:
+            return None
+        with tracer.span("tools.select") as span:
+            names = self.tool_selector.select(user_input)
+            span.set(selected=len(names))
+            return names
+    
+    @staticmethod
+    def _normalize_tool_calls(decision: Dict) -> List[Dict]:
+        """
+        Karardaki araç çağrılarını listeye çevirir.
+        Eski tekli "tool_call" formatı da kabul edilir. Sadece önceki
+        çağrılara bağımlılık geçerlidir (döngü oluşamaz).
+        """
+        calls = decision.get("tool_calls")
+        if calls is None:
+            single = decision.get("tool_call")
+            calls = [single] if single else []
+        if isinstance(calls, dict):
+            calls = [calls]
+        if not isinstance(calls, list):
+            return []
+        
+        normalized = []
+        for i, call in enumerate(calls):
+            if not isinstance(call, dict) or not call.get("name"):
+                continue
+            depends_on = call.get("depends_on") or []
+            normalized.append({
+                "name": call["name"],
+                "arguments": call.get("arguments") or {},
+                "depends_on": sorted({
+                    d for d in depends_on
+                    if isinstance(d, int) and 0 <= d < i
+                })
+            })
+        return normalized
+    
+    async def _run_tool_calls(
+        self,
+        calls: List[Dict],
+        early_tools: Optional[Dict] = None
+    ) -> List[str]:
+        """
+        Araç çağrılarını bağımlılık sırasına göre çalıştırır.
+        Birbirini beklemeyen çağrılar tool havuzunda eşzamanlı yürür.
+        """
+        early_tools = early_tools or {}
+        tasks: List["asyncio.Task"] = []
+        failed = set()
+        
+        async def run(i: int, call: Dict) -> str:
+            # Bağımlılıklar bitmeden başlama
+            for dep in call["depends_on"]:
+                await tasks[dep]
+                if dep in failed:
+                    failed.add(i)
+                    return f"⏭️ {call['name']} atlandı ({calls[dep]['name']} başarısız oldu)."
+            
+            early = early_tools.get(i)
+            if early and early["call"]["name"] == call["name"] \
+                    and early["call"]["arguments"] == call["arguments"]:
+                result = await asyncio.wrap_future(early["future"])
+            else:
+                result = await self._loop.run_in_executor(
+                    self.tool_executor,
+                    tracer.bind(registry.execute_tool, call["name"], call["arguments"])
+                )
+            
+            result = str(result)
+            if result.startswith("❌"):
+                failed.add(i)
+            return result
+        
+        for i, call in enumerate(calls):
+            tasks.append(asyncio.ensure_future(run(i, call)))
+        
+        return list(await asyncio.gather(*tasks))
+    
+    async def _execute_decision(
         self,
         decision: Dict,
         user_input: str,
-        context: Dict
+        context: Dict,
+        on_token: Optional[Callable[[str], None]] = None,
+        early_tools: Optional[Dict] = None
     ) -> str:
         """LLM kararını uygular"""
         
-        tool_call = decision.get("tool_call")
+        calls = self._normalize_tool_calls(decision)
         base_response = decision.get("response", "")
         
         # Tool yok, direkt cevap
-        if tool_call is None:
-            return base_response
-        
-        # Tool var, çalıştır
-        tool_name = tool_call.get("name")
-        tool_args = tool_call.get("arguments", {})
-        
-        if not tool_name:
+        if not calls:
             return base_response
         
-        # Tool'u çalıştır
-        tool_result = registry.execute_tool(tool_name, tool_args)
+        # Tool'ları çalıştır (üretim sırasında başlatılanların sonucu beklenir)
+        with tracer.span("tools.run", calls=len(calls)):
+            results = await self._run_tool_calls(calls, early_tools)
         
-        # İçerik araçları için LLM analizi
+        # İçerik araçları için LLM analizi (tek çağrılı kararlarda)
         content_tools = ["read_clipboard", "read_pdf", "ocr_read"]
+        tool_name = calls[0]["name"]
+        tool_result = results[0]
         
-        if tool_name in content_tools and len(tool_result) > 100:
+        if len(calls) == 1 and tool_name in content_tools and len(tool_result) > 100:
             logger.info("📄 İçerik LLM'e analiz ettiriliyor...")
             
-            analysis_prompt = f"""Araç '{tool_name}' bu veriyi döndürdü:
-
-{tool_result[:1000]}
-
-Kullanıcı '{user_input}' demişti. Bu veriyi ona açıkla."""
+            if on_token:
+                on_token("\n\n")
             
-            analyzed = self.qwen.simple_chat(analysis_prompt, max_tokens=300)
+            # Bütçeyi aşan içerik parçalanıp özetlenir (map-reduce), hiçbir bölüm atılmaz
+            with tracer.span("analysis", chars=len(tool_result)):
+                analyzed = await self._loop.run_in_executor(
+                    self.io_executor,
+                    tracer.bind(
+                        self.content_analyzer.analyze,
+                        tool_result,
+                        user_input,
+                        tool_name,
+                        max_tokens=self.analysis_max_tokens,
+                        on_token=on_token
+                    )
+                )
             return analyzed
         
-        # Normal tool sonucu
+        # Normal tool sonuçları tek cevapta birleştirilir
+        tool_result = "\n\n".join(results)
+        
+        if on_token:
+            on_token(f"\n\n{tool_result}" if base_response else tool_result)
+        
         if base_response:
             return f"{base_response}\n\n{tool_result}"
         else:
@@ -130,13 +460,13 @@ Kullanıcı '{user_input}' demişti. Bu veriyi ona açıkla."""
         """Etkileşimi hafızaya kaydeder"""
         
         try:
-            # İnteraksiyonu kaydet
-            self.memory.save_interaction(user_input, response)
+            # İnteraksiyonu kaydet (arka plan yazıcısında toplu commit)
+            self.memory.save_interaction(user_input, response, defer=True)
             
             # Soru-cevap türündeyse LTM'e kaydet
             intent = decision.get("intent")
             if intent == "query" and len(response) > 50:
-                self.memory.promote_to_memory(user_input, response)
+                self.memory.promote_to_memory(user_input, response, defer=True)
         
         except Exception as e:
             logger.error(f"Hafıza kayıt hatası: {e}")
@@ -144,6 +474,10 @@ Kullanıcı '{user_input}' demişti. Bu veriyi ona açıkla."""
     def handle_feedback(self, feedback_type: str) -> str:
         """Geri bildirim komutları (!onay, !yanlış)"""
         
+        # Son cevabın kaydı arka planda sürüyor olabilir
+        self.drain()
+        self.memory.flush()
+        
         last_interaction = self.memory.get_last_interaction()
         
         if not last_interaction:
@@ -0,0 +1,89 @@
+"""
+Decision Grammar - Karar JSON'u için Kısıtlı Üretim
+Araç şemalarından JSON-schema/GBNF grameri kurar; model sadece geçerli karar üretebilir
+"""
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional
+from llama_cpp import LlamaGrammar
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ["command", "query", "chat"]
+
+
+def build_decision_schema(tools: List[Dict]) -> Dict:
+    """
+    {"intent", "tool_calls", "response"} nesnesi için JSON Schema üretir.
+    tool_calls, bilinen araçların adı + tipli argümanlarından oluşan (boş
+    olabilen) bir listedir; depends_on, beklenecek önceki çağrıların sırasıdır.
+    """
+    tool_variants = []
+
+    for tool in tools:
+        params = tool.get("parameters") or {}
+
+        tool_variants.append({
+            "type": "object",
+            "properties": {
+                "name": {"const": tool["name"]},
+                "arguments": {
+                    "type": "object",
+                    "properties": params.get("properties", {}),
+                    "required": params.get("required", []),
+                    "additionalProperties": False
+                },
+                "depends_on": {"type": "array", "items": {"type": "integer"}}
+            },
+            "required": ["name", "arguments"],
+            "additionalProperties": False
+        })
+
+    return {
+        "type": "object",
+        "properties": {
+            "intent": {"enum": INTENTS},
+            "tool_calls": (
+                {"type": "array", "items": {"anyOf": tool_variants}}
+                if tool_variants else {"type": "array", "maxItems": 0}
+            ),
+            "response": {"type": "string"}
+        },
+        "required": ["intent", "tool_calls", "response"],
+        "additionalProperties": False
+    }
+
+
+class DecisionGrammarCache:
+    """
+    Araç listesine göre derlenmiş grameri saklar.
+    Gramer derlemesi pahalı olduğu için araç seti değişmedikçe yeniden kullanılır.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._grammars: Dict[str, LlamaGrammar] = {}
+
+    def get(self, tools: List[Dict]) -> Optional[LlamaGrammar]:
+        """Araç listesine uygun grameri döndürür (hata olursa None)"""
+        # Alan sırası gramerde korunur, bu yüzden anahtarlar sıralanmaz
+        schema_json = json.dumps(build_decision_schema(tools), ensure_ascii=False)
+        key = hashlib.sha1(schema_json.encode("utf-8")).hexdigest()
+
+        grammar = self._grammars.get(key)
+        if grammar is not None:
+            return grammar
+
+        try:
+            grammar = LlamaGrammar.from_json_schema(schema_json, verbose=False)
+        except Exception as e:
+            logger.error(f"Karar grameri oluşturulamadı: {e}")
+            return None
+
+        if len(self._grammars) >= self.max_entries:
+            self._grammars.pop(next(iter(self._grammars)))
+
+        self._grammars[key] = grammar
+        logger.info(f"📐 Karar grameri derlendi ({len(tools)} araç)")
+        return grammar
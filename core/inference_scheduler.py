@@ -0,0 +1,236 @@
+"""
+Inference Scheduler - Ortak Llama Örneği için Öncelikli İş Kuyruğu
+llama.cpp modeli eşzamanlı çağrılara dayanıklı değildir; tüm çağrılar tek bir
+worker thread üzerinden sırayla yapılır.
+"""
+import time
+import queue
+import itertools
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Küçük sayı = yüksek öncelik
+PRIORITY_INTERACTIVE = 0   # Kullanıcının beklediği cevap
+PRIORITY_ANALYSIS = 1      # Aynı isteğin ikinci geçişi (içerik analizi)
+PRIORITY_BACKGROUND = 2    # Proaktif gözlemci, özetleme vb.
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_ANALYSIS: "analysis",
+    PRIORITY_BACKGROUND: "background"
+}
+
+
+class InferenceCancelled(Exception):
+    """İş, daha öncelikli bir istek yüzünden iptal edildi"""
+
+
+class InferenceJob:
+    """Kuyruktaki tek bir model çağrısı"""
+
+    def __init__(self, fn: Callable[["InferenceJob"], Any], priority: int, name: str = ""):
+        self.fn = fn
+        self.priority = priority
+        self.name = name or PRIORITY_NAMES.get(priority, str(priority))
+        self.future: Future = Future()
+        self.submitted_at = time.time()
+        self._cancel_event = threading.Event()
+
+    @property
+    def preemptible(self) -> bool:
+        """Sadece arka plan işleri kesilebilir"""
+        return self.priority >= PRIORITY_BACKGROUND
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """
+        İşi iptal eder. Kuyruktaysa hiç çalışmaz; çalışıyorsa üretim döngüsü
+        bir sonraki token'da durur.
+        """
+        self._cancel_event.set()
+        self.future.cancel()
+
+    def check_cancelled(self):
+        """Üretim döngüsünden çağrılır"""
+        if self.cancelled:
+            raise InferenceCancelled(self.name)
+
+
+class InferenceScheduler:
+    """
+    Modele erişimi tek thread'de sıralayan öncelikli zamanlayıcı.
+    Etkileşimli bir iş geldiğinde çalışan arka plan işi kesilir.
+    """
+
+    def __init__(self, preempt_background: bool = True):
+        self.preempt_background = preempt_background
+
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._current: Optional[InferenceJob] = None
+        self._pending = {p: 0 for p in PRIORITY_NAMES}
+        self._running = True
+
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "preemptions": 0,
+            "max_queue_depth": 0,
+            "wait_ms": {name: 0.0 for name in PRIORITY_NAMES.values()},
+            "run_ms": {name: 0.0 for name in PRIORITY_NAMES.values()},
+            "jobs": {name: 0 for name in PRIORITY_NAMES.values()}
+        }
+
+        self._worker = threading.Thread(
+            target=self._worker_loop,
+            name="inference-scheduler",
+            daemon=True
+        )
+        self._worker.start()
+
+        logger.info("🗂️ Inference Scheduler hazır")
+
+    def submit(
+        self,
+        fn: Callable[[InferenceJob], Any],
+        priority: int = PRIORITY_INTERACTIVE,
+        name: str = ""
+    ) -> InferenceJob:
+        """İşi kuyruğa ekler, sonucu job.future üzerinden alınır"""
+        job = InferenceJob(fn, priority, name)
+
+        with self._lock:
+            self._pending[priority] = self._pending.get(priority, 0) + 1
+            self.stats["submitted"] += 1
+            depth = sum(self._pending.values())
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], depth)
+
+            # Çalışan arka plan işi yeni gelen öncelikli işi bekletmesin
+            current = self._current
+            if (
+                self.preempt_background
+                and current is not None
+                and current.preemptible
+                and priority < current.priority
+            ):
+                current.cancel()
+                self.stats["preemptions"] += 1
+                logger.info(f"⏸️ Arka plan işi kesildi: {current.name}")
+
+        self._queue.put((priority, next(self._seq), job))
+        return job
+
+    def run(
+        self,
+        fn: Callable[[InferenceJob], Any],
+        priority: int = PRIORITY_INTERACTIVE,
+        name: str = "",
+        timeout: Optional[float] = None
+    ) -> Any:
+        """İşi kuyruğa ekler ve sonucunu bekler"""
+
+        # Worker içinden iç içe çağrı: sıraya girmeden aynı iş içinde çalıştır
+        if threading.current_thread() is self._worker:
+            return fn(self._current)
+
+        job = self.submit(fn, priority, name)
+        return job.future.result(timeout)
+
+    def current_job(self) -> Optional[InferenceJob]:
+        """Şu an modelde çalışan iş"""
+        return self._current
+
+    def cancel_background(self) -> int:
+        """Kuyruktaki ve çalışan tüm arka plan işlerini iptal eder"""
+        count = 0
+        with self._queue.mutex:
+            queued = list(self._queue.queue)
+
+        with self._lock:
+            for _, _, job in queued:
+                if job is None:
+                    continue
+                if job.preemptible and not job.cancelled:
+                    job.cancel()
+                    count += 1
+            if self._current is not None and self._current.preemptible:
+                self._current.cancel()
+                count += 1
+        return count
+
+    def _worker_loop(self):
+        """Kuyruktan işleri öncelik sırasıyla çalıştırır"""
+        while self._running:
+            try:
+                priority, _, job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if job is None:
+                break
+
+            with self._lock:
+                self._pending[priority] -= 1
+
+            if job.cancelled or not job.future.set_running_or_notify_cancel():
+                self.stats["cancelled"] += 1
+                continue
+
+            label = PRIORITY_NAMES.get(priority, str(priority))
+            started = time.time()
+            self.stats["wait_ms"][label] += (started - job.submitted_at) * 1000
+            self.stats["jobs"][label] += 1
+
+            with self._lock:
+                self._current = job
+
+            try:
+                result = job.fn(job)
+                job.future.set_result(result)
+                self.stats["completed"] += 1
+            except InferenceCancelled as e:
+                job.future.set_exception(e)
+                self.stats["cancelled"] += 1
+            except Exception as e:
+                job.future.set_exception(e)
+                self.stats["failed"] += 1
+            finally:
+                with self._lock:
+                    self._current = None
+                self.stats["run_ms"][label] += (time.time() - started) * 1000
+
+    def get_stats(self) -> Dict:
+        """Kuyruk derinliği ve bekleme metrikleri"""
+        with self._lock:
+            pending = {PRIORITY_NAMES.get(p, str(p)): n for p, n in self._pending.items()}
+            current = self._current.name if self._current else None
+
+        avg_wait = {
+            label: round(self.stats["wait_ms"][label] / n, 1) if n else 0.0
+            for label, n in self.stats["jobs"].items()
+        }
+
+        return {
+            **self.stats,
+            "queue_depth": sum(pending.values()),
+            "pending": pending,
+            "running": current,
+            "avg_wait_ms": avg_wait
+        }
+
+    def shutdown(self, timeout: float = 2.0):
+        """Worker'ı durdurur, bekleyen işler iptal edilir"""
+        self._running = False
+        self.cancel_background()
+        self._queue.put((-1, next(self._seq), None))
+        self._worker.join(timeout=timeout)
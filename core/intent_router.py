@@ -0,0 +1,245 @@
+"""
+Intent Router - LLM Öncesi Hızlı Yol
+Kesin (deterministik) komutları modeli çağırmadan doğrudan araçlara yönlendirir
+"""
+import re
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+APPS_CONFIG_PATH = "data/apps_config.json"
+
+# Birleşik istekler ("not al ve listele") LLM'e bırakılır
+_COMPOUND = re.compile(r"\b(?:ve|sonra|ardından|ayrıca)\b|,")
+
+# Zaman / tarih soruları sadece cümlenin tamamıysa: "osmanlı tarihi ne zaman
+# başladı" veya "saat ne zaman değişiyor" LLM'e gider
+_TEMPORAL_TIME = re.compile(r"^(?:şu\s+an\s+)?saat\s+(?:kaç|ne)$")
+_TEMPORAL_DATE = re.compile(
+    r"^(?:(?:bugün(?:ün)?\s+)?tarih(?:i)?\s+(?:ne|nedir)|"
+    r"bugün\s+(?:günlerden\s+ne|ne\s+günü|hangi\s+gün|ayın\s+kaçı)|hangi\s+gündeyiz)$"
+)
+
+_LIST_TODOS = re.compile(
+    r"^(?:(?:görev(?:ler(?:im)?i?)?|yapılacak(?:lar(?:ı|ım(?:ı)?)?)?)(?:\s+listemi|\s+listesini)?\s+"
+    r"(?:listele|göster|neler)|yapılacaklar\s+listesi(?:ni)?(?:\s+göster)?)$"
+)
+_ADD_TODO = [
+    re.compile(r"^(?:görev|yapılacak)(?:\s+ekle)?\s*[:\-]\s*(?P<p>.+)$"),
+    re.compile(r"^görev\s+ekle\s+(?P<p>.+)$"),
+    re.compile(
+        r"^(?P<p>.+?)\s+(?:görev(?:i|ini)?|görevlere|görevlerime|yapılacaklara|"
+        r"yapılacaklar\s+listesine|listeye)\s+ekle$"
+    )
+]
+_TAKE_NOTE = [
+    # "not al:" / "not al -" / "not al ..." ama "not almak ..." değil
+    re.compile(r"^not\s+al(?:\s*[:\-]\s*|\s+)(?P<p>.+)$"),
+    re.compile(r"^(?P<p>.+?)\s+(?:diye\s+)?not(?:unu)?\s+al$")
+]
+# Sadece emir kipi ("pano nedir?" tanım sorusu, komut değil)
+_CLIPBOARD = re.compile(
+    r"\b(?:pano(?:yu|da|daki|dakini)?|kopyaladığım|clipboard)\b.*\b(?:oku|ne\s+var|göster)\b"
+)
+_LAUNCH = re.compile(r"^(?P<p>[\w\s'’]+?)\s+(?:uygulamasını\s+)?(?:aç|başlat|çalıştır)$")
+# OCR / PDF sadece emir kipindeki okuma fiiliyle ("OCR nedir?" soru, komut değil)
+_OCR = re.compile(
+    r"\b(?:(?:resmi|ekranı|görüntüyü)\s+oku|ocr\s+(?:ile\s+)?(?:oku|yap|çalıştır))\b"
+)
+_PDF_FILE = re.compile(r"(?P<f>[^\s\"'“”]+?\.pdf)\b", re.IGNORECASE)
+_READ_VERB = re.compile(r"\b(?:oku|aç|özetle|incele|göster|analiz\s+et)\b")
+# Okuma komutunda başka bir fiil varsa ("rapor.pdf dosyasını sil") karar LLM'in
+_OTHER_VERB = re.compile(
+    r"\b(?:sil|gönder|taşı|kopyala|kaydet|yazdır|düzenle|değiştir|oluştur|yükle|"
+    r"paylaş|kapat|çevir|yaz|ekle|ara)\b"
+)
+
+# "bir not al", "şunu not al" gibi yüksüz kalıplar araç çağrısı değildir
+_MIN_PAYLOAD_CHARS = 3
+_FILLER_PAYLOADS = {"bir", "yeni", "şu", "şunu", "bunu", "bana", "benim", "için", "bir şey"}
+# "bu görevi listeye ekle", "bunu da not al": yük önceki mesaja işaret ediyor
+_DEICTIC_PAYLOAD = re.compile(
+    r"^(?:bu|şu|o)(?:nu|nları|ları)?"
+    r"(?:\s+(?:görev|iş|not|şey|yazı|metin|metn|mesaj|cümle)\w*)?(?:\s+(?:da|de))?$"
+)
+
+
+def _normalize(text: str) -> str:
+    """Türkçe büyük/küçük harf dönüşümünü uzunluğu koruyarak yapar"""
+    return text.replace("İ", "i").replace("I", "ı").lower().strip()
+
+
+class IntentRouter:
+    """
+    Kural tabanlı niyet yönlendirici.
+    Eşleşme güveni eşiği geçerse, LLM'in üreteceği formatta bir karar döndürür;
+    geçemezse None döner ve istek normal LLM akışına gider.
+
+    Kurallar legacy/nlu.py::interpret_text'teki tespitlerden türetilmiştir.
+    """
+
+    def __init__(
+        self,
+        temporal_provider: Optional[Callable[[], Dict]] = None,
+        min_confidence: float = 0.85,
+        route_thresholds: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            temporal_provider: Zaman bilgisi döndüren fonksiyon
+                (ContextBuilder._get_temporal_context)
+            min_confidence: Varsayılan güven eşiği
+            route_thresholds: Rota bazında eşik (örn. {"launch_app": 0.95})
+        """
+        self.temporal_provider = temporal_provider
+        self.min_confidence = min_confidence
+        self.route_thresholds = route_thresholds or {}
+        self._apps: Optional[List[str]] = None
+
+        self.stats = {
+            "total": 0,
+            "routed": 0,
+            "hits": {},
+            "below_threshold": {}
+        }
+
+    def route(self, user_input: str) -> Optional[Dict]:
+        """
+        Girdiyi hızlı yoldan yönlendirmeyi dener.
+
+        Returns:
+            {"intent", "tool_calls", "response", "route", "confidence"} veya None
+        """
+        self.stats["total"] += 1
+
+        text = user_input.strip()
+        if not text or text.startswith("!"):
+            return None
+
+        match = self._match(text)
+        if match is None:
+            return None
+
+        name, confidence, decision = match
+        threshold = self.route_thresholds.get(name, self.min_confidence)
+
+        if confidence < threshold:
+            below = self.stats["below_threshold"]
+            below[name] = below.get(name, 0) + 1
+            return None
+
+        self.stats["routed"] += 1
+        self.stats["hits"][name] = self.stats["hits"].get(name, 0) + 1
+        logger.info(f"⚡ Hızlı yol: {name} (güven {confidence:.2f})")
+
+        return {**decision, "route": name, "confidence": confidence}
+
+    def _match(self, text: str) -> Optional[Tuple[str, float, Dict]]:
+        """En uygun kuralı bulur: (rota, güven, karar)"""
+        lower = _normalize(text)
+        lower = lower.rstrip(".!")
+
+        # Birleşik / soru cümleleri için güven düşürülür
+        penalty = 0.5 if _COMPOUND.search(lower) else 1.0
+        question = lower.rstrip("?").strip()
+
+        # 1. Zaman / tarih (modelsiz cevap)
+        if self.temporal_provider and (_TEMPORAL_TIME.match(question) or _TEMPORAL_DATE.match(question)):
+            return "temporal", 0.95 * penalty, self._temporal_decision(question)
+
+        # 2. Görev listeleme
+        if _LIST_TODOS.match(lower.rstrip("?")):
+            return "list_todos", 0.95 * penalty, self._tool_decision("list_todos", {})
+
+        # 3. Görev ekleme
+        payload = self._extract(_ADD_TODO, text, lower)
+        if payload:
+            return "add_todo", 0.9 * penalty, self._tool_decision("add_todo", {"task": payload})
+
+        # 4. Not alma
+        payload = self._extract(_TAKE_NOTE, text, lower)
+        if payload:
+            return "take_note", 0.9 * penalty, self._tool_decision("take_note", {"text": payload})
+
+        # 5. OCR
+        if _OCR.search(lower) and not _OTHER_VERB.search(lower):
+            return "ocr_read", 0.9 * penalty, self._tool_decision("ocr_read", {})
+
+        # 6. PDF okuma
+        pdf = _PDF_FILE.search(text)
+        if pdf and _READ_VERB.search(lower) and not _OTHER_VERB.search(lower):
+            return "read_pdf", 0.9 * penalty, self._tool_decision("read_pdf", {"filename": pdf.group("f")})
+
+        # 7. Pano okuma
+        if _CLIPBOARD.search(lower):
+            return "read_clipboard", 0.9 * penalty, self._tool_decision("read_clipboard", {})
+
+        # 8. Uygulama başlatma (sadece bilinen uygulamalar yüksek güven alır)
+        launch = _LAUNCH.match(lower)
+        if launch and len(lower.split()) <= 4:
+            app = self._normalize_app(launch.group("p"))
+            confidence = 0.9 if app in self._known_apps() else 0.5
+            return "launch_app", confidence * penalty, self._tool_decision("launch_app", {"app_name": app})
+
+        return None
+
+    def _extract(self, patterns: List[re.Pattern], text: str, lower: str) -> Optional[str]:
+        """Kalıba uyan ilk eşleşmenin yükünü (orijinal yazımla) döndürür"""
+        for pattern in patterns:
+            match = pattern.match(lower)
+            if match:
+                start, end = match.span("p")
+                payload = text.strip()[start:end].strip(" :-\"'")
+                normalized = _normalize(payload)
+                if (
+                    len(payload) >= _MIN_PAYLOAD_CHARS
+                    and normalized not in _FILLER_PAYLOADS
+                    and not _DEICTIC_PAYLOAD.match(normalized)
+                ):
+                    return payload
+        return None
+
+    def _tool_decision(self, tool_name: str, arguments: Dict) -> Dict:
+        return {
+            "intent": "command",
+            "tool_calls": [{"name": tool_name, "arguments": arguments}],
+            "response": ""
+        }
+
+    def _temporal_decision(self, lower: str) -> Dict:
+        temporal = self.temporal_provider()
+
+        if _TEMPORAL_TIME.match(lower):
+            response = f"🕒 Saat {temporal['current_time']}."
+        else:
+            response = f"📅 Bugün {temporal['current_date']}, {temporal['day_of_week']}."
+
+        return {"intent": "chat", "tool_calls": [], "response": response}
+
+    def _normalize_app(self, name: str) -> str:
+        """ToolRegistry._launch_app ile aynı ek temizliği"""
+        target = name.strip().replace("'ı", "").replace("'i", "").replace("’ı", "").replace("’i", "")
+        if target and target[-1] in ["ı", "i", "u", "ü"] and target not in self._known_apps():
+            target = target[:-1]
+        return target
+
+    def _known_apps(self) -> List[str]:
+        """apps_config.json'daki uygulama adları (ilk kullanımda okunur)"""
+        if self._apps is None:
+            try:
+                with open(APPS_CONFIG_PATH, "r", encoding="utf-8") as f:
+                    self._apps = list(json.load(f).keys())
+            except Exception as e:
+                logger.warning(f"Uygulama listesi okunamadı: {e}")
+                self._apps = []
+        return self._apps
+
+    def get_stats(self) -> Dict:
+        """Rota bazında isabet sayaçları"""
+        total = self.stats["total"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["routed"] / total, 3) if total else 0.0
+        }
@@ -0,0 +1,200 @@
+"""
+JSON Stream - Parça Parça Gelen JSON Çıktısını İzleme
+Model token ürettikçe karar JSON'unun içinden kullanıcıya gösterilecek metni ayıklar
+"""
+import re
+import json
+import logging
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_RESPONSE_KEY = re.compile(r'"response"\s*:\s*"')
+
+_ESCAPES = {
+    '"': '"',
+    '\\': '\\',
+    '/': '/',
+    'b': '\b',
+    'f': '\f',
+    'n': '\n',
+    'r': '\r',
+    't': '\t'
+}
+
+
+class ResponseFieldStreamer:
+    """
+    Karar JSON'undaki "response" alanının içeriğini akış halinde çözer.
+    Her feed() çağrısı, o ana kadar yeni çözülen metni döndürür.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos: Optional[int] = None  # "response" değerinin okunan konumu
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """Yeni parçayı ekler, görünür metin farkını döndürür"""
+        if self.done:
+            return ""
+
+        self._buf += chunk
+
+        if self._pos is None:
+            match = _RESPONSE_KEY.search(self._buf)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        i = self._pos
+        buf = self._buf
+
+        while i < len(buf):
+            ch = buf[i]
+
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+
+            if ch != '\\':
+                out.append(ch)
+                i += 1
+                continue
+
+            # Kaçış dizisi parçalar arasında bölünmüş olabilir
+            if i + 1 >= len(buf):
+                break
+
+            esc = buf[i + 1]
+            if esc == 'u':
+                if i + 6 > len(buf):
+                    break
+                try:
+                    out.append(chr(int(buf[i + 2:i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                out.append(_ESCAPES.get(esc, esc))
+                i += 2
+
+        self._pos = i
+        return "".join(out)
+
+
+class JsonObjectTracker:
+    """
+    Parantez ve string farkında, artımlı JSON izleyici.
+    İlk üst seviye nesne kapandığı anda tamamlandı olarak işaretler;
+    böylece model kapanış parantezinden sonra boşuna token üretmez.
+
+    on_field verilirse, üst seviye her alanın değeri kapandığı anda
+    (nesnenin geri kalanı beklenmeden) on_field(anahtar, değer) çağrılır.
+    """
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.text = ""
+        self.end: Optional[int] = None  # Nesnenin bittiği karakter konumu
+        self.on_field = on_field
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+
+        # Üst seviye alan takibi
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._value_start = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Yeni parçayı işler; nesne tamamlandıysa True döner"""
+        if self.end is not None:
+            return True
+
+        base = len(self.text)
+        self.text += chunk
+
+        for i, ch in enumerate(chunk):
+            pos = base + i
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._close_top_level_string(pos)
+                continue
+
+            if not self._started:
+                # Nesneden önceki metin (```json vb.) yok sayılır
+                if ch == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif ch == ':' and self._depth == 1:
+                self._current_key = self._last_key
+                self._value_start = pos + 1
+            elif ch == ',' and self._depth == 1:
+                # null / sayı / true gibi düz değerler virgülde biter
+                self._emit(self._value_start, pos)
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 1:
+                    self._emit(self._value_start, pos + 1)
+                elif self._depth == 0:
+                    self._emit(self._value_start, pos)
+                    self.end = pos + 1
+                    return True
+
+        return False
+
+    def _close_top_level_string(self, pos: int):
+        """Üst seviyede kapanan string ya anahtardır ya da değer"""
+        raw = self.text[self._string_start:pos + 1]
+
+        if self._current_key is None:
+            try:
+                self._last_key = json.loads(raw)
+            except ValueError:
+                self._last_key = None
+        else:
+            self._emit(self._value_start, pos + 1)
+
+    def _emit(self, start: int, end: int):
+        """Tamamlanan üst seviye değeri on_field'a iletir"""
+        key = self._current_key
+        self._current_key = None
+
+        if key is None or self.on_field is None:
+            return
+
+        try:
+            value = json.loads(self.text[start:end])
+        except ValueError:
+            return
+
+        try:
+            self.on_field(key, value)
+        except Exception as e:
+            logger.error(f"Alan işleyici hatası ({key}): {e}")
+
+    def result_text(self) -> str:
+        """Tamamlanan nesneye kadar olan metin (tamamlanmadıysa tümü)"""
+        return self.text[:self.end] if self.end is not None else self.text
@@ -0,0 +1,189 @@
+"""
+Prefix Cache - Sabit Prompt Öneki için KV Önbelleği
+Sistem prompt'unun her turda aynı kalan kısmını llama.cpp durumu olarak saklar
+"""
+import ctypes
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+import llama_cpp
+
+logger = logging.getLogger(__name__)
+
+
+def _common_prefix_length(a: Sequence[int], b: Sequence[int]) -> int:
+    """İki token dizisinin ortak önek uzunluğu"""
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+class PrefixCache:
+    """
+    Değişmeyen prompt önekinin (kimlik, araçlar, kurallar) değerlendirilmiş
+    durumunu saklar. Her üretimden önce model durumu bu öneke geri yüklenir,
+    böylece sadece değişen kısım (zaman, geçmiş, kullanıcı girdisi) işlenir.
+
+    Sadece llama.cpp bağlam durumu (KV önbelleği) ve token id'leri saklanır.
+    Llama.save_state() skor tablosunu da kopyalar (n_batch x n_vocab float32,
+    Qwen'de ~300 MB); üretim en az son token'ı yeniden değerlendirdiği için
+    o skorlara ihtiyaç yoktur.
+    """
+
+    def __init__(self, llm, max_entries: int = 3, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            llm: llama_cpp.Llama örneği
+            max_entries: Saklanacak en fazla önek durumu
+            max_bytes: Saklanan durumların toplam boyut sınırı. Bir durum önek
+                token sayısıyla büyür (7B model, ~1000 token: onlarca MB)
+        """
+        self.llm = llm
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._states: "OrderedDict[str, Dict]" = OrderedDict()
+        self._bytes = 0
+
+        self.stats = {
+            "requests": 0,
+            "prefix_hits": 0,
+            "prefix_misses": 0,
+            "reused_tokens": 0,
+            "evaluated_tokens": 0
+        }
+
+    def tokenize(self, text: str) -> List[int]:
+        """create_completion ile aynı ayarlarla tokenize eder"""
+        return self.llm.tokenize(text.encode("utf-8"), special=True)
+
+    def prepare(self, prompt_tokens: List[int], prefix_text: str) -> int:
+        """
+        Model durumunu üretime hazırlar.
+
+        Args:
+            prompt_tokens: Tam prompt'un token'ları
+            prefix_text: Prompt'un sabit öneki
+
+        Returns:
+            Yeniden kullanılan token sayısı
+        """
+        self.stats["requests"] += 1
+        key = hashlib.sha1(prefix_text.encode("utf-8")).hexdigest()
+
+        reused = _common_prefix_length(self.llm._input_ids, prompt_tokens)
+        entry = self._states.get(key)
+
+        try:
+            if entry is not None:
+                self._states.move_to_end(key)
+                self.stats["prefix_hits"] += 1
+
+                # Model başka bir prompt ile meşgul kaldıysa öneki geri yükle
+                if reused < entry["n_tokens"]:
+                    self._restore(entry)
+                    reused = _common_prefix_length(self.llm._input_ids, prompt_tokens)
+            else:
+                self.stats["prefix_misses"] += 1
+                reused = self._warm(key, prompt_tokens, prefix_text, reused)
+
+        except Exception as e:
+            logger.warning(f"Önek önbelleği kullanılamadı: {e}")
+
+        # llama.cpp son token'ı her zaman yeniden değerlendirir
+        reused = min(reused, max(len(prompt_tokens) - 1, 0))
+
+        self.stats["reused_tokens"] += reused
+        self.stats["evaluated_tokens"] += len(prompt_tokens) - reused
+        return reused
+
+    def _warm(
+        self,
+        key: str,
+        prompt_tokens: List[int],
+        prefix_text: str,
+        reused: int
+    ) -> int:
+        """Öneki değerlendirip durumunu kaydeder"""
+
+        # Önek sınırındaki token birleşmelerine karşı tam prompt ile kıyasla
+        n_prefix = _common_prefix_length(self.tokenize(prefix_text), prompt_tokens)
+
+        if n_prefix == 0:
+            return reused
+
+        if reused < n_prefix:
+            self.llm.n_tokens = reused
+            self.llm.eval(prompt_tokens[reused:n_prefix])
+
+        entry = self._snapshot(n_prefix)
+        if entry["bytes"] > self.max_bytes:
+            logger.warning(f"Önek durumu sınırdan büyük ({entry['bytes'] // (1024 * 1024)} MB), saklanmadı")
+            return reused
+
+        self._states[key] = entry
+        self._bytes += entry["bytes"]
+
+        while len(self._states) > self.max_entries or self._bytes > self.max_bytes:
+            _, old = self._states.popitem(last=False)
+            self._bytes -= old["bytes"]
+
+        logger.info(
+            f"📌 Prompt öneki önbelleğe alındı ({n_prefix} token, "
+            f"{entry['bytes'] / (1024 * 1024):.1f} MB)"
+        )
+
+        # Isıtma sırasında işlenen token'lar taze sayılır
+        return reused
+
+    def _snapshot(self, n_tokens: int) -> Dict:
+        """Bağlam durumunu (KV) ve token id'lerini kopyalar, skorları değil"""
+        ctx = getattr(getattr(self.llm, "_ctx", None), "ctx", None)
+        if ctx is None:
+            # Düşük seviye bağlamı olmayan Llama benzeri nesneler
+            return {"state": self.llm.save_state(), "n_tokens": n_tokens, "bytes": 0}
+
+        size = llama_cpp.llama_get_state_size(ctx)
+        buffer = (ctypes.c_uint8 * int(size))()
+        written = llama_cpp.llama_copy_state_data(ctx, buffer)
+        data = ctypes.string_at(buffer, written)
+        input_ids = self.llm.input_ids[:self.llm.n_tokens].copy()
+        return {
+            "data": data,
+            "input_ids": input_ids,
+            "n_tokens": n_tokens,
+            "bytes": len(data) + input_ids.nbytes
+        }
+
+    def _restore(self, entry: Dict):
+        if "state" in entry:
+            self.llm.load_state(entry["state"])
+            return
+
+        data = entry["data"]
+        buffer = (ctypes.c_uint8 * len(data)).from_buffer_copy(data)
+        if llama_cpp.llama_set_state_data(self.llm._ctx.ctx, buffer) != len(data):
+            raise RuntimeError("llama durumu geri yüklenemedi")
+
+        input_ids = entry["input_ids"]
+        self.llm.input_ids[:len(input_ids)] = input_ids
+        self.llm.n_tokens = len(input_ids)
+
+    def clear(self):
+        """Saklanan tüm durumları siler"""
+        self._states.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict:
+        """Yeniden kullanılan / yeni değerlendirilen token sayaçları"""
+        total = self.stats["reused_tokens"] + self.stats["evaluated_tokens"]
+        return {
+            **self.stats,
+            "cached_prefixes": len(self._states),
+            "cached_bytes": self._bytes,
+            "reuse_ratio": round(self.stats["reused_tokens"] / total, 3) if total else 0.0
+        }
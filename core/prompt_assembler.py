@@ -0,0 +1,131 @@
+"""
+Prompt Assembler - Token Bütçeli Prompt Oluşturucu
+Bölümleri model tokenizer'ı ile ölçer ve önceliğe göre bütçeye sığdırır
+"""
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PromptSection:
+    """Prompt'un tek bir bölümü (profil, geçmiş, araçlar...)"""
+
+    def __init__(
+        self,
+        name: str,
+        text: str,
+        priority: int = 0,
+        required: bool = False,
+        keep: str = "start",
+        header: str = ""
+    ):
+        """
+        Args:
+            name: Bölüm adı (rapor için)
+            text: Bölüm metni
+            priority: Küçük sayı = önce yerleştirilir
+            required: Bütçe yetmese de çıkarılmaz
+            keep: Kırpılırsa korunacak uç ("start" veya "end")
+            header: Kırpmadan etkilenmeyen başlık satırı
+        """
+        self.name = name
+        self.text = text
+        self.priority = priority
+        self.required = required
+        self.keep = keep
+        self.header = header
+
+    def render(self, body: str = None) -> str:
+        """Başlık + gövde"""
+        body = self.text if body is None else body
+        return f"{self.header}\n{body}" if self.header else body
+
+
+class PromptAssembler:
+    """
+    Bölümleri öncelik sırasıyla token bütçesine yerleştirir.
+    Sığmayan bölümler kırpılır, hiç yer kalmazsa atlanır.
+    Çıktıda bölümler eklenme sırasını korur.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        truncate_tokens: Callable[[str, int, str], str],
+        min_section_tokens: int = 16
+    ):
+        """
+        Args:
+            count_tokens: Metnin token sayısını döndürür
+            truncate_tokens: (metin, token_sayısı, korunacak_uç) -> kırpılmış metin
+            min_section_tokens: Bundan az yer kalırsa bölüm kırpılmaz, atlanır
+        """
+        self.count_tokens = count_tokens
+        self.truncate_tokens = truncate_tokens
+        self.min_section_tokens = min_section_tokens
+        self.sections: List[PromptSection] = []
+        self.report: Dict = {}
+
+    def add(
+        self,
+        name: str,
+        text: str,
+        priority: int = 0,
+        required: bool = False,
+        keep: str = "start",
+        header: str = ""
+    ):
+        """Bölüm ekler (boş metinler yok sayılır)"""
+        if text:
+            self.sections.append(PromptSection(name, text, priority, required, keep, header))
+
+    def build(self, budget: int, separator: str = "\n\n") -> str:
+        """
+        Bütçeye sığan prompt'u oluşturur.
+
+        Args:
+            budget: Bölümlere ayrılan toplam token sayısı
+        """
+        sep_tokens = self.count_tokens(separator)
+        measured = {id(s): self.count_tokens(s.render()) + sep_tokens for s in self.sections}
+
+        # Zorunlu bölümler her durumda girer
+        remaining = budget - sum(measured[id(s)] for s in self.sections if s.required)
+        if remaining < 0:
+            logger.warning(f"Zorunlu bölümler bütçeyi aşıyor ({-remaining} token fazla)")
+
+        placed: Dict[int, str] = {}
+        report = {}
+
+        for section in sorted(self.sections, key=lambda s: s.priority):
+            tokens = measured[id(section)]
+
+            if section.required:
+                placed[id(section)] = section.render()
+                report[section.name] = {"tokens": tokens, "used": tokens, "status": "full"}
+                continue
+
+            if tokens <= remaining:
+                placed[id(section)] = section.render()
+                remaining -= tokens
+                report[section.name] = {"tokens": tokens, "used": tokens, "status": "full"}
+                continue
+
+            overhead = sep_tokens + (self.count_tokens(section.header) + 1 if section.header else 0)
+            if remaining - overhead >= self.min_section_tokens:
+                body = self.truncate_tokens(section.text, remaining - overhead, section.keep)
+                placed[id(section)] = section.render(body)
+                report[section.name] = {"tokens": tokens, "used": remaining, "status": "truncated"}
+                remaining = 0
+
+            else:
+                report[section.name] = {"tokens": tokens, "used": 0, "status": "dropped"}
+
+        self.report = {
+            "budget": budget,
+            "used": sum(r["used"] for r in report.values()),
+            "sections": report
+        }
+
+        return separator.join(placed[id(s)] for s in self.sections if id(s) in placed)
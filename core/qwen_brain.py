@@ -3,9 +3,23 @@ ADAM Merkezi Beyin - GGUF Qwen2.5 Model
 Yerel, hızlı ve hafıza dostu LLM motoru
 """
 import json
+import time
+import queue
 import logging
-from typing import Dict, List, Optional
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from llama_cpp import Llama
+from core.prefix_cache import PrefixCache
+from core.decision_grammar import DecisionGrammarCache
+from core.prompt_assembler import PromptAssembler
+from core.json_stream import JsonObjectTracker
+from modules.tracing import tracer
+from core.inference_scheduler import (
+    InferenceScheduler,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_ANALYSIS,
+    PRIORITY_BACKGROUND
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +35,11 @@ class QwenBrain:
         model_path: str = "models/qwen_agent.gguf",
         n_ctx: int = 4096,
         n_threads: int = 4,
-        n_gpu_layers: int = 0
+        n_gpu_layers: int = 0,
+        use_grammar: bool = False,
+        prompt_budget: Optional[int] = None,
+        speculative: Optional[Dict[str, bool]] = None,
+        draft_model=None
     ):
         """
         Args:
@@ -29,17 +47,45 @@ class QwenBrain:
             n_ctx: Context window boyutu (4096 = ~3000 kelime)
             n_threads: CPU thread sayısı (4-8 optimal)
             n_gpu_layers: GPU'ya yüklenecek katman sayısı (0 = sadece CPU)
+            use_grammar: Karar JSON'unu gramerle kısıtla (sadece geçerli araç çağrıları)
+            prompt_budget: Prompt + cevap için token bütçesi (None = n_ctx)
+            speculative: Çağrı türüne göre spekülatif üretim, örn.
+                {"generate_with_context": True, "simple_chat": False}
+                Herhangi biri açıksa model logits_all=True ile yüklenir: taslak
+                tokenlar tüm satırların logit'leriyle doğrulanır. Bedeli
+                n_ctx x n_vocab float32 skor tablosudur (Qwen, n_ctx=4096:
+                ~2.5 GB ek RAM). Açılışta hiçbiri açık değilse sonradan
+                set_speculative ile açılamaz.
+            draft_model: llama_cpp LlamaDraftModel örneği
+                (None = prompt-lookup decoding)
         """
         self.model_path = model_path
+        self.use_grammar = use_grammar
+        self.n_ctx = n_ctx
+        self.prompt_budget = min(prompt_budget or n_ctx, n_ctx)
+        self.last_prompt_report: Dict = {}
         
         logger.info(f"🧠 Qwen Brain başlatılıyor: {model_path}")
         
+        # Spekülatif üretim (çağrı türüne göre açılır). logits_all Llama
+        # kurulurken sabitlenir; taslak model sonradan takılırsa doğrulama
+        # eski logit satırlarına bakar ve metin bozulur.
+        self.speculative = dict(speculative or {})
+        self.draft_model = draft_model
+        if any(self.speculative.values()) and self.draft_model is None:
+            self.draft_model = self._create_draft_model()
+        self.speculation_available = self.draft_model is not None
+        if not self.speculation_available:
+            self.speculative = {}
+        
         try:
             self.llm = Llama(
                 model_path=model_path,
                 n_ctx=n_ctx,
                 n_threads=n_threads,
                 n_gpu_layers=n_gpu_layers,
+                # draft_model verilirse llama_cpp logits_all=True kullanır
+                draft_model=self.draft_model,
                 verbose=False  # Gereksiz log'ları kapat
             )
             logger.info("✅ Qwen Brain hazır (GGUF modu)")
@@ -47,6 +93,68 @@ class QwenBrain:
         except Exception as e:
             logger.critical(f"Model yükleme hatası: {e}")
             raise
+        
+        # Modele tüm erişim bu zamanlayıcı üzerinden sıralanır
+        self.scheduler = InferenceScheduler()
+        
+        self.decode_stats = {
+            "speculative": {"calls": 0, "tokens": 0, "seconds": 0.0},
+            "standard": {"calls": 0, "tokens": 0, "seconds": 0.0}
+        }
+        
+        # JSON nesnesi kapanınca üretimi erken bitirme sayaçları
+        self.early_stop_stats = {"requests": 0, "stopped": 0, "tokens_saved": 0}
+        self.last_early_stop: Dict = {}
+        
+        # Sabit prompt öneki için KV önbelleği
+        self.prefix_cache = PrefixCache(self.llm)
+        self._last_prompt = (0, 0)  # (prompt token, önekten gelen) - izleme için
+        
+        # Gramer modu ve JSON ayrıştırma istatistikleri
+        self.grammar_cache = DecisionGrammarCache()
+        self.parse_stats = {
+            "free": {"total": 0, "failures": 0},
+            "grammar": {"total": 0, "failures": 0}
+        }
+    
+    def set_speculative(self, call_type: str, enabled: bool) -> bool:
+        """
+        Bir çağrı türü için spekülatif üretimi açar/kapatır.
+        call_type: "generate_with_context" veya "simple_chat"
+        
+        Returns:
+            False: model spekülasyonsuz (logits_all=False) yüklendiği için açılamadı
+        """
+        if enabled and not self.speculation_available:
+            logger.warning(
+                "🔮 Spekülatif üretim açılamaz: model taslak modelsiz yüklendi "
+                "(QwenBrain(speculative=...) ile başlatın)"
+            )
+            return False
+        self.speculative[call_type] = enabled
+        logger.info(f"🔮 Spekülatif üretim ({call_type}): {'açık' if enabled else 'kapalı'}")
+        return True
+    
+    @staticmethod
+    def _create_draft_model():
+        """Varsayılan taslak: prompt-lookup decoding (ek model yüklemez)"""
+        try:
+            from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+            return LlamaPromptLookupDecoding(num_pred_tokens=10)
+        except ImportError as e:
+            logger.warning(f"Prompt-lookup decoding kullanılamıyor: {e}")
+            return None
+    
+    def _get_draft_model(self, call_type: str):
+        """Çağrı türü için taslak modeli döndürür (kapalıysa None)"""
+        if not self.speculative.get(call_type):
+            return None
+        return self.draft_model
+    
+    def set_grammar_mode(self, enabled: bool):
+        """Gramerle kısıtlı karar üretimini açar/kapatır"""
+        self.use_grammar = enabled
+        logger.info(f"📐 Gramer modu: {'açık' if enabled else 'kapalı'}")
     
     def generate_with_context(
         self,
@@ -54,50 +162,96 @@ class QwenBrain:
         context: Dict,
         available_tools: List[Dict],
         max_tokens: int = 512,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        on_token: Optional[Callable[[str], None]] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        tools_json: Optional[str] = None
     ) -> Dict:
         """
         Bağlamsal üretim yapar ve tool çağırma kararı verir.
         
+        Args:
+            on_token: Verilirse üretim akış modunda yapılır ve her yeni
+                metin parçası (ham JSON) bu fonksiyona iletilir
+            priority: Zamanlayıcı önceliği (PRIORITY_*)
+            on_field: Karar JSON'unun üst seviye alanları ("tool_calls" vb.)
+                kapandığı anda, üretim sürerken çağrılır
+            tools_json: Önceden serileştirilmiş araç şeması
+                (registry.get_tools_schema_json); verilmezse burada üretilir
+        
         Returns:
             {
                 "intent": "command" | "query" | "chat",
-                "tool_call": {
+                "tool_calls": [{
                     "name": "take_note",
-                    "arguments": {"text": "..."}
-                } | None,
+                    "arguments": {"text": "..."},
+                    "depends_on": []
+                }],
                 "response": "Kullanıcıya cevap"
             }
         """
         
-        # Sistem prompt'unu oluştur
-        system_prompt = self._build_system_prompt(context, available_tools)
-        
-        # Tam prompt'u hazırla
-        full_prompt = f"""{system_prompt}
+        # Sabit önek (önbellek anahtarı) + seçilen araçlar + değişen kısım.
+        # Araç alt kümesi istek başına değiştiği için önekin dışında kalır.
+        static_prompt = self._build_static_prompt(context)
+        tools_prompt = self._build_tools_prompt(available_tools, tools_json)
+        user_turn = f"""
 
 Kullanıcı: {user_input}
 
 Asistan (JSON formatında cevap ver):"""
         
+        # Değişen kısım, önek ve kullanıcı girdisinden kalan bütçeye sığdırılır
+        static_tokens = self.count_tokens(static_prompt)
+        tools_tokens = self.count_tokens(tools_prompt)
+        budget = (
+            self.prompt_budget
+            - max_tokens
+            - static_tokens
+            - tools_tokens
+            - self.count_tokens(user_turn)
+        )
+        dynamic_prompt = self._build_dynamic_prompt(context, budget)
+        self.last_prompt_report["static_tokens"] = static_tokens
+        self.last_prompt_report["tools_tokens"] = tools_tokens
+        
+        # Tam prompt'u hazırla
+        full_prompt = f"{static_prompt}{tools_prompt}{dynamic_prompt}{user_turn}"
+        
         logger.info(f"💭 Düşünüyor... (max {max_tokens} token)")
         
+        # Gramer modu: model sadece geçerli karar JSON'u üretebilir
+        grammar = None
+        if self.use_grammar:
+            grammar = self.grammar_cache.get(available_tools)
+        
+        # Üst seviye JSON nesnesi kapanınca üretim durur
+        tracker = JsonObjectTracker(on_field=on_field)
+        
         try:
             # Model üretimi
-            output = self.llm(
+            self._complete(
                 full_prompt,
+                static_prompt,
+                on_token=on_token,
+                priority=priority,
+                call_type="generate_with_context",
+                stop_check=tracker.feed,
                 max_tokens=max_tokens,
                 temperature=temperature,
                 top_p=0.9,
                 stop=["Kullanıcı:", "\n\n\n"],  # Durma koşulları
+                grammar=grammar,
                 echo=False
             )
-            
-            # Çıktıyı al
-            generated_text = output['choices'][0]['text'].strip()
+            generated_text = tracker.result_text().strip()
             
             # JSON ayrıştır
-            result = self._parse_response(generated_text)
+            result = self._parse_response(
+                generated_text,
+                mode="grammar" if grammar is not None else "free"
+            )
             
             logger.info(f"✅ Karar: {result.get('intent')}")
             return result
@@ -106,66 +260,341 @@ Asistan (JSON formatında cevap ver):"""
             logger.error(f"Üretim hatası: {e}")
             return {
                 "intent": "chat",
-                "tool_call": None,
+                "tool_calls": [],
                 "response": "Üzgünüm, bir düşünce hatası yaşadım. Tekrar söyler misin?"
             }
     
     def _build_system_prompt(self, context: Dict, tools: List[Dict]) -> str:
         """Dinamik sistem prompt'u oluşturur"""
+        return (
+            self._build_static_prompt(context)
+            + self._build_tools_prompt(tools)
+            + self._build_dynamic_prompt(context)
+        )
+    
+    def _build_static_prompt(self, context: Dict) -> str:
+        """
+        Her turda aynı kalan önek (kimlik, format, kurallar).
+        KV önbelleğinin (PrefixCache) anahtarıdır: değişken bilgi, istek
+        başına seçilen araçlar dahil, içermemeli.
+        """
         
         profile = context.get("profile", {})
-        user_name = profile.get("user_name", "Kullanıcı")
         tone = profile.get("tone", "dostane")
         
-        # Zaman bilgisi
-        temporal = context.get("temporal", {})
-        time_str = f"{temporal.get('day_of_week', 'Bugün')} {temporal.get('current_time', '')}"
-        
-        # Konuşma geçmişi
-        conversation = context.get("conversation", [])
-        history_str = ""
-        if conversation:
-            for msg in conversation[-3:]:  # Son 3 konuşma
-                role = "Kullanıcı" if msg["role"] == "user" else "Asistan"
-                history_str += f"{role}: {msg['content']}\n"
-        
-        # Tool listesi
-        tools_json = json.dumps(tools, indent=2, ensure_ascii=False)
-        
         prompt = f"""Sen ADAM (Adaptive Personal Core), yerel çalışan yapay zeka asistanısın.
 
-KULLANICI BİLGİLERİ:
-- İsim: {user_name}
-- Üslup Tercihi: {tone}
-- Zaman: {time_str}
-
-SON KONUŞMALAR:
-{history_str if history_str else "İlk etkileşim"}
-
 GÖREV:
 Kullanıcının isteğini anla ve uygun aksiyonu belirle.
 
-KULLANILABİLİR ARAÇLAR:
-{tools_json}
-
 CEVAP FORMATI (SADECE JSON):
 {{
   "intent": "command" veya "query" veya "chat",
-  "tool_call": {{"name": "araç_adı", "arguments": {{"param": "değer"}}}} veya null,
+  "tool_calls": [{{"name": "araç_adı", "arguments": {{"param": "değer"}}, "depends_on": []}}],
   "response": "Kullanıcıya söylenecek kısa mesaj"
 }}
 
 KURALLAR:
-1. Araç kullanılacaksa "tool_call" doldur, kullanılmayacaksa null yap
+1. Araç kullanılacaksa "tool_calls" listesine yaz, kullanılmayacaksa [] bırak
+   Birden fazla işlem istenirse hepsini aynı listeye yaz; bir çağrı öncekinin
+   bitmesini beklemeliyse "depends_on" içine onun sırasını (0'dan) yaz
 2. Her zaman geçerli JSON formatında cevap ver
 3. Üslup '{tone}' olmalı
-4. Kısa ve net cevaplar ver"""
+4. Kısa ve net cevaplar ver
+
+"""
+        
+        return prompt
+    
+    def _build_tools_prompt(self, tools: List[Dict], tools_json: Optional[str] = None) -> str:
+        """İsteğe göre seçilen araçlar (sabit önekten hemen sonra)"""
+        
+        # Tool listesi (boşluksuz; girintili JSON her turda gereksiz token harcar)
+        if tools_json is None:
+            tools_json = json.dumps(tools, ensure_ascii=False, separators=(",", ":"))
+        
+        return f"KULLANILABİLİR ARAÇLAR:\n{tools_json}\n\n"
+    
+    def _build_dynamic_prompt(self, context: Dict, budget: Optional[int] = None) -> str:
+        """
+        Her turda değişen kısım (kullanıcı, zaman, geçmiş, anılar, ekran).
+        Bölümler öncelik sırasıyla token bütçesine yerleştirilir.
+        """
+        
+        profile = context.get("profile", {})
+        user_name = profile.get("user_name", "Kullanıcı")
+        tone = profile.get("tone", "dostane")
+        
+        # Zaman bilgisi
+        temporal = context.get("temporal", {})
+        time_str = f"{temporal.get('day_of_week', 'Bugün')} {temporal.get('current_time', '')}"
+        
+        # Konuşma geçmişi
+        conversation = context.get("conversation", [])
+        history_str = ""
+        if conversation:
+            for msg in conversation:  # Pencere ContextBuilder'da; eskiler özette
+                role = "Kullanıcı" if msg["role"] == "user" else "Asistan"
+                history_str += f"{role}: {msg['content']}\n"
+        
+        # İlgili anılar
+        memories = context.get("relevant_memories", [])
+        memories_str = "\n".join(f"- {m}" for m in memories)
+        
+        # Ekran durumu
+        screen = context.get("screen_info")
+        screen_str = ""
+        if screen:
+            screen_str = f"- Aktif pencere: {screen.get('active_window', 'Bilinmiyor')}"
+            if screen.get("clipboard"):
+                screen_str += f"\n- Pano: {screen['clipboard']}"
+        
+        assembler = self._new_assembler()
+        assembler.add(
+            "profile",
+            f"- İsim: {user_name}\n- Üslup Tercihi: {tone}",
+            priority=0, required=True, header="KULLANICI BİLGİLERİ:"
+        )
+        assembler.add(
+            "temporal",
+            f"- {time_str}",
+            priority=0, required=True, header="ZAMAN:"
+        )
+        assembler.add(
+            "conversation_summary",
+            context.get("conversation_summary", ""),
+            priority=2, keep="end", header="ÖNCEKİ KONUŞMA ÖZETİ:"
+        )
+        assembler.add(
+            "history",
+            history_str.strip() or "İlk etkileşim",
+            priority=1, keep="end", header="SON KONUŞMALAR:"
+        )
+        assembler.add(
+            "relevant_memories",
+            memories_str,
+            priority=2, header="İLGİLİ ANILAR:"
+        )
+        assembler.add(
+            "screen_info",
+            screen_str,
+            priority=3, header="EKRAN DURUMU:"
+        )
+        
+        if budget is None:
+            budget = self.prompt_budget
+        
+        prompt = assembler.build(budget)
+        self.last_prompt_report = assembler.report
         
         return prompt
     
-    def _parse_response(self, raw_output: str) -> Dict:
+    # === TOKEN BÜTÇESİ ===
+    
+    def count_tokens(self, text: str) -> int:
+        """Metnin model tokenizer'ına göre token sayısı"""
+        if not text:
+            return 0
+        return len(self.llm.tokenize(text.encode("utf-8"), add_bos=False, special=True))
+    
+    def truncate_tokens(self, text: str, n_tokens: int, keep: str = "start") -> str:
+        """
+        Metni en fazla n_tokens token olacak şekilde kırpar.
+        keep="end" ise metnin sonu korunur (örn. konuşma geçmişi).
+        """
+        tokens = self.llm.tokenize(text.encode("utf-8"), add_bos=False, special=True)
+        
+        if len(tokens) <= n_tokens:
+            return text
+        if n_tokens <= 0:
+            return ""
+        
+        kept = tokens[-n_tokens:] if keep == "end" else tokens[:n_tokens]
+        return self.llm.detokenize(kept).decode("utf-8", errors="ignore")
+    
+    def split_tokens(self, text: str, chunk_tokens: int) -> List[str]:
+        """Metni en fazla chunk_tokens token'lık parçalara böler"""
+        tokens = self.llm.tokenize(text.encode("utf-8"), add_bos=False, special=True)
+        return [
+            self.llm.detokenize(tokens[i:i + chunk_tokens]).decode("utf-8", errors="ignore")
+            for i in range(0, len(tokens), chunk_tokens)
+        ]
+    
+    def fit_to_budget(
+        self,
+        text: str,
+        max_tokens: int,
+        reserve_tokens: int = 0,
+        keep: str = "start"
+    ) -> str:
+        """
+        Metni, cevap (max_tokens) ve prompt'un geri kalanı (reserve_tokens)
+        için yer bıraktıktan sonra kalan bütçeye sığdırır.
+        """
+        available = self.prompt_budget - max_tokens - reserve_tokens
+        return self.truncate_tokens(text, available, keep)
+    
+    def _new_assembler(self) -> PromptAssembler:
+        """Model tokenizer'ı ile ölçüm yapan assembler"""
+        return PromptAssembler(self.count_tokens, self.truncate_tokens)
+    
+    def _complete(
+        self,
+        prompt: str,
+        prefix: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        call_type: str = "",
+        stop_check: Optional[Callable[[str], bool]] = None,
+        **kwargs
+    ) -> str:
+        """
+        Önek önbelleğini kullanarak tamamlama yapar ve üretilen metni döndürür.
+        Sadece önekten sonra değişen token'lar yeniden değerlendirilir.
+        Çağrı, modelin sahibi olan zamanlayıcı üzerinden yapılır.
+        
+        Args:
+            stop_check: Her parçadan sonra çağrılır; True dönerse üretim durur
+        """
+        with tracer.span(f"llm.{call_type or 'complete'}", priority=priority) as span:
+            enqueued = time.time()
+            # Zamanlayıcı thread'indeki span'ler bu isteğin izine bağlanır
+            complete_now = tracer.bind(self._complete_now)
+            
+            def job_fn(job):
+                span.set(queue_ms=round((time.time() - enqueued) * 1000, 2))
+                return complete_now(job, prompt, prefix, on_token, call_type, stop_check, **kwargs)
+            
+            return self.scheduler.run(job_fn, priority=priority)
+    
+    def _complete_now(
+        self,
+        job,
+        prompt: str,
+        prefix: str,
+        on_token,
+        call_type: str,
+        stop_check,
+        **kwargs
+    ) -> str:
+        """Zamanlayıcı thread'inde çalışır"""
+        
+        # Taslak model çağrı bazında takılıp çıkarılır; logits_all açılışta
+        # açıldığı için (speculation_available) doğrulama tüm satırları görür
+        self.llm.draft_model = self._get_draft_model(call_type)
+        mode = "speculative" if self.llm.draft_model is not None else "standard"
+        started = time.time()
+        
+        # Akış gerekmiyorsa tek seferde üret. Kesilebilir işler, erken
+        # durdurma ve izleme (ilk token zamanı) token token üretim ister.
+        tracing = tracer.enabled
+        if on_token is None and stop_check is None and not (job and job.preemptible) and not tracing:
+            output = self.llm(self._prepare_prompt(prompt, prefix), **kwargs)
+            self._record_decode(mode, output['usage']['completion_tokens'], started)
+            return output['choices'][0]['text']
+        
+        chunks = []
+        stopped = False
+        first_token_at = None
+        stream = self._stream(prompt, prefix, job, **kwargs)
+        
+        try:
+            for text in stream:
+                if first_token_at is None:
+                    first_token_at = time.time()
+                chunks.append(text)
+                if on_token:
+                    on_token(text)
+                if stop_check and stop_check(text):
+                    stopped = True
+                    break
+        finally:
+            stream.close()
+        
+        # Akış modunda her parça bir token'a karşılık gelir
+        self._record_decode(mode, len(chunks), started)
+        
+        if stop_check:
+            self._record_early_stop(stopped, len(chunks), kwargs.get("max_tokens", 0))
+        
+        if tracing:
+            self._trace_completion(mode, started, first_token_at, len(chunks))
+        
+        return "".join(chunks)
+    
+    def _trace_completion(self, mode: str, started: float, first_token_at: Optional[float], tokens: int):
+        """Prefill (ilk token'a kadar) ve decode sürelerini ize yazar"""
+        now = time.time()
+        first_token_at = first_token_at or now
+        prompt_tokens, reused_tokens = self._last_prompt
+        decode_s = now - first_token_at
+        
+        tracer.record(
+            "llm.prefill",
+            (first_token_at - started) * 1000,
+            ended=first_token_at,
+            prompt_tokens=prompt_tokens,
+            reused_tokens=reused_tokens
+        )
+        tracer.record(
+            "llm.decode",
+            decode_s * 1000,
+            completion_tokens=tokens,
+            tokens_per_sec=round(tokens / decode_s, 1) if decode_s > 0 else 0.0,
+            mode=mode
+        )
+    
+    def _record_early_stop(self, stopped: bool, generated: int, max_tokens: int):
+        """
+        Erken durdurma sayacı. Kazanılan token, modelin max_tokens'a kadar
+        devam edeceği varsayımıyla hesaplanır (üst sınır).
+        """
+        saved = max(max_tokens - generated, 0) if stopped else 0
+        
+        self.early_stop_stats["requests"] += 1
+        self.early_stop_stats["stopped"] += int(stopped)
+        self.early_stop_stats["tokens_saved"] += saved
+        self.last_early_stop = {"generated": generated, "tokens_saved": saved}
+        
+        if stopped:
+            logger.info(f"✂️ JSON tamamlandı, üretim durduruldu ({generated} token, ~{saved} tasarruf)")
+    
+    def _record_decode(self, mode: str, tokens: int, started: float):
+        """Spekülatif açık/kapalı token/sn karşılaştırması için sayaç"""
+        stats = self.decode_stats[mode]
+        stats["calls"] += 1
+        stats["tokens"] += tokens
+        stats["seconds"] += time.time() - started
+    
+    def _stream(self, prompt: str, prefix: str, job=None, **kwargs) -> Iterator[str]:
+        """llama.cpp akış modunda metin parçalarını üretir"""
+        stream = self.llm(self._prepare_prompt(prompt, prefix), stream=True, **kwargs)
+        
+        try:
+            for chunk in stream:
+                if job is not None:
+                    job.check_cancelled()
+                
+                text = chunk['choices'][0]['text']
+                if text:
+                    yield text
+        finally:
+            # Erken çıkışta llama.cpp üretimini de kapat
+            stream.close()
+    
+    def _prepare_prompt(self, prompt: str, prefix: str) -> List[int]:
+        """Prompt'u tokenize eder ve önek durumunu geri yükler"""
+        prompt_tokens = self.prefix_cache.tokenize(prompt)
+        reused = self.prefix_cache.prepare(prompt_tokens, prefix)
+        self._last_prompt = (len(prompt_tokens), reused)
+        return prompt_tokens
+    
+    def _parse_response(self, raw_output: str, mode: str = "free") -> Dict:
         """Model çıktısını JSON'a çevirir"""
         
+        stats = self.parse_stats[mode]
+        stats["total"] += 1
+        
         try:
             # Markdown temizleme
             cleaned = raw_output.strip()
@@ -186,36 +615,205 @@ KURALLAR:
             return result
         
         except json.JSONDecodeError:
+            stats["failures"] += 1
             logger.warning(f"JSON parse başarısız, ham çıktı: {raw_output[:100]}")
             
             # Fallback: Ham metni döndür
             return {
                 "intent": "chat",
-                "tool_call": None,
+                "tool_calls": [],
                 "response": raw_output[:500]
             }
     
-    def simple_chat(self, message: str, max_tokens: int = 256) -> str:
+    def simple_chat(
+        self,
+        message: str,
+        max_tokens: int = 256,
+        on_token: Optional[Callable[[str], None]] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> str:
         """
         Basit sohbet modu (tool kullanmadan).
         Hızlı cevaplar için.
         """
-        prompt = f"""Sen ADAM adlı dostane bir asistansın.
-
-Kullanıcı: {message}
-Asistan:"""
+        prefix, prompt = self._build_chat_prompt(message)
         
         try:
-            output = self.llm(
+            return self._complete(
                 prompt,
+                prefix,
+                on_token=on_token,
+                priority=priority,
+                call_type="simple_chat",
                 max_tokens=max_tokens,
                 temperature=0.7,
                 stop=["Kullanıcı:"]
-            )
-            return output['choices'][0]['text'].strip()
+            ).strip()
         except Exception as e:
             logger.error(f"Basit sohbet hatası: {e}")
             return "Üzgünüm, bir sorun oluştu."
+    
+    def stream_chat(
+        self,
+        message: str,
+        max_tokens: int = 256,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Iterator[str]:
+        """
+        simple_chat'in akış versiyonu.
+        Token'lar üretildikçe metin parçalarını döndürür.
+        """
+        chunks: "queue.Queue" = queue.Queue()
+        done = object()
+        
+        def produce():
+            try:
+                self.simple_chat(message, max_tokens, on_token=chunks.put, priority=priority)
+            finally:
+                chunks.put(done)
+        
+        # Üretim zamanlayıcıda sürerken parçalar bu thread'e aktarılır
+        threading.Thread(target=produce, daemon=True).start()
+        
+        while True:
+            text = chunks.get()
+            if text is done:
+                break
+            yield text
+    
+    def chat_completion(
+        self,
+        messages: List[Dict],
+        max_tokens: int = 100,
+        temperature: float = 0.3,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> Dict:
+        """
+        Mesaj listesiyle sohbet tamamlama (arka plan gözlemcisi için).
+        Varsayılan olarak en düşük öncelikle çalışır ve etkileşimli bir
+        istek geldiğinde kesilir (InferenceCancelled).
+        """
+        
+        def run(job):
+            stream = self.llm.create_chat_completion(
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True
+            )
+            
+            content = []
+            for chunk in stream:
+                if job is not None:
+                    job.check_cancelled()
+                content.append(chunk['choices'][0]['delta'].get('content') or "")
+            
+            return {
+                "choices": [{
+                    "message": {"role": "assistant", "content": "".join(content)}
+                }]
+            }
+        
+        return self.scheduler.run(run, priority=priority, name="chat_completion")
+    
+    def summarize_conversation(
+        self,
+        previous_summary: str,
+        turns: List[Dict],
+        max_tokens: int = 160,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> str:
+        """
+        Eski konuşma turlarını mevcut özete katar.
+        Arka plan önceliğinde çalışır; kesilirse InferenceCancelled fırlatır.
+        """
+        prefix = (
+            "Sen bir konuşma özetleyicisisin. Mevcut özeti yeni konuşma "
+            "satırlarıyla birleştir. Kullanıcının tercihlerini, verdiği bilgileri "
+            "ve yarım kalan işleri koru; selamlaşma ve tekrarları at. "
+            "En fazla 5 kısa madde yaz.\n\n"
+        )
+        
+        lines = "\n".join(
+            f"{'Kullanıcı' if t['role'] == 'user' else 'Asistan'}: {t['content']}"
+            for t in turns
+        )
+        prompt = (
+            f"{prefix}MEVCUT ÖZET:\n{previous_summary or '(boş)'}\n\n"
+            f"YENİ SATIRLAR:\n{lines}\n\nGÜNCEL ÖZET:\n"
+        )
+        
+        return self._complete(
+            prompt,
+            prefix,
+            priority=priority,
+            call_type="summarize",
+            max_tokens=max_tokens,
+            temperature=0.2,
+            stop=["YENİ SATIRLAR:", "\n\n\n"]
+        ).strip()
+    
+    def summarize_chunk(
+        self,
+        text: str,
+        max_tokens: int = 160,
+        priority: int = PRIORITY_ANALYSIS
+    ) -> str:
+        """
+        Uzun bir araç çıktısının tek parçasını özetler (map aşaması).
+        Özet soruya bağlı değildir; içerik hash'iyle önbelleğe alınabilir.
+        """
+        prefix = (
+            "Sen bir belge özetleyicisisin. Aşağıdaki metin parçasının önemli "
+            "bilgilerini (isimler, sayılar, tarihler, sonuçlar) kısa maddelerle "
+            "özetle. Yorum ekleme.\n\n"
+        )
+        prompt = f"{prefix}METİN:\n{text}\n\nÖZET:\n"
+        
+        return self._complete(
+            prompt,
+            prefix,
+            priority=priority,
+            call_type="summarize",
+            max_tokens=max_tokens,
+            temperature=0.2,
+            stop=["METİN:", "\n\n\n"]
+        ).strip()
+    
+    def _build_chat_prompt(self, message: str):
+        """Basit sohbet için (önek, tam prompt) çifti"""
+        prefix = "Sen ADAM adlı dostane bir asistansın.\n\n"
+        prompt = f"""{prefix}Kullanıcı: {message}
+Asistan:"""
+        return prefix, prompt
+    
+    def get_stats(self) -> Dict:
+        """Beyin performans sayaçları"""
+        parse = {}
+        for mode, stats in self.parse_stats.items():
+            total = stats["total"]
+            parse[mode] = {
+                **stats,
+                "failure_rate": round(stats["failures"] / total, 3) if total else 0.0
+            }
+        
+        decode = {}
+        for mode, stats in self.decode_stats.items():
+            decode[mode] = {
+                **stats,
+                "tokens_per_sec": round(stats["tokens"] / stats["seconds"], 2) if stats["seconds"] else 0.0
+            }
+        
+        return {
+            "prefix_cache": self.prefix_cache.get_stats(),
+            "decode": decode,
+            "speculative": self.speculative,
+            "early_stop": {**self.early_stop_stats, "last": self.last_early_stop},
+            "scheduler": self.scheduler.get_stats(),
+            "grammar_mode": self.use_grammar,
+            "parse": parse,
+            "last_prompt": self.last_prompt_report
+        }
 
 
 # === TEST BLOĞU ===
@@ -255,4 +853,7 @@ if __name__ == "__main__":
         available_tools=tools
     )
     
-    print(json.dumps(result, indent=2, ensure_ascii=False))
\ No newline at end of file
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    
+    # Önek önbelleği sayaçları
+    print(json.dumps(brain.get_stats(), indent=2))
@@ -0,0 +1,180 @@
+"""
+Conversation Summarizer - Kayan Konuşma Özeti
+Pencereden düşen konuşma turlarını arka planda tek bir özete katlar;
+uzun oturumlarda prompt boyu sabit kalırken eski bağlam kaybolmaz
+"""
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from core.inference_scheduler import InferenceCancelled, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSummarizer:
+    """
+    Oturum başına kalıcı, artımlı konuşma özeti.
+    Özetleme modeli en düşük öncelikle kullanır: etkileşimli bir istek
+    geldiğinde kesilir, bekleyen turlar bir sonraki fırsatta tekrar denenir.
+    """
+
+    def __init__(
+        self,
+        brain,
+        memory_manager,
+        session_id: Optional[str] = None,
+        max_summary_tokens: int = 200,
+        min_turns: int = 2
+    ):
+        """
+        Args:
+            brain: QwenBrain (summarize_conversation, truncate_tokens)
+            memory_manager: Özetin saklandığı veritabanı
+            session_id: Devam edilecek oturum (verilmezse en son güncellenen
+                oturum sürdürülür; hiç kayıt yoksa yeni oturum açılır)
+            max_summary_tokens: Özetin prompt'ta kaplayabileceği en fazla token
+            min_turns: Özetleme için biriktirilecek en az tur
+        """
+        self.brain = brain
+        self.memory = memory_manager
+        self.max_summary_tokens = max_summary_tokens
+        self.min_turns = min_turns
+
+        self.session_id = session_id or self._latest_session() or self._new_session_id()
+        self.summary = ""
+        self.folded_turns = 0
+
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+
+        self.stats = {
+            "folds": 0,
+            "cancelled": 0,
+            "failed": 0
+        }
+
+        self._load()
+
+    @staticmethod
+    def _new_session_id() -> str:
+        # Mikrosaniye: aynı saniyedeki reset() eski oturumu yeniden yüklemesin
+        return datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+
+    def _latest_session(self) -> Optional[str]:
+        """En son güncellenen oturum (tablo conversation_summaries göçüyle gelir)"""
+        try:
+            row = self.memory.db.query_one(
+                "SELECT session_id FROM conversation_summaries "
+                "ORDER BY updated_at DESC, rowid DESC LIMIT 1"
+            )
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Son oturum okunamadı: {e}")
+            return None
+
+    def _load(self):
+        """Oturumun kayıtlı özetini yükler"""
+        try:
+            row = self.memory.db.query_one(
+                "SELECT summary, turns FROM conversation_summaries WHERE session_id = ?",
+                (self.session_id,)
+            )
+            if row:
+                self.summary, self.folded_turns = row[0] or "", row[1] or 0
+                logger.info(f"📝 Oturum özeti yüklendi: {self.session_id}")
+        except sqlite3.Error as e:
+            logger.error(f"Özet okunamadı: {e}")
+
+    def _save(self):
+        try:
+            self.memory.db.write("""
+                INSERT OR REPLACE INTO conversation_summaries
+                    (session_id, summary, turns, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            """, (self.session_id, self.summary, self.folded_turns))
+        except sqlite3.Error as e:
+            logger.error(f"Özet kaydedilemedi: {e}")
+
+    def add_evicted(self, turns: List[Dict]):
+        """Pencereden düşen turları kuyruğa alır ve özetlemeyi tetikler"""
+        if not turns:
+            return
+
+        with self._lock:
+            self._pending.extend(turns)
+
+        self.schedule()
+
+    def schedule(self):
+        """Bekleyen tur varsa arka plan özetlemesini başlatır"""
+        with self._lock:
+            if self._running or len(self._pending) < self.min_turns:
+                return
+            self._running = True
+
+        self._executor.submit(self._fold)
+
+    def _fold(self):
+        """Bekleyen turları mevcut özete katar (summarizer thread'i)"""
+        with self._lock:
+            turns = list(self._pending)
+            session_id = self.session_id
+
+        try:
+            summary = self.brain.summarize_conversation(
+                self.summary,
+                turns,
+                priority=PRIORITY_BACKGROUND
+            )
+            summary = self.brain.truncate_tokens(summary, self.max_summary_tokens)
+
+            with self._lock:
+                if session_id != self.session_id:
+                    return  # Bu sırada oturum sıfırlandı
+                # Özetleme sürerken gelen turlar kuyrukta kalır
+                del self._pending[:len(turns)]
+                if summary:
+                    self.summary = summary
+                self.folded_turns += len(turns)
+
+            self._save()
+            self.stats["folds"] += 1
+            logger.info(f"📝 {len(turns)} tur özete katıldı (toplam {self.folded_turns})")
+
+        except InferenceCancelled:
+            self.stats["cancelled"] += 1
+            logger.info("📝 Özetleme ertelendi (öncelikli istek)")
+
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Özetleme hatası: {e}")
+
+        finally:
+            with self._lock:
+                self._running = False
+
+    def reset(self, session_id: Optional[str] = None):
+        """Yeni oturum başlatır (eski özet veritabanında kalır)"""
+        with self._lock:
+            self._pending = []
+            self.summary = ""
+            self.folded_turns = 0
+            self.session_id = session_id or self._new_session_id()
+        self._load()
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "session_id": self.session_id,
+            "folded_turns": self.folded_turns,
+            "pending_turns": len(self._pending),
+            "summary_chars": len(self.summary)
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
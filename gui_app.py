@@ -6,6 +6,7 @@ import threading
 import datetime
 import logging
 import re # Regex parser için
+from typing import Dict
 import customtkinter as ctk
 from tkinter import scrolledtext
 import tkinter as tk
@@ -27,12 +28,18 @@ except ImportError:
 from core.decision_engine import DecisionEngine
 from memory.manager import MemoryManager  # Yeni yol
 from memory.profile_manager import ProfileManager  # Yeni modül
+from memory.retention import RetentionManager
 from modules.observer import GhostObserver
+from modules.tracing import tracer
 
 
 DB_PATH = "db/project.db"
 SCHEMA_PATH = "db_schema.sql"
 MODEL_PATH = "models/qwen_agent.gguf"
+# Etkileşim arşivleme / boyut sınırı (memory/retention.py) isteğe bağlı:
+# ADAM_RETENTION=1. auto_vacuum dönüşümü ayrı bakım adımıdır:
+# python -m memory.retention --convert
+RETENTION_ENABLED = os.environ.get("ADAM_RETENTION", "") not in ("", "0")
 
 # Tema Ayarları
 ctk.set_appearance_mode("Dark")
@@ -46,10 +53,12 @@ class ProjectXGUI:
         
         self.is_processing = False
         self.thinking_id = None
+        self.stream_active = False  # Akışla gelen cevap ekranda mı?
         self.history = [] 
         
         self.brain = None
         self.memory = None
+        self.retention = None
         self.tool_manager = None
         self.ghost = None
         self.user_profile = {} 
@@ -159,6 +168,11 @@ class ProjectXGUI:
             self.memory = MemoryManager(db_path=DB_PATH, schema_path=SCHEMA_PATH)
             self.profile = ProfileManager(self.memory)
             
+            # Eski etkileşimleri arka planda arşivler (ilk tur birkaç dakika sonra)
+            if RETENTION_ENABLED:
+                self.retention = RetentionManager(self.memory)
+                self.retention.start()
+            
             # 2. Merkezi Karar Motorunu Başlat
             self.append_message("Sistem", "🧠 Qwen Brain yükleniyor (İlk açılış 30sn sürebilir)...", "info")
             
@@ -182,6 +196,9 @@ class ProjectXGUI:
             )
             self.observer.start()
             
+            # Ekran durumu, bağlam toplanırken süre sınırıyla okunur
+            self.decision_engine.context_builder.screen_source = self.observer.get_current_state
+            
             # 4. Ses Sistemini Yükle (Eski kod, değişmiyor)
             if VOICE_AVAILABLE:
                 threading.Thread(target=self.init_voice_modules, daemon=True).start()
@@ -245,19 +262,23 @@ class ProjectXGUI:
             # Geri bildirim komutları (!onay, !yanlış)
             if user_input.startswith("!"):
                 command = user_input[1:].lower().strip()
-                response = self.decision_engine.handle_feedback(command)
+                if command == "iz":
+                    # Aşama gecikmeleri (p50/p90/p99, ms); kapalıysa açılır
+                    if not tracer.enabled:
+                        tracer.enable()
+                        response = "⏱️ İzleme açıldı, sonraki isteklerden itibaren ölçülecek."
+                    else:
+                        response = tracer.format_summary()
+                else:
+                    response = self.decision_engine.handle_feedback(command)
             
             # Normal sohbet/komut
             else:
-                # Observer'dan ekran durumunu al
-                screen_data = None
-                if self.observer:
-                    screen_data = self.observer.get_current_state()
-                
-                # Merkezi engine'e gönder
+                # Merkezi engine'e gönder (token'lar geldikçe ekrana yazılır).
+                # Ekran durumu bağlam sağlayıcısı tarafından paralel alınır.
                 response = self.decision_engine.process_input(
                     user_input=user_input,
-                    screen_data=screen_data
+                    on_token=self.on_stream_token
                 )
         
         except Exception as e:
@@ -284,9 +305,43 @@ class ProjectXGUI:
         self.entry_field.configure(state="disabled")
         self.thinking_id = self.append_message("Asistan", "Düşünüyor...", 'info', is_temp=True)
 
-        threading.Thread(target=self.process_brain_thread, args=(user_input,)).start()
+        threading.Thread(target=self.process_input_thread, args=(user_input,)).start()
         return "break"
 
+    # --- AKIŞ (STREAMING) ---
+    def on_stream_token(self, text):
+        """Worker thread'den gelen metin parçasını ana thread'e aktarır"""
+        self.root.after(0, self.append_stream_text, text)
+
+    def append_stream_text(self, text):
+        """Akış mesajına metin ekler, ilk parçada 'Düşünüyor...' yerini alır"""
+        if not self.is_processing: return
+
+        self.chat_display.configure(state="normal")
+
+        if not self.stream_active:
+            if self.thinking_id:
+                self.delete_message(self.thinking_id)
+                self.thinking_id = None
+                self.chat_display.configure(state="normal")
+
+            timestamp = datetime.datetime.now().strftime("%H:%M")
+            self.chat_display.mark_set("stream_start", "end-1c")
+            self.chat_display.mark_gravity("stream_start", "left")
+            self.chat_display.insert("end", f"Asistan [{timestamp}]:\n", "bot")
+            self.stream_active = True
+
+        self.chat_display.insert("end", text, "bot")
+        self.chat_display.configure(state="disabled")
+        self.chat_display.see("end")
+
+    def update_ui_with_response(self, user_input, response):
+        """Akış mesajını nihai cevapla değiştirir"""
+        if self.stream_active:
+            self.delete_message(("stream_start", "end-1c"))
+            self.stream_active = False
+        self.finish_processing(response)
+
     def finish_processing(self, response):
         if self.thinking_id: self.delete_message(self.thinking_id)
         self.append_message("Asistan", response, "bot")
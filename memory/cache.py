@@ -1,9 +1,13 @@
 import sqlite3
 import sys
 
+from memory.codec import decode_text
+
 class CacheManager:
-    def __init__(self, db_path="db/project.db"):
+    def __init__(self, db_path="db/project.db", codec=None):
         self.db_path = db_path
+        # Opsiyonel memory.codec.TextCodec: uzun cevaplar sıkıştırılmış saklanır
+        self.codec = codec
         print("--- Cache (Önbellek) Sistemi Başlatıldı ---", flush=True)
         self._init_db()
 
@@ -41,7 +45,7 @@ class CacheManager:
             
             if result:
                 print(f"⚡ CACHE HIT (BULUNDU)! Cevap veritabanından dönüyor...", flush=True)
-                return result[0]
+                return decode_text(result[0])
             else:
                 print("❌ Cache'de yok. (Yapay zeka devreye girecek)", flush=True)
                 return None
@@ -62,7 +66,7 @@ class CacheManager:
             
             # Varsa güncelle, yoksa ekle (REPLACE)
             cursor.execute("INSERT OR REPLACE INTO response_cache (query_text, response_text) VALUES (?, ?)", 
-                           (normalized_input, response_text))
+                           (normalized_input, self.codec.encode(response_text) if self.codec else response_text))
             conn.commit()
             conn.close()
             print(f"💾 CACHE SAVED: '{normalized_input}' veritabanına kaydedildi.", flush=True)
@@ -0,0 +1,129 @@
+"""
+Text Codec - Büyük Metin Sütunları İçin Şeffaf Sıkıştırma
+Eşiği aşan metinler işaretli BLOB olarak (zlib / lzma) saklanır, okurken
+açılır. İşaretsiz değerler (düz TEXT, eski kayıtlar) olduğu gibi döner.
+
+Sıkıştırma bir kez açılan veritabanında FTS tetikleyicileri adam_decode SQL
+fonksiyonunu çağırır. memory / interactions tablolarına yazan her bağlantı
+önce register_sql_functions(conn) çağırmalıdır; sqlite3 komut satırından
+okumak serbesttir, yazmak "no such function" hatası verir. Arşiv
+(archive.db) sıkıştırılmış değerleri olduğu gibi taşır, okurken
+decode_text gerekir.
+"""
+import lzma
+import zlib
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# BLOB başı: işaret + yöntem baytı. Düz metin TEXT olarak saklandığı için
+# işaret yalnızca BLOB'lar arasında ayırt edicidir.
+MARKER = b"\x1fAZ"
+_METHOD_TAGS = {"zlib": b"z", "lzma": b"x"}
+_TAG_METHODS = {tag: method for method, tag in _METHOD_TAGS.items()}
+
+# FTS tetikleyicileri ve SQL sorguları için kayıtlı fonksiyon adı
+SQL_DECODE_FUNCTION = "adam_decode"
+
+
+def is_compressed(value: Any) -> bool:
+    return isinstance(value, bytes) and value[:len(MARKER)] == MARKER
+
+
+def decode_text(value: Any) -> Any:
+    """
+    Sıkıştırılmış değeri açar; diğer her şeyi (str, None, işaretsiz BLOB)
+    olduğu gibi döndürür. Yöntem BLOB'un içinde yazılı olduğu için codec
+    ayarından bağımsızdır.
+    """
+    if not is_compressed(value):
+        return value
+    method = _TAG_METHODS.get(value[len(MARKER):len(MARKER) + 1])
+    payload = value[len(MARKER) + 1:]
+    if method == "zlib":
+        return zlib.decompress(payload).decode("utf-8")
+    if method == "lzma":
+        return lzma.decompress(payload).decode("utf-8")
+    raise ValueError("Bilinmeyen sıkıştırma yöntemi")
+
+
+def register_sql_functions(conn):
+    """adam_decode'u bir sqlite3 bağlantısına kaydeder (harici betikler için)"""
+    conn.create_function(SQL_DECODE_FUNCTION, 1, decode_text, deterministic=True)
+
+
+class TextCodec:
+    """
+    Yazarken sıkıştıran codec (okuma tarafı: decode_text).
+
+    Sadece threshold baytı aşan ve en az min_saving oranında küçülen
+    metinler sıkıştırılır; kısa cevaplar TEXT kalır (FTS ve LIKE onlarda
+    doğrudan çalışır, açma maliyeti olmaz).
+    """
+
+    def __init__(
+        self,
+        method: str = "zlib",
+        threshold: int = 1024,
+        level: Optional[int] = None,
+        min_saving: float = 0.1,
+        enabled: bool = True
+    ):
+        """
+        Args:
+            method: "zlib" (hızlı) veya "lzma" (daha küçük, daha yavaş)
+            threshold: Bu boyuttan (UTF-8 bayt) kısa metinler sıkıştırılmaz
+            level: Sıkıştırma seviyesi (zlib 1-9, lzma preset 0-9)
+            min_saving: Kazanç bu orandan azsa düz metin saklanır
+            enabled: False ise encode hiçbir şeyi sıkıştırmaz (decode yine çalışır)
+        """
+        if method not in _METHOD_TAGS:
+            raise ValueError(f"Desteklenmeyen yöntem: {method}")
+
+        self.method = method
+        self.threshold = threshold
+        self.level = 6 if level is None else level
+        self.min_saving = min_saving
+        self.enabled = enabled
+
+        self.stats = {
+            "encoded": 0,
+            "skipped": 0,
+            "raw_bytes": 0,
+            "stored_bytes": 0
+        }
+
+    def encode(self, value: Any) -> Any:
+        """Metni saklanacak biçime çevirir (str veya işaretli bytes)"""
+        if not self.enabled or not isinstance(value, str):
+            return value
+
+        raw = value.encode("utf-8")
+        if len(raw) < self.threshold:
+            return value
+
+        if self.method == "zlib":
+            payload = zlib.compress(raw, self.level)
+        else:
+            payload = lzma.compress(raw, preset=self.level)
+
+        stored = MARKER + _METHOD_TAGS[self.method] + payload
+        if len(stored) > len(raw) * (1 - self.min_saving):
+            self.stats["skipped"] += 1
+            return value
+
+        self.stats["encoded"] += 1
+        self.stats["raw_bytes"] += len(raw)
+        self.stats["stored_bytes"] += len(stored)
+        return stored
+
+    def get_stats(self) -> Dict:
+        raw = self.stats["raw_bytes"]
+        return {
+            **self.stats,
+            "method": self.method,
+            "threshold": self.threshold,
+            "enabled": self.enabled,
+            "ratio": round(self.stats["stored_bytes"] / raw, 3) if raw else None
+        }
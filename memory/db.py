@@ -0,0 +1,317 @@
+"""
+Connection Manager - Thread Güvenli SQLite Erişim Katmanı
+WAL modunda tek yazıcı bağlantısı + thread başına salt okunur bağlantılar.
+Okumalar yazmaların arkasında beklemez; yazmalar tek kilit altında sıralanır.
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from modules.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """
+    SQLite bağlantı yöneticisi.
+
+    - Yazıcı: tek bağlantı, RLock ile sıralanır (write / transaction)
+    - Okuyucu: her thread kendi salt okunur bağlantısını açar (query)
+    - Her bağlantı hazırlanmış ifadeleri önbellekte tutar (cached_statements)
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        cache_size_kb: int = 8192,
+        mmap_size: int = 64 * 1024 * 1024,
+        busy_timeout_ms: int = 5000,
+        statement_cache: int = 256
+    ):
+        """
+        Args:
+            db_path: Veritabanı dosyası
+            cache_size_kb: Bağlantı başına sayfa önbelleği (KB)
+            mmap_size: Bellek eşlemeli okuma sınırı (bayt)
+            busy_timeout_ms: Kilitli veritabanında bekleme süresi
+            statement_cache: Bağlantı başına hazırlanmış ifade sayısı
+        """
+        self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.statement_cache = statement_cache
+
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+        # Her bağlantıya (sonradan açılanlar dahil) kaydedilen SQL fonksiyonları
+        self._functions: Dict[str, Tuple[int, Callable]] = {}
+
+        self.stats = {
+            "reads": 0,
+            "writes": 0,
+            "transactions": 0,
+            "write_wait_ms": 0.0,
+            "max_write_wait_ms": 0.0
+        }
+
+        self.writer = self._open_writer()
+        self.journal_mode = self.writer.execute("PRAGMA journal_mode").fetchone()[0]
+
+        logger.info(f"🗄️ SQLite bağlantı yöneticisi hazır ({self.journal_mode})")
+
+    # === BAĞLANTILAR ===
+
+    def _open_writer(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.statement_cache
+        )
+        conn.row_factory = sqlite3.Row
+
+        # WAL: okuyucular yazıcıyı, yazıcı okuyucuları beklemez
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL ile NORMAL güvenlidir; commit başına fsync yapılmaz
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # INSERT OR REPLACE'ın sildiği satır için DELETE tetikleyicileri de
+        # çalışsın (FTS indeksleri tetikleyicilerle güncel tutulur)
+        conn.execute("PRAGMA recursive_triggers=ON")
+        self._apply_common_pragmas(conn)
+        return conn
+
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.statement_cache
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=ON")
+        self._apply_common_pragmas(conn)
+        return conn
+
+    def _apply_common_pragmas(self, conn: sqlite3.Connection):
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        for name, (nargs, fn) in self._functions.items():
+            conn.create_function(name, nargs, fn, deterministic=True)
+
+    def create_function(self, name: str, nargs: int, fn: Callable):
+        """
+        Deterministik SQL fonksiyonu kaydeder (tetikleyiciler ve sorgular için).
+        Açık bağlantılara hemen, yeni okuyuculara açılırken eklenir.
+        """
+        self._functions[name] = (nargs, fn)
+        with self._write_lock:
+            self.writer.create_function(name, nargs, fn, deterministic=True)
+        with self._readers_lock:
+            for _, conn in self._readers:
+                conn.create_function(name, nargs, fn, deterministic=True)
+
+    def reader(self) -> sqlite3.Connection:
+        """Bu thread'in salt okunur bağlantısı (ilk kullanımda açılır)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Bağlantı yöneticisi kapatıldı")
+            conn = self._open_reader()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._prune_readers()
+                self._readers.append((threading.current_thread(), conn))
+        return conn
+
+    def _prune_readers(self):
+        """Biten thread'lerin bağlantılarını kapatır (kilit altında çağrılır)"""
+        alive = []
+        for thread, conn in self._readers:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+        self._readers = alive
+
+    # === OKUMA ===
+
+    def query(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        """SELECT çalıştırır, tüm satırları döndürür"""
+        rows = self.reader().execute(sql, params).fetchall()
+        self.stats["reads"] += 1
+        return rows
+
+    def query_one(self, sql: str, params: Sequence = ()) -> Optional[sqlite3.Row]:
+        """SELECT çalıştırır, ilk satırı döndürür (yoksa None)"""
+        cursor = self.reader().execute(sql, params)
+        try:
+            row = cursor.fetchone()
+        finally:
+            # Okuma transaction'ı açık kalmasın (WAL checkpoint'i bekletir)
+            cursor.close()
+        self.stats["reads"] += 1
+        return row
+
+    # === YAZMA ===
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Yazıcı kilidi altında tek transaction.
+        Blok hatasız biterse commit, hata olursa rollback yapılır.
+        """
+        started = time.time()
+        with self._write_lock:
+            waited = (time.time() - started) * 1000
+            self.stats["transactions"] += 1
+            self.stats["write_wait_ms"] += waited
+            self.stats["max_write_wait_ms"] = max(self.stats["max_write_wait_ms"], waited)
+
+            cursor = self.writer.cursor()
+            try:
+                yield cursor
+                with tracer.span("sqlite.commit"):
+                    self.writer.commit()
+            except BaseException:
+                self.writer.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def write(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """
+        Tek yazma ifadesi + commit.
+
+        Returns:
+            Kapalı cursor (lastrowid / rowcount okunabilir)
+        """
+        with self.transaction() as cursor:
+            cursor.execute(sql, params)
+        self.stats["writes"] += 1
+        return cursor
+
+    def write_many(self, sql: str, seq: Iterable[Sequence]) -> int:
+        """Aynı ifadeyi birden çok parametreyle tek transaction'da çalıştırır"""
+        with self.transaction() as cursor:
+            cursor.executemany(sql, seq)
+            count = cursor.rowcount
+        self.stats["writes"] += 1
+        return count
+
+    def write_script(self, script: str):
+        """Şema betikleri (executescript kendi commit'ini yapar)"""
+        with self._write_lock:
+            self.writer.executescript(script)
+
+    # === YÖNETİM ===
+
+    def checkpoint(self, mode: str = "PASSIVE"):
+        """WAL dosyasını ana veritabanına aktarır"""
+        with self._write_lock:
+            return tuple(self.writer.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+
+    def pragma(self, name: str, value=None):
+        """Yazıcı bağlantısında PRAGMA okur / ayarlar"""
+        with self._write_lock:
+            if value is None:
+                row = self.writer.execute(f"PRAGMA {name}").fetchone()
+            else:
+                row = self.writer.execute(f"PRAGMA {name}={value}").fetchone()
+            return row[0] if row else None
+
+    def attach(self, path: str, alias: str):
+        """Başka bir veritabanını yazıcı bağlantısına ekler (zaten ekliyse dokunmaz)"""
+        with self._write_lock:
+            attached = {row[1] for row in self.writer.execute("PRAGMA database_list")}
+            if alias not in attached:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self.writer.execute("ATTACH DATABASE ? AS " + alias, (path,))
+
+    def vacuum(self):
+        """Tam VACUUM (auto_vacuum modunu değiştirmek için gerekir; yavaş)"""
+        with self._write_lock:
+            self.writer.execute("VACUUM")
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """
+        En fazla `pages` boş sayfayı dosyadan atar (auto_vacuum=INCREMENTAL).
+
+        Returns:
+            Serbest bırakılan sayfa sayısı
+        """
+        with self._write_lock:
+            before = self.writer.execute("PRAGMA freelist_count").fetchone()[0]
+            # execute() bu pragmayı tek adım çalıştırır (tek sayfa);
+            # executescript sonuna kadar çalıştırır
+            self.writer.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            after = self.writer.execute("PRAGMA freelist_count").fetchone()[0]
+            return before - after
+
+    def size_info(self) -> dict:
+        """Sayfa bazında boyut: toplam, boş (freelist) ve dosya boyutları (bayt)"""
+        with self._write_lock:
+            page_size = self.writer.execute("PRAGMA page_size").fetchone()[0]
+            page_count = self.writer.execute("PRAGMA page_count").fetchone()[0]
+            freelist = self.writer.execute("PRAGMA freelist_count").fetchone()[0]
+
+        wal_path = self.db_path + "-wal"
+        return {
+            "page_size": page_size,
+            "total_bytes": page_count * page_size,
+            "free_bytes": freelist * page_size,
+            "live_bytes": (page_count - freelist) * page_size,
+            "file_bytes": os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        }
+
+    def close(self):
+        """Tüm bağlantıları kapatır"""
+        if self._closed:
+            return
+        self._closed = True
+
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for _, conn in readers:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+        with self._write_lock:
+            try:
+                self.writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                logger.warning(f"WAL checkpoint başarısız: {e}")
+            self.writer.close()
+
+    def get_stats(self) -> dict:
+        transactions = self.stats["transactions"]
+        with self._readers_lock:
+            readers = len(self._readers)
+        return {
+            **self.stats,
+            "journal_mode": self.journal_mode,
+            "reader_connections": readers,
+            "avg_write_wait_ms": (
+                round(self.stats["write_wait_ms"] / transactions, 2) if transactions else 0.0
+            )
+        }
@@ -0,0 +1,304 @@
+"""
+Memory Index - Kalıcı Hafıza İçin Vektör İndeksi
+memory tablosundaki (key + value) kayıtların embedding'lerini RAM'de bir
+matriste tutar; sorgu başına tek matris çarpımıyla top-k döner
+"""
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from memory.codec import decode_text
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryIndex:
+    """
+    memory tablosunun semantik indeksi.
+    Vektörler memory_embeddings tablosunda saklanır, açılışta warm_up ile
+    arka planda yüklenir; eksik olanlar toplu olarak hesaplanır. MemoryManager
+    promote_to_memory / invalidate_last ile indeksi güncel tutar.
+
+    Model yükleme, backfill ve add/remove kodlamaları indeksin kendi tek
+    thread'lik havuzunda sırayla çalışır: yazma kuyruğu (write-behind) ve
+    bağlam havuzu embedding beklemez. Yükleme bitene kadar search None
+    döner, çağıran tam metin aramasına düşer.
+    """
+
+    def __init__(
+        self,
+        memory_manager,
+        embedder,
+        min_score: float = 0.35,
+        batch_size: int = 64
+    ):
+        """
+        Args:
+            memory_manager: MemoryManager örneği
+            embedder: memory.embeddings.TextEmbedder
+            min_score: Bu benzerliğin altındaki kayıtlar döndürülmez
+            batch_size: Eksik vektörler hesaplanırken parti boyu
+        """
+        self.memory = memory_manager
+        self.embedder = embedder
+        self.min_score = min_score
+        self.batch_size = batch_size
+
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = None  # (kapasite, dim) - ilk self._size satırı dolu
+        self._size = 0
+
+        # Yükleme ve güncellemeler tek worker'da: sıra korunur
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-index")
+        self._warmup: Optional[Future] = None
+
+        self.stats = {
+            "searches": 0,
+            "hits": 0,
+            "added": 0,
+            "removed": 0,
+            "backfilled": 0,
+            "search_ms": 0.0
+        }
+
+    @property
+    def available(self) -> bool:
+        return NUMPY_AVAILABLE and self.embedder is not None and self.embedder.available
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _text(key: str, value: str) -> str:
+        return f"{key}\n{value or ''}"
+
+    # === RAM MATRİSİ ===
+
+    def _ensure_capacity(self, dim: int):
+        """Matris dolduysa kapasiteyi ikiye katlar (ekleme O(1) amortize)"""
+        if self._matrix is None:
+            self._matrix = np.zeros((256, dim), dtype=np.float32)
+        elif self._size >= len(self._matrix):
+            grown = np.zeros((len(self._matrix) * 2, dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+
+    def _put(self, key: str, vector: "np.ndarray"):
+        row = self._rows.get(key)
+        if row is None:
+            self._ensure_capacity(len(vector))
+            row = self._size
+            self._size += 1
+            self._keys.append(key)
+            self._rows[key] = row
+        self._matrix[row] = vector
+
+    def _drop(self, key: str) -> bool:
+        """Satırı son satırla yer değiştirerek siler"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+
+        last = self._size - 1
+        if row != last:
+            moved = self._keys[last]
+            self._matrix[row] = self._matrix[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+
+        self._keys.pop()
+        self._size -= 1
+        return True
+
+    # === YÜKLEME ===
+
+    def warm_up(self) -> Optional[Future]:
+        """Yüklemeyi arka planda başlatır (açılışta bir kez çağrılır)"""
+        if self._loaded or not self.available:
+            return None
+        with self._lock:
+            if self._warmup is None or (self._warmup.done() and not self._loaded):
+                self._warmup = self._executor.submit(self.ensure_loaded)
+            return self._warmup
+
+    def ensure_loaded(self):
+        """Kayıtlı vektörleri yükler, eksikleri hesaplar (bir kez)"""
+        if self._loaded or not self.available:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+
+            started = time.time()
+            model = self.embedder.model_name
+
+            try:
+                rows = self.memory.db.query("""
+                    SELECT m.key, m.value, e.vector, e.model
+                    FROM memory m
+                    LEFT JOIN memory_embeddings e ON e.key = m.key
+                    WHERE m.status = 'valid'
+                """)
+            except sqlite3.Error as e:
+                logger.error(f"Hafıza indeksi yüklenemedi: {e}")
+                return
+
+            missing = []
+            for key, value, blob, vec_model in rows:
+                if blob is not None and vec_model == model:
+                    self._put(key, np.frombuffer(blob, dtype=np.float32))
+                else:
+                    missing.append((key, decode_text(value)))
+
+            for i in range(0, len(missing), self.batch_size):
+                batch = missing[i:i + self.batch_size]
+                vectors = self.embedder.encode([self._text(k, v) for k, v in batch])
+                if vectors is None:
+                    break
+                for (key, _), vector in zip(batch, vectors):
+                    self._put(key, vector)
+                self._persist([(key, vector) for (key, _), vector in zip(batch, vectors)])
+                self.stats["backfilled"] += len(batch)
+
+            self._loaded = True
+            logger.info(
+                f"🧬 Hafıza indeksi: {self._size} kayıt "
+                f"({len(missing)} yeni hesaplandı, {(time.time() - started) * 1000:.0f} ms)"
+            )
+
+    def _persist(self, items: List[Tuple[str, "np.ndarray"]]):
+        try:
+            self.memory.db.write_many("""
+                INSERT OR REPLACE INTO memory_embeddings (key, model, dim, vector)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (key, self.embedder.model_name, len(vector), vector.astype(np.float32).tobytes())
+                for key, vector in items
+            ])
+        except sqlite3.Error as e:
+            logger.error(f"Embedding kaydedilemedi: {e}")
+
+    # === GÜNCELLEME ===
+
+    def add(self, key: str, value: str) -> Optional[Future]:
+        """Kaydı ekler veya vektörünü yeniler (indeks thread'inde)"""
+        if not self.available:
+            return None
+        return self._submit(self._add, key, value)
+
+    def _submit(self, fn, *args) -> Future:
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future):
+        """İndeks hatası hafıza kaydını bozmasın; sadece loglanır"""
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Hafıza indeksi güncellenemedi: {future.exception()}")
+
+    def _add(self, key: str, value: str):
+        self.ensure_loaded()
+        vectors = self.embedder.encode([self._text(key, value)])
+        if vectors is None:
+            return
+
+        with self._lock:
+            self._put(key, vectors[0])
+            self._persist([(key, vectors[0])])
+        self.stats["added"] += 1
+
+    def remove(self, key: str) -> Optional[Future]:
+        """Geçersiz kılınan kaydı indeksten çıkarır (indeks thread'inde)"""
+        if not self.available:
+            return None
+        return self._submit(self._remove, key)
+
+    def _remove(self, key: str):
+        with self._lock:
+            removed = self._drop(key)
+            try:
+                self.memory.db.write("DELETE FROM memory_embeddings WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                logger.error(f"Embedding silinemedi: {e}")
+
+        if removed:
+            self.stats["removed"] += 1
+
+    # === ARAMA ===
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 2,
+        min_score: Optional[float] = None
+    ) -> Optional[List[Tuple[str, float]]]:
+        """
+        En benzer anahtarlar.
+
+        Returns:
+            [(key, skor), ...] skor sırasıyla; indeks kullanılamıyorsa veya
+            henüz yüklenmediyse None
+        """
+        if not self.available:
+            return None
+
+        if not self._loaded:
+            # Bağlam süresi içinde model yüklenmez; yükleme arka planda
+            self.warm_up()
+            return None
+
+        threshold = self.min_score if min_score is None else min_score
+
+        query_vec = self.embedder.encode([query])
+        if query_vec is None:
+            return None
+
+        started = time.time()
+
+        with self._lock:
+            if self._size == 0:
+                return []
+
+            scores = self._matrix[:self._size] @ query_vec[0]
+            k = min(top_k, self._size)
+
+            # Tam sıralama yerine kısmi seçim: O(n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = [
+                (self._keys[i], float(scores[i]))
+                for i in top
+                if scores[i] >= threshold
+            ]
+
+        self.stats["searches"] += 1
+        self.stats["hits"] += len(results)
+        self.stats["search_ms"] += (time.time() - started) * 1000
+        return results
+
+    def get_stats(self) -> Dict:
+        searches = self.stats["searches"]
+        return {
+            **self.stats,
+            "size": self._size,
+            "available": self.available,
+            "loaded": self._loaded,
+            "avg_search_ms": round(self.stats["search_ms"] / searches, 2) if searches else 0.0
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
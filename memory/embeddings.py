@@ -0,0 +1,80 @@
+"""
+Text Embedder - Paylaşılan Cümle Vektörü Modeli
+Araç seçimi ve semantik hafıza araması aynı modeli kullanır
+"""
+import logging
+import threading
+from typing import List, Optional
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+    logging.warning("sentence-transformers yok, semantik arama devre dışı")
+
+logger = logging.getLogger(__name__)
+
+
+class TextEmbedder:
+    """
+    SentenceTransformer sarmalayıcısı.
+    Model ilk kullanımda yüklenir; vektörler birim uzunluğa normalize edilir,
+    böylece benzerlik basit bir iç çarpımdır.
+    """
+
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"):
+        self.model_name = model_name
+        self.model = None
+        self._failed = not EMBEDDINGS_AVAILABLE
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return not self._failed
+
+    @property
+    def dim(self) -> Optional[int]:
+        """Vektör boyutu (model yüklenmediyse None)"""
+        if not self._load():
+            return None
+        return self.model.get_sentence_embedding_dimension()
+
+    def _load(self) -> bool:
+        """Modeli bir kez yükler"""
+        if self.model is not None:
+            return True
+        if self._failed:
+            return False
+
+        with self._lock:
+            if self.model is None and not self._failed:
+                try:
+                    logger.info(f"🧬 Embedding modeli yükleniyor: {self.model_name}")
+                    self.model = SentenceTransformer(self.model_name)
+                except Exception as e:
+                    logger.warning(f"Embedding modeli yüklenemedi: {e}")
+                    self._failed = True
+
+        return self.model is not None
+
+    def encode(self, texts: List[str]) -> Optional["np.ndarray"]:
+        """
+        Metinleri (n, dim) float32 matrisine çevirir.
+        Model yoksa None döner.
+        """
+        if not texts or not self._load():
+            return None
+
+        try:
+            vectors = self.model.encode(
+                texts,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            return vectors.astype(np.float32)
+        except Exception as e:
+            logger.error(f"Embedding hatası: {e}")
+            return None
@@ -5,147 +5,825 @@ import sqlite3
 import os
 import logging
 import re
+import time
+import unicodedata
+from typing import Dict, List, Optional
+from memory.codec import SQL_DECODE_FUNCTION, TextCodec, decode_text
+from memory.db import ConnectionManager
+from memory.write_behind import WriteBehindWriter
 
 logger = logging.getLogger(__name__)
 
+# Şema göçleri: (numara, ad, ifadeler). Yalnızca sona eklenir, eskiler
+# değiştirilmez; uygulananlar versions tablosuna component='schema' olarak yazılır.
+MIGRATIONS = [
+    (1, "base_schema", [
+        """CREATE TABLE IF NOT EXISTS interactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            user_input TEXT,
+            stt_confidence REAL,
+            retrieved_sources TEXT,
+            summary TEXT,
+            response_text TEXT,
+            model_version TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS memory (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            provenance TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_by TEXT,
+            status TEXT DEFAULT 'valid',
+            version INTEGER DEFAULT 1
+        )""",
+        """CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            interaction_id INTEGER,
+            feedback_type TEXT,
+            score INTEGER,
+            comment TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        """CREATE TABLE IF NOT EXISTS todo_list (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task TEXT,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        """CREATE TABLE IF NOT EXISTS sources (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT,
+            title TEXT,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        """CREATE TABLE IF NOT EXISTS user_profile (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )""",
+    ]),
+    # get_last_interaction: ORDER BY timestamp DESC LIMIT 1
+    (2, "idx_interactions_timestamp", [
+        "CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp)",
+    ]),
+    # _get_relevant_memories: WHERE status = 'valid' ORDER BY created_at DESC
+    (3, "idx_memory_status_created", [
+        "CREATE INDEX IF NOT EXISTS idx_memory_status_created ON memory(status, created_at)",
+    ]),
+    (4, "idx_feedback_interaction", [
+        "CREATE INDEX IF NOT EXISTS idx_feedback_interaction ON feedback(interaction_id)",
+    ]),
+    # Tam metin arama: içerik asıl tablolarda, FTS sadece indeks (external content)
+    (5, "fts_memory", [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+            key, value,
+            content='memory', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS memory_fts_ai AFTER INSERT ON memory BEGIN
+            INSERT INTO memory_fts(rowid, key, value) VALUES (new.rowid, new.key, new.value);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS memory_fts_ad AFTER DELETE ON memory BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, key, value)
+            VALUES ('delete', old.rowid, old.key, old.value);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS memory_fts_au AFTER UPDATE OF key, value ON memory BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, key, value)
+            VALUES ('delete', old.rowid, old.key, old.value);
+            INSERT INTO memory_fts(rowid, key, value) VALUES (new.rowid, new.key, new.value);
+        END""",
+        "INSERT INTO memory_fts(memory_fts) VALUES ('rebuild')",
+    ]),
+    (6, "fts_interactions", [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+            user_input, response_text,
+            content='interactions', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS interactions_fts_ai AFTER INSERT ON interactions BEGIN
+            INSERT INTO interactions_fts(rowid, user_input, response_text)
+            VALUES (new.id, new.user_input, new.response_text);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS interactions_fts_ad AFTER DELETE ON interactions BEGIN
+            INSERT INTO interactions_fts(interactions_fts, rowid, user_input, response_text)
+            VALUES ('delete', old.id, old.user_input, old.response_text);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS interactions_fts_au
+        AFTER UPDATE OF user_input, response_text ON interactions BEGIN
+            INSERT INTO interactions_fts(interactions_fts, rowid, user_input, response_text)
+            VALUES ('delete', old.id, old.user_input, old.response_text);
+            INSERT INTO interactions_fts(rowid, user_input, response_text)
+            VALUES (new.id, new.user_input, new.response_text);
+        END""",
+        "INSERT INTO interactions_fts(interactions_fts) VALUES ('rebuild')",
+    ]),
+    # 7 boş: sıkıştırmaya özel FTS tetikleyicileri şema göçü değil, sadece
+    # sıkıştırma açıkken kurulur (CODEC_FTS_STATEMENTS)
+    # core/summarizer.py: oturum başına kayan konuşma özeti
+    (8, "conversation_summaries", [
+        """CREATE TABLE IF NOT EXISTS conversation_summaries (
+            session_id TEXT PRIMARY KEY,
+            summary TEXT,
+            turns INTEGER DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )""",
+        """CREATE INDEX IF NOT EXISTS idx_conversation_summaries_updated
+        ON conversation_summaries(updated_at)""",
+    ]),
+    # core/content_analyzer.py: parça özeti önbelleği (içerik hash'i -> özet)
+    (9, "content_summaries", [
+        """CREATE TABLE IF NOT EXISTS content_summaries (
+            hash TEXT PRIMARY KEY,
+            summary TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ]),
+    # memory/embedding_index.py: memory kayıtlarının kalıcı vektörleri
+    (10, "memory_embeddings", [
+        """CREATE TABLE IF NOT EXISTS memory_embeddings (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            dim INTEGER,
+            vector BLOB,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ]),
+]
+
+# Sıkıştırma açıkken (memory/codec.py) FTS içeriği adam_decode ile açan
+# görünümlerden okunur ve tetikleyiciler açılmış metni indeksler; rebuild ve
+# integrity-check düz metni görür. Güncelleme tetikleyicisi metin değişmediyse
+# (sadece sıkıştırma) çalışmaz.
+# DİKKAT: kurulduktan sonra memory / interactions tablolarına yazan her
+# bağlantıda adam_decode kayıtlı olmalıdır (memory.codec.register_sql_functions);
+# sqlite3 komut satırı gibi fonksiyonsuz bağlantılardan yazmak hata verir.
+CODEC_FTS_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS memory_fts_ai",
+    "DROP TRIGGER IF EXISTS memory_fts_ad",
+    "DROP TRIGGER IF EXISTS memory_fts_au",
+    "DROP TABLE IF EXISTS memory_fts",
+    """CREATE VIEW IF NOT EXISTS memory_fts_source AS
+        SELECT rowid AS id, key, adam_decode(value) AS value FROM memory""",
+    """CREATE VIRTUAL TABLE memory_fts USING fts5(
+        key, value,
+        content='memory_fts_source', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER memory_fts_ai AFTER INSERT ON memory BEGIN
+        INSERT INTO memory_fts(rowid, key, value)
+        VALUES (new.rowid, new.key, adam_decode(new.value));
+    END""",
+    """CREATE TRIGGER memory_fts_ad AFTER DELETE ON memory BEGIN
+        INSERT INTO memory_fts(memory_fts, rowid, key, value)
+        VALUES ('delete', old.rowid, old.key, adam_decode(old.value));
+    END""",
+    """CREATE TRIGGER memory_fts_au AFTER UPDATE OF key, value ON memory
+    WHEN old.key IS NOT new.key OR adam_decode(old.value) IS NOT adam_decode(new.value) BEGIN
+        INSERT INTO memory_fts(memory_fts, rowid, key, value)
+        VALUES ('delete', old.rowid, old.key, adam_decode(old.value));
+        INSERT INTO memory_fts(rowid, key, value)
+        VALUES (new.rowid, new.key, adam_decode(new.value));
+    END""",
+    "INSERT INTO memory_fts(memory_fts) VALUES ('rebuild')",
+    "DROP TRIGGER IF EXISTS interactions_fts_ai",
+    "DROP TRIGGER IF EXISTS interactions_fts_ad",
+    "DROP TRIGGER IF EXISTS interactions_fts_au",
+    "DROP TABLE IF EXISTS interactions_fts",
+    """CREATE VIEW IF NOT EXISTS interactions_fts_source AS
+        SELECT id, user_input, adam_decode(response_text) AS response_text FROM interactions""",
+    """CREATE VIRTUAL TABLE interactions_fts USING fts5(
+        user_input, response_text,
+        content='interactions_fts_source', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER interactions_fts_ai AFTER INSERT ON interactions BEGIN
+        INSERT INTO interactions_fts(rowid, user_input, response_text)
+        VALUES (new.id, new.user_input, adam_decode(new.response_text));
+    END""",
+    """CREATE TRIGGER interactions_fts_ad AFTER DELETE ON interactions BEGIN
+        INSERT INTO interactions_fts(interactions_fts, rowid, user_input, response_text)
+        VALUES ('delete', old.id, old.user_input, adam_decode(old.response_text));
+    END""",
+    """CREATE TRIGGER interactions_fts_au
+    AFTER UPDATE OF user_input, response_text ON interactions
+    WHEN old.user_input IS NOT new.user_input
+      OR adam_decode(old.response_text) IS NOT adam_decode(new.response_text) BEGIN
+        INSERT INTO interactions_fts(interactions_fts, rowid, user_input, response_text)
+        VALUES ('delete', old.id, old.user_input, adam_decode(old.response_text));
+        INSERT INTO interactions_fts(rowid, user_input, response_text)
+        VALUES (new.id, new.user_input, adam_decode(new.response_text));
+    END""",
+    "INSERT INTO interactions_fts(interactions_fts) VALUES ('rebuild')",
+]
+
+# Codec ile sıkıştırılabilen sütunlar: (tablo, satır anahtarı, sütun)
+COMPRESSED_COLUMNS = [
+    ("interactions", "id", "response_text"),
+    ("memory", "rowid", "value"),
+]
+
+# Kaba kök: uzun kelimelerin son FTS_SUFFIX_TRIM harfi atılır, kök en az
+# FTS_MIN_STEM harf kalır (Türkçe ekler: "havalar" -> "hava*", "başkenti" -> "baske*")
+FTS_MIN_STEM = 4
+FTS_SUFFIX_TRIM = 3
+
+# Soru/bağlaç kelimeleri aramaya ve eşleşme skoruna katılmaz
+FTS_STOPWORDS = {
+    "ne", "nedir", "neden", "nasil", "nasıl", "hangi", "kim", "kac", "kaç", "nerede",
+    "neresi", "mi", "mı", "mu", "mü", "bir", "bu", "su", "şu", "ve", "ile", "da", "de",
+    "icin", "için", "ki", "ya", "acaba"
+}
+
+# Kesme işaretinden sonraki çekim eki ("Ankara'nın", "Python'da") terim değildir
+_APOSTROPHE_SUFFIX = re.compile(r"['’]\w*")
+
+
+def _fold(text: str) -> str:
+    """Küçük harf + aksan temizliği (FTS tokenizer'ı ile aynı karşılaştırma)"""
+    text = text.replace("İ", "i").replace("I", "ı").lower()
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def _fts_terms(text: str) -> List[str]:
+    """Metnin kaba kökleri (tek harfliler ve soru kelimeleri atılır, sıra korunur)"""
+    terms = []
+    for word in re.findall(r"\w+", _fold(_APOSTROPHE_SUFFIX.sub("", text))):
+        if len(word) < 2 or word in FTS_STOPWORDS:
+            continue
+        if len(word) > FTS_MIN_STEM:
+            word = word[:max(FTS_MIN_STEM, len(word) - FTS_SUFFIX_TRIM)]
+        if word not in terms:
+            terms.append(word)
+    return terms
+
 
 class MemoryManager:
-    """Veritabanı bağlantısını ve hafıza işlemlerini yönetir"""
+    """
+    Veritabanı bağlantısını ve hafıza işlemlerini yönetir.
+    Tüm erişim ConnectionManager (self.db) üzerindendir: okumalar thread'in
+    kendi salt okunur bağlantısından, yazmalar tek yazıcı bağlantısından.
+    """
     
-    def __init__(self, db_path="db/project.db", schema_path="db_schema.sql"):
+    def __init__(
+        self,
+        db_path="db/project.db",
+        schema_path="db_schema.sql",
+        write_behind=True,
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024
+    ):
+        """
+        Args:
+            compression: "zlib" / "lzma" ile büyük cevaplar (PDF analizi, pano
+                dökümü) sıkıştırılmış saklanır. None (varsayılan) yeni yazmaları
+                düz bırakır; okuma her durumda açar. Açıldığında FTS
+                tetikleyicileri adam_decode kullanır (bkz. CODEC_FTS_STATEMENTS)
+            compression_threshold: Bu boyuttan (bayt) kısa metinler düz kalır
+        """
         self.db_path = db_path
         self.schema_path = schema_path
-        self.conn = None
-        self.cursor = None
+        self.db = None
+        self.codec = TextCodec(
+            compression or "zlib",
+            threshold=compression_threshold,
+            enabled=compression is not None
+        )
         self.last_interaction_id = None
+        self.index = None  # Semantik indeks (MemoryIndex, opsiyonel)
+        # read_from_memory bulanık eşleşme eşiği: sorgu ile kayıt anahtarının
+        # kök örtüşmesi (0-1, bkz. _coverage)
+        self.fuzzy_min_score = 0.6
+        # Eski kayıtları sıkıştırma göçünün tablo bazında kaldığı satır
+        self._backfill_cursor: Dict[str, int] = {}
         
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         self.connect()
         self.initialize_db()
+        if self.codec.enabled:
+            # Sıkıştırılmış ilk yazmadan önce FTS açılmış metni indekslemeli.
+            # Eski kayıtlar burada değil, saklama yöneticisinde parti parti
+            # sıkıştırılır (compress_existing)
+            self._install_codec_fts()
+        
+        # defer=True ile yapılan yazmalar arka planda toplu commit edilir
+        self.writer = WriteBehindWriter(self.db) if write_behind else None
         
         logger.info(f"💾 Hafıza sistemi hazır: {db_path}")
     
     def connect(self):
-        """Veritabanı bağlantısını kurar"""
+        """Veritabanı bağlantılarını kurar (WAL + thread başına okuyucu)"""
         try:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row
-            self.cursor = self.conn.cursor()
+            self.db = ConnectionManager(self.db_path)
+            # FTS tetikleyicileri sıkıştırılmış sütunları bununla açar. Bir kez
+            # sıkıştırma açılmış veritabanında sonradan kapatılsa da gerekir.
+            self.db.create_function(SQL_DECODE_FUNCTION, 1, decode_text)
         except sqlite3.Error as e:
             logger.critical(f"Veritabanı hatası: {e}")
             raise
     
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Yazıcı bağlantısı (eski kod için; yeni kod self.db kullanmalı)"""
+        return self.db.writer
+    
     def initialize_db(self):
-        """Tabloları oluşturur"""
+        """Tabloları oluşturur ve bekleyen şema göçlerini uygular"""
+        self.run_migrations()
+        
+        # Ek şema dosyası (opsiyonel, eski kurulumlar için)
         if os.path.exists(self.schema_path):
             try:
                 with open(self.schema_path, 'r', encoding='utf-8') as f:
-                    self.cursor.executescript(f.read())
-                self.conn.commit()
+                    self.db.write_script(f.read())
             except sqlite3.Error as e:
                 logger.error(f"Şema hatası: {e}")
+    
+    def run_migrations(self, migrations=None) -> int:
+        """
+        Uygulanmamış göçleri sırayla çalıştırır.
+        Her göç ve versions kaydı tek transaction'dadır; yarıda kalan göç
+        kaydedilmez ve bir sonraki açılışta tekrar denenir.
+        
+        Returns:
+            Bu çağrıda uygulanan göç sayısı
+        """
+        migrations = MIGRATIONS if migrations is None else migrations
         
-        # Profil tablosu (garanti için)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_profile (
-                key TEXT PRIMARY KEY,
-                value TEXT
+        self.db.write("""
+            CREATE TABLE IF NOT EXISTS versions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                component TEXT,
+                version TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
-        self.conn.commit()
+        applied = self.get_schema_versions()
+        
+        count = 0
+        for number, name, statements in sorted(migrations, key=lambda m: m[0]):
+            if number in applied:
+                continue
+            try:
+                with self.db.transaction() as cursor:
+                    # DDL'ler de transaction'a girsin (sqlite3 sadece DML'de BEGIN açar)
+                    cursor.execute("BEGIN IMMEDIATE")
+                    for statement in statements:
+                        cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO versions (component, version) VALUES ('schema', ?)",
+                        (str(number),)
+                    )
+                count += 1
+                logger.info(f"🧱 Şema göçü uygulandı: {number} {name}")
+            except sqlite3.Error as e:
+                # Sonraki göçler buna dayanabilir: dur
+                logger.error(f"Şema göçü başarısız ({number} {name}): {e}")
+                break
+        
+        return count
+    
+    def get_schema_versions(self) -> set:
+        """Uygulanmış göç numaraları"""
+        try:
+            rows = self.db.query("SELECT version FROM versions WHERE component = 'schema'")
+        except sqlite3.Error:
+            return set()
+        return {int(row[0]) for row in rows if str(row[0]).isdigit()}
     
     def normalize_query(self, query: str) -> str:
-        """Sorguyu temizler"""
+        """
+        Sorguyu temizler (hafıza anahtarı).
+        Kayıtlı anahtarlar bu biçimle yazıldığı için değiştirilmemeli; kesme
+        eki temizliği sadece bulanık arama köklerinde (_fts_terms) yapılır.
+        """
         if not query:
             return ""
         cleaned = re.sub(r'[^\w\s]', ' ', query)
         return ' '.join(cleaned.lower().split()).strip()
     
-    def save_interaction(self, user_input, assistant_response):
-        """Etkileşimi kaydeder"""
+    def save_interaction(self, user_input, assistant_response, defer=False):
+        """
+        Etkileşimi kaydeder.
+        defer=True ise yazma kuyruğa alınır ve None döner;
+        last_interaction_id commit sonrası güncellenir.
+        """
+        if defer and self.writer:
+            self.writer.submit(
+                self._insert_interaction, user_input, assistant_response,
+                after_commit=self._set_last_interaction
+            )
+            return None
+        
         try:
-            self.cursor.execute("""
+            cursor = self.db.write("""
                 INSERT INTO interactions (user_input, response_text) 
                 VALUES (?, ?)
-            """, (user_input, assistant_response))
-            self.conn.commit()
-            self.last_interaction_id = self.cursor.lastrowid
+            """, (user_input, self.codec.encode(assistant_response)))
+            self.last_interaction_id = cursor.lastrowid
             return self.last_interaction_id
         except sqlite3.Error as e:
             logger.error(f"Etkileşim kayıt hatası: {e}")
             return None
     
+    def _insert_interaction(self, cursor, user_input, assistant_response):
+        """Yazıcı thread'inde çalışır (sıkıştırma da cevap yolunun dışında)"""
+        cursor.execute("""
+            INSERT INTO interactions (user_input, response_text) 
+            VALUES (?, ?)
+        """, (user_input, self.codec.encode(assistant_response)))
+        return cursor.lastrowid
+    
+    def _set_last_interaction(self, interaction_id):
+        self.last_interaction_id = interaction_id
+    
     def get_last_interaction(self) -> dict:
         """Son etkileşimi döndürür"""
         try:
-            self.cursor.execute("""
+            row = self.db.query_one("""
                 SELECT user_input, response_text 
                 FROM interactions 
                 ORDER BY timestamp DESC 
                 LIMIT 1
             """)
-            row = self.cursor.fetchone()
             if row:
                 return {
                     "user_input": row[0],
-                    "response": row[1]
+                    "response": decode_text(row[1])
                 }
         except Exception as e:
             logger.error(f"Son etkileşim alınamadı: {e}")
         return None
     
-    def promote_to_memory(self, user_query, bot_response):
-        """Kalıcı hafızaya kayıt"""
+    def promote_to_memory(self, user_query, bot_response, defer=False):
+        """Kalıcı hafızaya kayıt (defer=True: arka planda toplu yazılır)"""
         normalized_key = self.normalize_query(user_query)
+        
+        if defer and self.writer:
+            self.writer.submit(
+                self._upsert_memory, normalized_key, bot_response,
+                after_commit=lambda _: self._sync_index("add", normalized_key, bot_response)
+            )
+            return True
+        
         try:
-            self.cursor.execute("""
+            self.db.write("""
                 INSERT OR REPLACE INTO memory (key, value, status)
                 VALUES (?, ?, 'valid')
-            """, (normalized_key, bot_response))
-            self.conn.commit()
+            """, (normalized_key, self.codec.encode(bot_response)))
             logger.info(f"LTM kaydedildi: {normalized_key}")
+            self._sync_index("add", normalized_key, bot_response)
             return True
         except Exception as e:
             logger.error(f"LTM kayıt hatası: {e}")
             return False
     
-    def read_from_memory(self, query: str) -> str:
-        """Hafızadan okur"""
+    def _upsert_memory(self, cursor, key, value):
+        """Yazıcı thread'inde çalışır"""
+        cursor.execute("""
+            INSERT OR REPLACE INTO memory (key, value, status)
+            VALUES (?, ?, 'valid')
+        """, (key, self.codec.encode(value)))
+    
+    def flush(self, timeout=None) -> bool:
+        """Kuyruktaki yazmaların diske inmesini bekler"""
+        if self.writer:
+            return self.writer.flush(timeout)
+        return True
+    
+    def get_write_stats(self) -> dict:
+        """Arka plan yazıcısının kuyruk gecikmesi ve parti boyu"""
+        return self.writer.get_stats() if self.writer else {}
+    
+    def get_db_stats(self) -> dict:
+        """Bağlantı katmanı: okuma/yazma sayıları, yazıcı kilidi beklemesi"""
+        return self.db.get_stats() if self.db else {}
+
+    def _install_codec_fts(self):
+        """FTS'yi açılmış metin üzerine kurar (tek seferlik, görünüm varsa atlanır)"""
+        try:
+            installed = self.db.query_one(
+                "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'memory_fts_source'"
+            )
+            if installed:
+                return
+            with self.db.transaction() as cursor:
+                cursor.execute("BEGIN IMMEDIATE")
+                for statement in CODEC_FTS_STATEMENTS:
+                    cursor.execute(statement)
+            logger.info("🗜️ FTS sıkıştırılmış sütunlar için kuruldu")
+        except sqlite3.Error as e:
+            # FTS hazır değilken sıkıştırılmış yazma indeksi bozar: düz yaz
+            logger.error(f"Sıkıştırma FTS kurulumu başarısız, sıkıştırma kapatıldı: {e}")
+            self.codec.enabled = False
+
+    def compress_existing(self, batch_size: int = 500, max_batches: Optional[int] = None) -> Dict:
+        """
+        Tek seferlik göç: eşiği aşan eski düz metin kayıtları sıkıştırır.
+        Parti parti çalışır ve kaldığı yerden devam eder (saklama yöneticisi
+        her turda birkaç parti işletir). Bütün tablolar bitince aynı
+        yöntem/eşik için versions tablosuna component='codec' yazılır ve
+        tekrar çalışmaz. Boşalan sayfaları incremental vacuum dosyadan atar.
+
+        Args:
+            batch_size: Tek transaction'da sıkıştırılan satır
+            max_batches: Bu çağrıda en fazla işlenecek parti (None = hepsi)
+
+        Returns:
+            Sütun başına sıkıştırılan satır ve bayt, "done": göç bitti mi
+        """
+        if not self.codec.enabled:
+            return {"done": False}
+
+        version = f"{self.codec.method}:{self.codec.threshold}"
+        try:
+            done = self.db.query_one(
+                "SELECT 1 FROM versions WHERE component = 'codec' AND version = ?",
+                (version,)
+            )
+        except sqlite3.Error:
+            done = None
+        if done:
+            return {"done": True}
+
+        started = time.time()
+        report: Dict = {"done": False}
+        batches = 0
+        try:
+            for table, row_key, column in COMPRESSED_COLUMNS:
+                name = f"{table}.{column}"
+                last = self._backfill_cursor.get(name, -1)
+                if last is None:
+                    continue  # Bu tablo bitti
+
+                rows_done = raw_bytes = stored_bytes = 0
+                while max_batches is None or batches < max_batches:
+                    rows = self.db.query(f"""
+                        SELECT {row_key}, {column} FROM {table}
+                        WHERE {row_key} > ? AND typeof({column}) = 'text'
+                          AND length(CAST({column} AS BLOB)) >= ?
+                        ORDER BY {row_key} LIMIT ?
+                    """, (last, self.codec.threshold, batch_size))
+                    if not rows:
+                        last = None
+                        break
+                    last = rows[-1][0]
+                    batches += 1
+
+                    updates = []
+                    for row_id, text in rows:
+                        stored = self.codec.encode(text)
+                        if isinstance(stored, bytes):
+                            updates.append((stored, row_id))
+                            raw_bytes += len(text.encode("utf-8"))
+                            stored_bytes += len(stored)
+                    if updates:
+                        self.db.write_many(
+                            f"UPDATE {table} SET {column} = ? WHERE {row_key} = ?", updates
+                        )
+                        rows_done += len(updates)
+
+                self._backfill_cursor[name] = last
+                report[name] = {
+                    "rows": rows_done,
+                    "raw_bytes": raw_bytes,
+                    "stored_bytes": stored_bytes,
+                    "ratio": round(stored_bytes / raw_bytes, 3) if raw_bytes else None
+                }
+                if last is not None:
+                    break  # Parti sınırı doldu; sonraki çağrı buradan devam eder
+
+            if all(self._backfill_cursor.get(f"{t}.{c}", -1) is None for t, _, c in COMPRESSED_COLUMNS):
+                self.db.write(
+                    "INSERT INTO versions (component, version) VALUES ('codec', ?)",
+                    (version,)
+                )
+                report["done"] = True
+        except sqlite3.Error as e:
+            logger.error(f"Sıkıştırma göçü başarısız: {e}")
+            return report
+
+        columns = [r for r in report.values() if isinstance(r, dict)]
+        rows_total = sum(r["rows"] for r in columns)
+        if rows_total or report["done"]:
+            saved = sum(r["raw_bytes"] - r["stored_bytes"] for r in columns)
+            logger.info(
+                f"🗜️ Sıkıştırma göçü ({version}): {rows_total} kayıt, "
+                f"{saved / 1024:.0f} KB kazanıldı ({(time.time() - started) * 1000:.0f} ms)"
+                + (", tamamlandı" if report["done"] else "")
+            )
+        return report
+
+    def compression_report(self) -> Dict:
+        """
+        Sıkıştırılabilen sütunlarda saklanan ve açılmış boyut (tam tarama;
+        teşhis için, sıcak yolda çağrılmamalı).
+
+        Returns:
+            {"columns": {"tablo.sütun": {...}}, "file_bytes", "codec"}
+        """
+        columns = {}
+        for table, _, column in COMPRESSED_COLUMNS:
+            try:
+                row = self.db.query_one(f"""
+                    SELECT count(*),
+                           sum(typeof({column}) = 'blob'),
+                           sum(length(CAST({column} AS BLOB))),
+                           sum(length(CAST({SQL_DECODE_FUNCTION}({column}) AS BLOB)))
+                    FROM {table}
+                """)
+            except sqlite3.Error as e:
+                logger.warning(f"Sıkıştırma raporu alınamadı ({table}): {e}")
+                continue
+
+            rows, compressed, stored, raw = row[0], row[1] or 0, row[2] or 0, row[3] or 0
+            columns[f"{table}.{column}"] = {
+                "rows": rows,
+                "compressed_rows": compressed,
+                "stored_bytes": stored,
+                "raw_bytes": raw,
+                "ratio": round(stored / raw, 3) if raw else None
+            }
+
+        return {
+            "columns": columns,
+            "file_bytes": self.db.size_info()["file_bytes"],
+            "codec": self.codec.get_stats()
+        }
+
+    def read_from_memory(self, query: str, min_score: float = None) -> str:
+        """
+        Hafızadan okur.
+        Anahtar birebir eşleşmezse tam metin aramasıyla en iyi kayıtlar
+        denenir; sorgunun her ayırt edici kökü anahtarda bulunmalı ve kök
+        örtüşmesi en az min_score olmalıdır ("Java listesi ..." sorusu
+        "Python listesi ..." kaydını döndürmez).
+        """
         normalized_key = self.normalize_query(query)
         try:
-            self.cursor.execute("""
+            row = self.db.query_one("""
                 SELECT value FROM memory
                 WHERE key = ? AND status = 'valid'
                 ORDER BY created_at DESC LIMIT 1
             """, (normalized_key,))
-            row = self.cursor.fetchone()
             if row:
-                return row[0]
+                return decode_text(row[0])
         except sqlite3.Error as e:
             logger.error(f"Okuma hatası: {e}")
+            return None
+        
+        # Bulanık eşleşme: farklı ifade edilmiş aynı soru
+        threshold = self.fuzzy_min_score if min_score is None else min_score
+        terms = _fts_terms(query)
+        for hit in self.search_memory(query, k=3):
+            if hit["coverage"] >= threshold and self._covers_all(terms, hit["key"]):
+                logger.info(f"🔎 Hafıza (bulanık): '{normalized_key}' ~ '{hit['key']}'")
+                return hit["value"]
         return None
     
+    def search_memory(self, query: str, k: int = 5) -> List[Dict]:
+        """
+        Geçerli hafıza kayıtlarında bm25 sıralı tam metin araması.
+        Anahtar (soru) eşleşmesi değerden (cevap) iki kat ağırlıklıdır.
+        
+        Returns:
+            [{"key", "value", "score", "coverage"}, ...] - score büyükse daha
+            alakalı; coverage sorgu ile anahtarın kök örtüşmesi (0-1)
+        """
+        terms = _fts_terms(query)
+        if not terms:
+            return []
+        
+        try:
+            rows = self.db.query("""
+                SELECT m.key, m.value, -bm25(memory_fts, 2.0, 1.0) AS score
+                FROM memory_fts
+                JOIN memory m ON m.rowid = memory_fts.rowid
+                WHERE memory_fts MATCH ? AND m.status = 'valid'
+                ORDER BY score DESC
+                LIMIT ?
+            """, (self._fts_match(terms), k))
+        except sqlite3.Error as e:
+            logger.warning(f"Hafıza araması başarısız: {e}")
+            return []
+        
+        return [
+            {
+                "key": row[0],
+                "value": decode_text(row[1]),
+                "score": round(row[2], 4),
+                "coverage": self._coverage(terms, row[0])
+            }
+            for row in rows
+        ]
+    
+    def search_interactions(self, query: str, k: int = 5) -> List[Dict]:
+        """Konuşma geçmişinde bm25 sıralı tam metin araması (en alakalı önce)"""
+        terms = _fts_terms(query)
+        if not terms:
+            return []
+        
+        try:
+            rows = self.db.query("""
+                SELECT i.id, i.timestamp, i.user_input, i.response_text,
+                       -bm25(interactions_fts, 2.0, 1.0) AS score
+                FROM interactions_fts
+                JOIN interactions i ON i.id = interactions_fts.rowid
+                WHERE interactions_fts MATCH ?
+                ORDER BY score DESC
+                LIMIT ?
+            """, (self._fts_match(terms), k))
+        except sqlite3.Error as e:
+            logger.warning(f"Geçmiş araması başarısız: {e}")
+            return []
+        
+        return [
+            {
+                "id": row[0],
+                "timestamp": row[1],
+                "user_input": row[2],
+                "response": decode_text(row[3]),
+                "score": round(row[4], 4)
+            }
+            for row in rows
+        ]
+    
+    @staticmethod
+    def _fts_match(terms: List[str]) -> str:
+        """Kelime öneklerinden FTS5 sorgusu (herhangi biri: OR, bm25 sıralar)"""
+        return " OR ".join(f'"{term}"*' for term in terms)
+    
+    @staticmethod
+    def _coverage(terms: List[str], key: str) -> float:
+        """
+        Sorgu ve anahtar köklerinin karşılıklı örtüşmesi (F1).
+        Tek yönlü olsaydı "Roma ne" gibi kısa sorgular uzun anahtarlarla
+        tam eşleşmiş sayılırdı.
+        """
+        key_terms = _fts_terms(key or "")
+        if not terms or not key_terms:
+            return 0.0
+        
+        def matches(a: str, b: str) -> bool:
+            return a.startswith(b) or b.startswith(a)
+        
+        query_hits = sum(1 for t in terms if any(matches(t, k) for k in key_terms))
+        key_hits = sum(1 for k in key_terms if any(matches(k, t) for t in terms))
+        if not query_hits:
+            return 0.0
+        
+        precision = query_hits / len(terms)
+        recall = key_hits / len(key_terms)
+        return round(2 * precision * recall / (precision + recall), 3)
+    
+    @staticmethod
+    def _covers_all(terms: List[str], key: str) -> bool:
+        """Sorgunun her kökü anahtarın bir köküyle eşleşiyor mu"""
+        key_terms = _fts_terms(key or "")
+        return bool(terms) and all(
+            any(t.startswith(k) or k.startswith(t) for k in key_terms) for t in terms
+        )
+    
     def invalidate_last(self):
         """Son hafıza kaydını geçersiz kılar"""
         try:
-            self.cursor.execute("""
-                UPDATE memory 
-                SET status = 'invalid' 
-                WHERE rowid = (SELECT MAX(rowid) FROM memory)
-            """)
-            self.conn.commit()
+            # Okuma ve güncelleme aynı transaction'da: arada yeni kayıt girmez
+            with self.db.transaction() as cursor:
+                cursor.execute("SELECT key FROM memory WHERE rowid = (SELECT MAX(rowid) FROM memory)")
+                row = cursor.fetchone()
+                cursor.execute("""
+                    UPDATE memory 
+                    SET status = 'invalid' 
+                    WHERE rowid = (SELECT MAX(rowid) FROM memory)
+                """)
+            if row:
+                self._sync_index("remove", row[0])
             return True
         except:
             return False
     
+    def attach_index(self, index):
+        """Hafıza değişikliklerini semantik indekse yansıtır"""
+        self.index = index
+    
+    def _sync_index(self, action: str, key: str, value: str = None):
+        """İndeks hatası hafıza kaydını bozmasın"""
+        if self.index is None:
+            return
+        try:
+            if action == "add":
+                self.index.add(key, value)
+            else:
+                self.index.remove(key)
+        except Exception as e:
+            logger.warning(f"Hafıza indeksi güncellenemedi: {e}")
+    
     def add_task(self, task):
         """Görev ekler"""
         try:
-            self.cursor.execute(
+            self.db.write(
                 "INSERT INTO todo_list (task, status) VALUES (?, 'pending')",
                 (task,)
             )
-            self.conn.commit()
             return True
         except Exception as e:
             logger.error(f"Görev ekleme hatası: {e}")
@@ -154,16 +832,23 @@ class MemoryManager:
     def get_tasks(self):
         """Görevleri listeler"""
         try:
-            self.cursor.execute(
+            return self.db.query(
                 "SELECT id, task FROM todo_list WHERE status = 'pending'"
             )
-            return self.cursor.fetchall()
         except Exception as e:
             logger.error(f"Görev listeleme hatası: {e}")
             return []
     
     def close(self):
-        """Bağlantıyı kapatır"""
-        if self.conn:
-            self.conn.close()
+        """Bağlantıyı kapatır (önce bekleyen yazmalar diske iner)"""
+        if self.writer:
+            self.writer.close()
+            stats = self.writer.get_stats()
+            logger.info(
+                f"✍️ Toplu yazıcı kapandı: {stats['written']} kayıt, "
+                f"ort. parti {stats['avg_batch_size']}, ort. gecikme {stats['avg_lag_ms']} ms"
+            )
+        
+        if self.db:
+            self.db.close()
             logger.info("Veritabanı bağlantısı kapatıldı")
\ No newline at end of file
@@ -2,6 +2,9 @@
 Profile Manager - Kullanıcı Profili Yönetimi
 """
 import logging
+import threading
+from types import MappingProxyType
+from typing import Mapping
 
 logger = logging.getLogger(__name__)
 
@@ -9,28 +12,69 @@ logger = logging.getLogger(__name__)
 class ProfileManager:
     """
     Kullanıcı profili (isim, üslup, tercihler) yönetir.
+    
+    Profil RAM'de tutulur: okumalar veritabanına hiç gitmez ve değiştirilemez
+    bir anlık görüntü döndürür. Yazmalar önce SQLite'a (write-through), sonra
+    RAM'e yansır; TXT kopyası gecikmeli olarak ayrı thread'de yazılır.
     """
     
-    def __init__(self, memory_manager):
+    def __init__(self, memory_manager, mirror_delay: float = 1.0):
+        """
+        Args:
+            memory_manager: MemoryManager örneği
+            mirror_delay: Son değişiklikten kaç saniye sonra TXT yazılacağı
+        """
         self.memory = memory_manager
         self.profile_txt_path = "user_profile.txt"
+        self.mirror_delay = mirror_delay
+        
+        self._lock = threading.Lock()
+        self._data = {}
+        self._snapshot: Mapping[str, str] = MappingProxyType({})
+        self._version = 0
+        self._mirror_timer = None
+        
+        self._load()
         
-        # İlk yüklemede TXT'yi güncelle
-        self._mirror_to_txt()
+        # İlk yüklemede TXT'yi güncelle (açılışı bekletmeden)
+        self._schedule_mirror()
         
         logger.info("👤 Profil yöneticisi hazır")
     
+    @property
+    def version(self) -> int:
+        """Her değişiklikte artar (önbellek anahtarı olarak kullanılabilir)"""
+        return self._version
+    
+    def _load(self):
+        """Profili veritabanından bir kez okur"""
+        try:
+            rows = self.memory.db.query("SELECT key, value FROM user_profile")
+            with self._lock:
+                self._data = {row[0]: row[1] for row in rows}
+                self._publish()
+        except Exception as e:
+            logger.error(f"Profil yükleme hatası: {e}")
+    
+    def _publish(self):
+        """Yeni anlık görüntü yayınlar (kilit altında çağrılır)"""
+        self._snapshot = MappingProxyType(dict(self._data))
+        self._version += 1
+    
     def set(self, key: str, value: str) -> bool:
         """Profil özelliği kaydeder"""
         try:
-            self.memory.cursor.execute("""
-                INSERT OR REPLACE INTO user_profile (key, value) 
-                VALUES (?, ?)
-            """, (key, value))
-            self.memory.conn.commit()
+            with self._lock:
+                self.memory.db.write("""
+                    INSERT OR REPLACE INTO user_profile (key, value)
+                    VALUES (?, ?)
+                """, (key, value))
+                
+                self._data[key] = value
+                self._publish()
             
             # TXT'yi güncelle
-            self._mirror_to_txt()
+            self._schedule_mirror()
             
             logger.info(f"Profil güncellendi: {key} = {value}")
             return True
@@ -41,40 +85,46 @@ class ProfileManager:
     
     def get(self, key: str) -> str:
         """Tek bir profil özelliği alır"""
-        try:
-            self.memory.cursor.execute(
-                "SELECT value FROM user_profile WHERE key = ?",
-                (key,)
-            )
-            row = self.memory.cursor.fetchone()
-            if row:
-                return row[0]
-        except Exception as e:
-            logger.error(f"Profil okuma hatası: {e}")
-        return None
+        return self._snapshot.get(key)
     
-    def get_all(self) -> dict:
-        """Tüm profili döndürür"""
-        try:
-            self.memory.cursor.execute("SELECT key, value FROM user_profile")
-            return {row[0]: row[1] for row in self.memory.cursor.fetchall()}
-        except Exception as e:
-            logger.error(f"Profil getirme hatası: {e}")
-            return {}
+    def get_all(self) -> Mapping[str, str]:
+        """Tüm profili döndürür (salt okunur anlık görüntü)"""
+        return self._snapshot
     
     def delete(self, key: str) -> bool:
         """Profil özelliği siler"""
         try:
-            self.memory.cursor.execute(
-                "DELETE FROM user_profile WHERE key = ?",
-                (key,)
-            )
-            self.memory.conn.commit()
-            self._mirror_to_txt()
+            with self._lock:
+                self.memory.db.write(
+                    "DELETE FROM user_profile WHERE key = ?",
+                    (key,)
+                )
+                
+                if self._data.pop(key, None) is not None:
+                    self._publish()
+            
+            self._schedule_mirror()
             return True
         except:
             return False
     
+    def _schedule_mirror(self):
+        """Art arda değişikliklerde TXT sadece bir kez yazılır"""
+        with self._lock:
+            if self._mirror_timer is not None:
+                self._mirror_timer.cancel()
+            self._mirror_timer = threading.Timer(self.mirror_delay, self._mirror_to_txt)
+            self._mirror_timer.daemon = True
+            self._mirror_timer.start()
+    
+    def flush(self):
+        """Bekleyen TXT yazımını hemen yapar (kapanışta)"""
+        with self._lock:
+            timer, self._mirror_timer = self._mirror_timer, None
+        if timer is not None:
+            timer.cancel()
+            self._mirror_to_txt()
+    
     def _mirror_to_txt(self):
         """Profili TXT dosyasına yansıtır (debug için)"""
         try:
@@ -91,4 +141,4 @@ class ProfileManager:
                         f.write("-" * 30 + "\n")
         
         except Exception as e:
-            logger.warning(f"TXT mirror hatası: {e}")
\ No newline at end of file
+            logger.warning(f"TXT mirror hatası: {e}")
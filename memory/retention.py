@@ -0,0 +1,452 @@
+"""
+Retention Manager - Etkileşim Geçmişi Saklama, Arşivleme ve Vacuum
+Eski etkileşimler ayrı bir arşiv veritabanına taşınır, veritabanı boyutu
+sınırda tutulur ve boşalan sayfalar adım adım dosyadan atılır
+
+Bakım (uygulama kapalıyken, tek seferlik):
+    python -m memory.retention --convert      # auto_vacuum=INCREMENTAL (tam VACUUM)
+    python -m memory.retention --run          # bir saklama turu + rapor
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_INTERACTION_COLUMNS = (
+    "id, timestamp, user_input, stt_confidence, retrieved_sources, "
+    "summary, response_text, model_version"
+)
+_FEEDBACK_COLUMNS = "id, interaction_id, feedback_type, score, comment, created_at"
+
+# Boyut sınırı aşılınca önce bu tablolardan silinir (yeniden üretilebilir önbellekler)
+_CACHE_TABLES = [("content_summaries", "created_at")]
+
+
+class RetentionManager:
+    """
+    interactions tablosunun saklama politikası.
+
+    - max_age_days'ten eski etkileşimler (geri bildirimleriyle birlikte)
+      arşive (db/archive.db) taşınır
+    - Canlı veri max_db_bytes'ı aşarsa: önce önbellek tabloları, sonra en
+      eski etkileşimler (son min_keep hariç) arşive gider. memory (LTM)
+      tablosuna dokunulmaz.
+    - auto_vacuum=INCREMENTAL ise boş sayfalar küçük adımlarla dosyadan
+      atılır. Mod dönüşümü yazıcıyı uzun süre kilitleyen tam VACUUM
+      gerektirdiği için burada yapılmaz: convert_to_incremental() / --convert
+
+    İsteğe bağlıdır; uygulama giriş noktası başlatır (gui_app: ADAM_RETENTION=1).
+    """
+
+    def __init__(
+        self,
+        memory_manager,
+        archive_path: Optional[str] = None,
+        max_age_days: int = 90,
+        max_db_bytes: int = 256 * 1024 * 1024,
+        min_keep: int = 200,
+        batch_size: int = 500,
+        vacuum_step_pages: int = 256,
+        interval: float = 6 * 3600,
+        start_delay: float = 120.0,
+        compress_batches: int = 20
+    ):
+        """
+        Args:
+            memory_manager: MemoryManager örneği
+            archive_path: Arşiv veritabanı (varsayılan: ana veritabanının yanında archive.db)
+            max_age_days: Bu günden eski etkileşimler arşivlenir
+            max_db_bytes: Ana veritabanındaki canlı veri sınırı
+            min_keep: Boyut sınırı yüzünden bile arşivlenmeyecek son etkileşim sayısı
+            batch_size: Tek transaction'da taşınan satır
+            vacuum_step_pages: Tek incremental_vacuum adımında atılan sayfa
+            interval: Otomatik çalışma aralığı (sn)
+            start_delay: Açılıştan sonra ilk çalışmaya kadar bekleme (sn)
+            compress_batches: Sıkıştırma açıksa tur başına sıkıştırılan eski
+                kayıt partisi (MemoryManager.compress_existing)
+        """
+        self.memory = memory_manager
+        self.db = memory_manager.db
+        self.archive_path = archive_path or os.path.join(
+            os.path.dirname(memory_manager.db_path) or ".", "archive.db"
+        )
+        self.max_age_days = max_age_days
+        self.max_db_bytes = max_db_bytes
+        self.min_keep = min_keep
+        self.batch_size = batch_size
+        self.vacuum_step_pages = vacuum_step_pages
+        self.interval = interval
+        self.start_delay = start_delay
+        self.compress_batches = compress_batches
+
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.last_report: Dict = {}
+        self.stats = {
+            "runs": 0,
+            "archived": 0,
+            "cache_rows_evicted": 0,
+            "pages_freed": 0,
+            "bytes_reclaimed": 0,
+            "rows_compressed": 0
+        }
+
+    # === ZAMANLAMA ===
+
+    def start(self):
+        """Arka planda periyodik çalışmayı başlatır"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        delay = self.start_delay
+        while not self._stop.wait(delay):
+            try:
+                self.run_once()
+            except sqlite3.ProgrammingError:
+                # Veritabanı kapatıldı
+                return
+            except Exception as e:
+                logger.error(f"Saklama politikası hatası: {e}")
+            delay = self.interval
+
+    # === ANA İŞ ===
+
+    def run_once(self) -> Dict:
+        """
+        Arşivleme + boyut sınırı + vacuum.
+
+        Returns:
+            Rapor: taşınan satırlar, atılan sayfalar, kazanılan bayt
+        """
+        with self._run_lock:
+            started = time.time()
+            before = self.db.size_info()
+
+            incremental = self._incremental_enabled()
+            self._prepare_archive()
+
+            archived_by_age = self._archive_older_than(self.max_age_days)
+            evicted, archived_by_size = self._enforce_size_cap()
+            compressed = self._compress_backlog()
+            pages_freed = self._vacuum() if incremental else 0
+
+            # Taşıma ve vacuum sayfaları WAL'a yazıldı; WAL dosyası da küçülsün
+            self.db.checkpoint("TRUNCATE")
+            after = self.db.size_info()
+
+            report = {
+                "archived_by_age": archived_by_age,
+                "archived_by_size": archived_by_size,
+                "cache_rows_evicted": evicted,
+                "rows_compressed": compressed,
+                "pages_freed": pages_freed,
+                "incremental_vacuum": incremental,
+                "file_bytes_before": before["file_bytes"],
+                "file_bytes_after": after["file_bytes"],
+                "bytes_reclaimed": max(0, before["file_bytes"] - after["file_bytes"]),
+                "live_bytes": after["live_bytes"],
+                "wal_bytes": after["wal_bytes"],
+                "ms": round((time.time() - started) * 1000, 1)
+            }
+
+            self.last_report = report
+            self.stats["runs"] += 1
+            self.stats["archived"] += archived_by_age + archived_by_size
+            self.stats["cache_rows_evicted"] += evicted
+            self.stats["pages_freed"] += pages_freed
+            self.stats["rows_compressed"] += compressed
+            self.stats["bytes_reclaimed"] += report["bytes_reclaimed"]
+
+            logger.info(
+                f"🧹 Saklama: {archived_by_age + archived_by_size} etkileşim arşivlendi, "
+                f"{evicted} önbellek satırı silindi, "
+                f"{report['bytes_reclaimed'] / 1024:.0f} KB geri kazanıldı"
+            )
+            return report
+
+    def _incremental_enabled(self) -> bool:
+        if self.db.pragma("auto_vacuum") == 2:
+            return True
+        if not self.stats["runs"]:
+            # Boş sayfalar yeni yazmalarda yine kullanılır; sadece dosya küçülmez
+            logger.info(
+                "🧹 auto_vacuum kapalı, dosya küçültülmüyor "
+                "(bakım: python -m memory.retention --convert)"
+            )
+        return False
+
+    def convert_to_incremental(self) -> bool:
+        """
+        auto_vacuum'u INCREMENTAL yapar (tek seferlik bakım adımı).
+        Mevcut veritabanında mod ancak tam VACUUM ile değişir: dosya boyutuyla
+        orantılı sürer ve bu sürede bütün yazmalar bekler. Uygulama kapalıyken
+        çalıştırın.
+
+        Returns:
+            Dönüşüm yapıldıysa True (zaten INCREMENTAL ise False)
+        """
+        if self.db.pragma("auto_vacuum") == 2:
+            return False
+
+        logger.info("🧹 auto_vacuum=INCREMENTAL ayarlanıyor (tam VACUUM)")
+        started = time.time()
+        self.db.pragma("auto_vacuum", "INCREMENTAL")
+        self.db.vacuum()
+        self.db.checkpoint("TRUNCATE")
+        logger.info(f"🧹 Dönüşüm bitti ({time.time() - started:.1f} sn)")
+        return True
+
+    def _prepare_archive(self):
+        self.db.attach(self.archive_path, "archive")
+        with self.db.transaction() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS archive.interactions (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TIMESTAMP,
+                    user_input TEXT,
+                    stt_confidence REAL,
+                    retrieved_sources TEXT,
+                    summary TEXT,
+                    response_text TEXT,
+                    model_version TEXT,
+                    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS archive.idx_archive_timestamp "
+                "ON interactions(timestamp)"
+            )
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS archive.feedback (
+                    id INTEGER PRIMARY KEY,
+                    interaction_id INTEGER,
+                    feedback_type TEXT,
+                    score INTEGER,
+                    comment TEXT,
+                    created_at TIMESTAMP
+                )
+            """)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS archive.idx_archive_feedback_interaction "
+                "ON feedback(interaction_id)"
+            )
+
+    # === ARŞİVLEME ===
+
+    def _archive_older_than(self, days: int) -> int:
+        """Eski etkileşimleri parti parti arşive taşır"""
+        total = 0
+        while not self._stop.is_set():
+            ids = [row[0] for row in self.db.query(
+                "SELECT id FROM interactions WHERE timestamp < datetime('now', ?) "
+                "ORDER BY timestamp LIMIT ?",
+                (f"-{int(days)} days", self.batch_size)
+            )]
+            if not ids:
+                break
+            moved = self._move(ids)
+            if not moved:
+                break
+            total += moved
+            # Partiler arasında ön plan yazmalarına fırsat ver
+            time.sleep(0.01)
+        return total
+
+    def _archive_oldest(self, limit: int) -> int:
+        """Boyut sınırı için en eski etkileşimleri taşır (son min_keep korunur)"""
+        ids = [row[0] for row in self.db.query("""
+            SELECT id FROM interactions
+            WHERE id NOT IN (
+                SELECT id FROM interactions ORDER BY timestamp DESC LIMIT ?
+            )
+            ORDER BY timestamp LIMIT ?
+        """, (self.min_keep, limit))]
+        return self._move(ids) if ids else 0
+
+    def _move(self, ids: List[int]) -> int:
+        """
+        İki adımda taşır: önce arşive kopya (kendi transaction'ı), sonra ana
+        veritabanından silme. WAL modunda ATTACH'lı iki veritabanına yayılan
+        bir commit atomik değildir; tek transaction'da çökme silmeyi kopyasız
+        bırakabilirdi. Bu sırayla yarıda kalan bir taşıma en fazla arşivde
+        zaten olan satırları tekrar dener (OR IGNORE), satır kaybolmaz.
+        Geri bildirimler etkileşimleriyle birlikte taşınır (yetim kalmaz);
+        FTS indeksi silme tetikleyicisiyle güncellenir.
+
+        Returns:
+            Ana veritabanından silinen etkileşim sayısı
+        """
+        self._copy_to_archive(ids)
+
+        missing = self._missing_from_archive(ids)
+        if missing:
+            logger.error(f"❌ Arşiv kopyası eksik ({missing} satır), silme atlandı")
+            return 0
+
+        return self._delete_archived(ids)
+
+    def _copy_to_archive(self, ids: List[int]):
+        placeholders = ",".join("?" * len(ids))
+        with self.db.transaction() as cursor:
+            cursor.execute(
+                f"INSERT OR IGNORE INTO archive.interactions ({_INTERACTION_COLUMNS}) "
+                f"SELECT {_INTERACTION_COLUMNS} FROM main.interactions WHERE id IN ({placeholders})",
+                ids
+            )
+            cursor.execute(
+                f"INSERT OR IGNORE INTO archive.feedback ({_FEEDBACK_COLUMNS}) "
+                f"SELECT {_FEEDBACK_COLUMNS} FROM main.feedback WHERE interaction_id IN ({placeholders})",
+                ids
+            )
+
+    def _missing_from_archive(self, ids: List[int]) -> int:
+        """Ana veritabanında olup arşivde olmayan satır sayısı (kopya doğrulaması)"""
+        placeholders = ",".join("?" * len(ids))
+        with self.db.transaction() as cursor:
+            cursor.execute(f"""
+                SELECT
+                    (SELECT count(*) FROM main.interactions m
+                     WHERE m.id IN ({placeholders})
+                       AND NOT EXISTS (SELECT 1 FROM archive.interactions a WHERE a.id = m.id))
+                  + (SELECT count(*) FROM main.feedback f
+                     WHERE f.interaction_id IN ({placeholders})
+                       AND NOT EXISTS (SELECT 1 FROM archive.feedback a WHERE a.id = f.id))
+            """, ids + ids)
+            return cursor.fetchone()[0]
+
+    def _delete_archived(self, ids: List[int]) -> int:
+        """Sadece arşivde karşılığı olan satırları siler (tek veritabanı, atomik)"""
+        placeholders = ",".join("?" * len(ids))
+        with self.db.transaction() as cursor:
+            cursor.execute(
+                f"DELETE FROM main.feedback WHERE interaction_id IN ({placeholders}) "
+                "AND id IN (SELECT id FROM archive.feedback)",
+                ids
+            )
+            cursor.execute(
+                f"DELETE FROM main.interactions WHERE id IN ({placeholders}) "
+                "AND id IN (SELECT id FROM archive.interactions)",
+                ids
+            )
+            return cursor.rowcount
+
+    # === BOYUT SINIRI ===
+
+    def _enforce_size_cap(self):
+        """
+        Canlı veri sınırı aşıyorsa: önce önbellek tabloları, sonra en eski
+        etkileşimler.
+
+        Returns:
+            (silinen önbellek satırı, arşivlenen etkileşim)
+        """
+        evicted = 0
+        archived = 0
+
+        for table, column in _CACHE_TABLES:
+            while self._over_cap() and not self._stop.is_set():
+                removed = self._evict_cache(table, column)
+                if not removed:
+                    break
+                evicted += removed
+
+        while self._over_cap() and not self._stop.is_set():
+            moved = self._archive_oldest(self.batch_size)
+            if not moved:
+                logger.warning("⚠️ Veritabanı boyut sınırının üstünde, arşivlenecek etkileşim kalmadı")
+                break
+            archived += moved
+            time.sleep(0.01)
+
+        return evicted, archived
+
+    def _over_cap(self) -> bool:
+        return self.db.size_info()["live_bytes"] > self.max_db_bytes
+
+    def _evict_cache(self, table: str, column: str) -> int:
+        try:
+            with self.db.transaction() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE rowid IN "
+                    f"(SELECT rowid FROM {table} ORDER BY {column} LIMIT ?)",
+                    (self.batch_size,)
+                )
+                return cursor.rowcount
+        except sqlite3.OperationalError:
+            # Tablo henüz oluşturulmamış
+            return 0
+
+    # === SIKIŞTIRMA ===
+
+    def _compress_backlog(self) -> int:
+        """Sıkıştırma açıksa eski düz kayıtlardan birkaç parti sıkıştırır"""
+        codec = getattr(self.memory, "codec", None)
+        if codec is None or not codec.enabled or self._stop.is_set():
+            return 0
+        report = self.memory.compress_existing(max_batches=self.compress_batches)
+        return sum(r["rows"] for r in report.values() if isinstance(r, dict))
+
+    # === VACUUM ===
+
+    def _vacuum(self) -> int:
+        """Boş sayfaları küçük adımlarla dosyadan atar"""
+        freed = 0
+        while not self._stop.is_set():
+            step = self.db.incremental_vacuum(self.vacuum_step_pages)
+            if step <= 0:
+                break
+            freed += step
+            time.sleep(0.005)
+        return freed
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "last_report": dict(self.last_report),
+            "archive_path": self.archive_path,
+            "max_age_days": self.max_age_days,
+            "max_db_bytes": self.max_db_bytes
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ADAM veritabanı saklama bakımı")
+    parser.add_argument("--db", default="db/project.db", help="Veritabanı dosyası")
+    parser.add_argument("--convert", action="store_true", help="auto_vacuum=INCREMENTAL (tam VACUUM)")
+    parser.add_argument("--run", action="store_true", help="Bir saklama turu çalıştır")
+    args = parser.parse_args(argv)
+
+    from memory.manager import MemoryManager
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    memory = MemoryManager(db_path=args.db, write_behind=False)
+    try:
+        retention = RetentionManager(memory)
+        if args.convert:
+            retention.convert_to_incremental()
+        if args.run:
+            print(json.dumps(retention.run_once(), indent=2))
+        if not (args.convert or args.run):
+            print(json.dumps(memory.db.size_info(), indent=2))
+    finally:
+        memory.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
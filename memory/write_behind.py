@@ -0,0 +1,209 @@
+"""
+Write-Behind Writer - Toplu Arka Plan Veritabanı Yazıcısı
+Yazma işlemlerini kuyruğa alır ve tek transaction'da toplu commit eder;
+disk gecikmesi (fsync) cevap yolundan çıkar
+"""
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _WriteOp:
+    """Kuyruktaki tek yazma işlemi"""
+
+    __slots__ = ("fn", "args", "after_commit", "enqueued_at")
+
+    def __init__(self, fn: Callable, args: tuple, after_commit: Optional[Callable]):
+        self.fn = fn
+        self.args = args
+        self.after_commit = after_commit
+        self.enqueued_at = time.time()
+
+
+class WriteBehindWriter:
+    """
+    Tek yazıcı thread; ConnectionManager'ın yazıcı bağlantısını kullanır.
+    İlk işlem geldikten sonra max_delay kadar (veya max_batch dolana kadar)
+    bekleyip gelenleri aynı transaction'da yazar. Kuyruk dolarsa submit
+    bekler (geri basınç); close() kuyruktakilerin hepsini yazmadan dönmez.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_queue: int = 1000,
+        max_batch: int = 64,
+        max_delay: float = 0.05
+    ):
+        """
+        Args:
+            db: memory.db.ConnectionManager
+            max_queue: Kuyruk sınırı
+            max_batch: Tek commit'teki en fazla işlem
+            max_delay: İlk işlemden sonra partinin dolması için beklenen süre (sn)
+        """
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._stop = object()
+        self._flush_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.stats = {
+            "submitted": 0,
+            "written": 0,
+            "errors": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "lag_ms_total": 0.0,
+            "max_lag_ms": 0.0,
+            "commit_ms_total": 0.0
+        }
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args, after_commit: Optional[Callable] = None):
+        """
+        Yazma işlemi ekler.
+
+        Args:
+            fn: fn(cursor, *args) - yazıcı thread'inde çalışır
+            after_commit: Commit başarılıysa fn'in dönüş değeriyle çağrılır
+        """
+        if self._closed:
+            raise RuntimeError("Yazıcı kapatıldı")
+
+        self._queue.put(_WriteOp(fn, args, after_commit))
+        with self._lock:
+            self.stats["submitted"] += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Kuyruktaki tüm işlemler yazılana kadar bekler"""
+        if not self._thread.is_alive():
+            return self._queue.empty()
+
+        done = threading.Event()
+        self._queue.put(_WriteOp(None, (done,), None))
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            op = self._queue.get()
+            if op is self._stop:
+                break
+
+            # Parti: ilk işlemden sonra kısa süre daha toplanır
+            batch = [op]
+            deadline = time.time() + self.max_delay
+            stop = False
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is self._stop:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            self._write_batch(batch)
+
+            if stop:
+                break
+
+        # Kapanış: kalanlar tek partide yazılır
+        rest = []
+        while True:
+            try:
+                op = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is not self._stop:
+                rest.append(op)
+        if rest:
+            self._write_batch(rest)
+
+    def _write_batch(self, batch):
+        """Partiyi tek transaction'da yazar"""
+        started = time.time()
+        results = []
+        markers = [op.args[0] for op in batch if op.fn is None]  # flush() işaretleri
+        ops = [op for op in batch if op.fn is not None]
+
+        committed = True
+        if ops:
+            try:
+                with self.db.transaction() as cursor:
+                    for op in ops:
+                        try:
+                            results.append((op, op.fn(cursor, *op.args)))
+                        except Exception as e:
+                            # SQLite hatalı ifadeyi geri alır, transaction'ın kalanı geçerli
+                            with self._lock:
+                                self.stats["errors"] += 1
+                            logger.error(f"Toplu yazma hatası ({getattr(op.fn, '__name__', op.fn)}): {e}")
+            except sqlite3.Error as e:
+                committed = False
+                with self._lock:
+                    self.stats["errors"] += len(results)
+                logger.error(f"Toplu commit hatası: {e}")
+
+        now = time.time()
+        if results and committed:
+            lags = [(now - op.enqueued_at) * 1000 for op, _ in results]
+            with self._lock:
+                self.stats["written"] += len(results)
+                self.stats["batches"] += 1
+                self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(results))
+                self.stats["lag_ms_total"] += sum(lags)
+                self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], max(lags))
+                self.stats["commit_ms_total"] += (now - started) * 1000
+
+            for op, result in results:
+                if op.after_commit is None:
+                    continue
+                try:
+                    op.after_commit(result)
+                except Exception as e:
+                    logger.warning(f"Commit sonrası işlem hatası: {e}")
+
+        for marker in markers:
+            marker.set()
+
+    def close(self, timeout: float = 10.0):
+        """Kuyruktakileri yazar ve thread'i durdurur"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._stop)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Yazıcı zamanında kapanmadı, bazı kayıtlar yazılmamış olabilir")
+
+    def get_stats(self) -> Dict:
+        """Kuyruk gecikmesi ve parti boyu"""
+        with self._lock:
+            stats = dict(self.stats)
+
+        batches = stats["batches"]
+        written = stats["written"]
+        return {
+            **stats,
+            "queue_depth": self._queue.qsize(),
+            "avg_batch_size": round(written / batches, 2) if batches else 0.0,
+            "avg_lag_ms": round(stats["lag_ms_total"] / written, 1) if written else 0.0,
+            "avg_commit_ms": round(stats["commit_ms_total"] / batches, 1) if batches else 0.0
+        }
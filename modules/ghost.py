@@ -54,15 +54,26 @@ class GhostObserver:
                     2. Eğer sıradan bir metinse (haber, mesaj, link vb.): Sadece 'SKIP' yaz.
                     """
                     
-                    # Brain içindeki LLM nesnesine direkt erişim
-                    response = self.brain.llm.create_chat_completion(
-                        messages=[
-                            {"role": "system", "content": "Sen arka planda çalışan zeki bir gözlemcisin. Sadece hataları yakalarsın."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=100, # Kısa tut
-                        temperature=0.3 # Yaratıcı olma, net ol
-                    )
+                    messages = [
+                        {"role": "system", "content": "Sen arka planda çalışan zeki bir gözlemcisin. Sadece hataları yakalarsın."},
+                        {"role": "user", "content": prompt}
+                    ]
+                    
+                    # QwenBrain: model zamanlayıcısı üzerinden en düşük öncelikle
+                    # (kullanıcı bir şey sorarsa bu analiz kesilir)
+                    if hasattr(self.brain, "chat_completion"):
+                        response = self.brain.chat_completion(
+                            messages=messages,
+                            max_tokens=100, # Kısa tut
+                            temperature=0.3 # Yaratıcı olma, net ol
+                        )
+                    else:
+                        # Eski Brain sınıfı: LLM nesnesine direkt erişim
+                        response = self.brain.llm.create_chat_completion(
+                            messages=messages,
+                            max_tokens=100, # Kısa tut
+                            temperature=0.3 # Yaratıcı olma, net ol
+                        )
                     
                     suggestion = response['choices'][0]['message']['content'].strip()
                     
@@ -0,0 +1,108 @@
+"""
+Single Flight - Aynı Anda Süren Özdeş İşlerin Birleştirilmesi
+Aynı anahtarla gelen ikinci çağrı işi tekrar yapmaz; ilk çağrının
+(lider) sonucunu bekler. Sonuç önbelleğe alınmaz: iş bitince anahtar
+serbest kalır, sonraki çağrı yeniden çalışır.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """Süren tek iş (thread tarafı)"""
+
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Anahtar başına tek uçuş.
+    do() thread'lerden, ado() olay döngüsünden çağrılır; iki taraf ayrı
+    kayıt tutar. Liderin hatası takipçilere de aynen iletilir.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, "asyncio.Future"] = {}
+
+        self.stats = {"leaders": 0, "followers": 0}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        fn'i çalıştırır; aynı anahtarla süren bir iş varsa onun sonucunu bekler.
+
+        Returns:
+            (sonuç, paylaşıldı_mı)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.stats["followers"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats["leaders"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.followers:
+                logger.info(f"🔗 {self.name}: {call.followers} özdeş çağrı birleştirildi")
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        do()'nun asenkron karşılığı (tek olay döngüsü içinde).
+        Takipçinin iptal edilmesi lideri iptal etmez.
+
+        Returns:
+            (sonuç, paylaşıldı_mı)
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            self.stats["followers"] += 1
+            return await asyncio.shield(task), True
+
+        self.stats["leaders"] += 1
+        task = asyncio.ensure_future(fn())
+        self._tasks[key] = task
+        task.add_done_callback(lambda t: self._tasks.pop(key, None))
+        return await asyncio.shield(task), False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + len(self._tasks)
+
+    def get_stats(self) -> Dict:
+        total = self.stats["leaders"] + self.stats["followers"]
+        return {
+            **self.stats,
+            "in_flight": self.in_flight(),
+            "coalesced_ratio": round(self.stats["followers"] / total, 3) if total else 0.0
+        }
@@ -0,0 +1,332 @@
+"""
+Tracing - İstek Yolu Boyunca Aşama Süreleri
+Hafif span ölçümü: bağlam, prefill/decode, araç, SQLite yazımı...
+Kapalıyken span() sabit bir no-op nesne döndürür (ölçülebilir maliyet yok).
+
+Açmak için: ADAM_TRACE=1 (JSONL dışa aktarım: ADAM_TRACE_FILE=traces.jsonl)
+CLI: python -m modules.tracing traces.jsonl
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import logging
+import argparse
+import functools
+import threading
+import contextvars
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("adam_trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("adam_span", default=None)
+
+
+class _NoopSpan:
+    """Kapalı izleme için tek örnek"""
+
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Trace:
+    """Tek bir isteğin span kayıtları"""
+
+    __slots__ = ("trace_id", "name", "started", "perf_started", "spans")
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.started = time.time()
+        self.perf_started = time.perf_counter()
+        self.spans: List[Dict] = []
+
+
+class Span:
+    """Ölçülen tek aşama"""
+
+    recording = True
+
+    __slots__ = ("tracer", "name", "attrs", "started", "parent", "trace", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.started = 0.0
+        self.parent: Optional[str] = None
+        self.trace: Optional[_Trace] = None
+        self._token = None
+
+    def set(self, **attrs):
+        """Span'e öznitelik ekler (token sayısı, durum...)"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.parent = parent.name if parent is not None else None
+        self.trace = _current_trace.get()
+        self._token = _current_span.set(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = (time.perf_counter() - self.started) * 1000
+        _current_span.reset(self._token)
+
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+
+        self.tracer._record(self, duration)
+        return False
+
+
+class _RootSpan(Span):
+    """İsteğin kök span'i: yeni bir trace başlatır"""
+
+    __slots__ = ("_trace_token",)
+
+    def __enter__(self):
+        self._trace_token = _current_trace.set(_Trace(self.name))
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        trace = _current_trace.get()
+        _current_trace.reset(self._trace_token)
+        self.tracer._finish(trace)
+        return False
+
+
+class Tracer:
+    """
+    Span kayıtlarını halka tampon (son N istek) ve span adına göre
+    süre örneklerinde (yüzdelik hesabı için) tutar.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        capacity: int = 200,
+        samples: int = 1000,
+        export_path: Optional[str] = None
+    ):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.samples = samples
+        self.export_path = export_path
+
+        self._lock = threading.Lock()
+        self._traces: deque = deque(maxlen=capacity)
+        self._durations: Dict[str, deque] = {}
+
+    def enable(self, export_path: Optional[str] = None):
+        self.enabled = True
+        if export_path:
+            self.export_path = export_path
+        logger.info("⏱️ İzleme açık")
+
+    def disable(self):
+        self.enabled = False
+
+    # === ÖLÇÜM ===
+
+    def trace(self, name: str, **attrs):
+        """Yeni istek izi başlatır (kök span)"""
+        if not self.enabled:
+            return _NOOP
+        return _RootSpan(self, name, attrs)
+
+    def span(self, name: str, **attrs):
+        """Aşama ölçümü; etkin bir iz varsa ona eklenir"""
+        if not self.enabled:
+            return _NOOP
+        return Span(self, name, attrs)
+
+    def record(self, name: str, duration_ms: float, ended: Optional[float] = None, **attrs):
+        """
+        Başka yolla ölçülmüş süreyi (ör. ilk token'a kadar geçen prefill)
+        mevcut span'in altına ekler.
+
+        Args:
+            ended: Aşamanın bittiği an (time.time()); verilmezse şimdi
+        """
+        if not self.enabled:
+            return
+        span = Span(self, name, attrs)
+        parent = _current_span.get()
+        span.parent = parent.name if parent is not None else None
+        span.trace = _current_trace.get()
+        lag = time.time() - ended if ended is not None else 0.0
+        span.started = time.perf_counter() - lag - duration_ms / 1000
+        self._record(span, duration_ms)
+
+    def _record(self, span: Span, duration_ms: float):
+        with self._lock:
+            samples = self._durations.get(span.name)
+            if samples is None:
+                samples = self._durations[span.name] = deque(maxlen=self.samples)
+            samples.append(duration_ms)
+
+        if span.trace is not None:
+            span.trace.spans.append({
+                "name": span.name,
+                "parent": span.parent,
+                "offset_ms": round((span.started - span.trace.perf_started) * 1000, 2),
+                "duration_ms": round(duration_ms, 2),
+                "thread": threading.current_thread().name,
+                **({"attrs": dict(span.attrs)} if span.attrs else {})
+            })
+
+    def _finish(self, trace: Optional[_Trace]):
+        if trace is None:
+            return
+
+        record = {
+            "trace_id": trace.trace_id,
+            "name": trace.name,
+            "timestamp": trace.started,
+            "spans": sorted(trace.spans, key=lambda s: s["offset_ms"])
+        }
+
+        with self._lock:
+            self._traces.append(record)
+
+        if self.export_path:
+            try:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"İz dışa aktarılamadı: {e}")
+
+    def bind(self, fn, *args, **kwargs):
+        """
+        fn'i mevcut iz bağlamında çalışacak şekilde sarar.
+        run_in_executor / submit bağlamı taşımaz; havuz thread'lerindeki
+        span'ler bu sayede doğru isteğe bağlanır.
+        """
+        if not self.enabled:
+            return functools.partial(fn, *args, **kwargs)
+        return functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    # === SORGU ===
+
+    def recent(self, n: int = 10) -> List[Dict]:
+        """Son n isteğin izleri"""
+        with self._lock:
+            return list(self._traces)[-n:]
+
+    def summary(self) -> Dict[str, Dict]:
+        """Span adına göre yüzdelik süreler (ms)"""
+        with self._lock:
+            snapshot = {name: list(values) for name, values in self._durations.items()}
+        return {name: _percentiles(values) for name, values in snapshot.items()}
+
+    def format_summary(self) -> str:
+        """GUI / CLI için tablo"""
+        return format_summary(self.summary())
+
+    def export_jsonl(self, path: str) -> int:
+        """Halka tampondaki izleri JSONL olarak yazar"""
+        traces = self.recent(self.capacity)
+        with open(path, "w", encoding="utf-8") as f:
+            for record in traces:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(traces)
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+            self._durations.clear()
+
+
+def _percentiles(values: List[float]) -> Dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    n = len(ordered)
+
+    def pick(q: float) -> float:
+        # En yakın sıra (nearest-rank) yüzdeliği
+        return round(ordered[max(0, math.ceil(q * n) - 1)], 2)
+
+    return {
+        "count": n,
+        "mean": round(sum(ordered) / n, 2),
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 2)
+    }
+
+
+def format_summary(summary: Dict[str, Dict]) -> str:
+    if not summary:
+        return "Henüz iz yok (ADAM_TRACE=1 ile açın)."
+
+    lines = [f"{'aşama':<28}{'adet':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+    for name in sorted(summary):
+        s = summary[name]
+        lines.append(
+            f"{name:<28}{s['count']:>6}{s['p50']:>10}{s['p90']:>10}{s['p99']:>10}{s['max']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def summarize_jsonl(lines: Iterable[str]) -> Dict[str, Dict]:
+    """Dışa aktarılmış JSONL izlerinden yüzdelik tablo"""
+    durations: Dict[str, List[float]] = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        for span in json.loads(line).get("spans", []):
+            durations.setdefault(span["name"], []).append(span["duration_ms"])
+    return {name: _percentiles(values) for name, values in durations.items()}
+
+
+# Global instance
+tracer = Tracer(
+    enabled=os.environ.get("ADAM_TRACE", "") not in ("", "0"),
+    export_path=os.environ.get("ADAM_TRACE_FILE") or None
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ADAM iz dosyası özeti")
+    parser.add_argument("path", help="JSONL iz dosyası (ADAM_TRACE_FILE)")
+    parser.add_argument("--name", help="Sadece bu isimle başlayan span'ler")
+    parser.add_argument("--last", type=int, default=0, help="Son N izi ayrıntılı göster")
+    args = parser.parse_args()
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    summary = summarize_jsonl(lines)
+    if args.name:
+        summary = {k: v for k, v in summary.items() if k.startswith(args.name)}
+    print(format_summary(summary))
+
+    for line in lines[-args.last:] if args.last else []:
+        record = json.loads(line)
+        print(f"\n{record['trace_id']} {record['name']}")
+        for span in record["spans"]:
+            indent = "  " if span["parent"] else ""
+            print(f"  {indent}{span['name']:<26}{span['duration_ms']:>10} ms  {span.get('attrs', '')}")
+
+    sys.exit(0)
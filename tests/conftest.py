@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Testler depo kökünden çalıştırılmasa da paketler (core, memory, ...) bulunsun
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
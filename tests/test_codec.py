@@ -0,0 +1,119 @@
+import sqlite3
+
+import pytest
+
+from memory.codec import MARKER, TextCodec, decode_text, is_compressed, register_sql_functions
+from memory.manager import MemoryManager
+
+LONG = "Ankara Türkiye'nin başkentidir ve nüfusu kalabalıktır. " * 60
+
+
+def _manager(tmp_path, **kwargs):
+    return MemoryManager(
+        db_path=str(tmp_path / "db" / "project.db"),
+        schema_path=str(tmp_path / "yok.sql"),
+        write_behind=False,
+        **kwargs
+    )
+
+
+@pytest.mark.parametrize("method", ["zlib", "lzma"])
+def test_round_trip(method):
+    codec = TextCodec(method)
+    stored = codec.encode(LONG)
+    assert is_compressed(stored) and stored.startswith(MARKER)
+    assert decode_text(stored) == LONG
+    assert codec.get_stats()["ratio"] < 0.5
+
+
+def test_short_and_disabled_values_stay_plain():
+    assert TextCodec().encode("kısa cevap") == "kısa cevap"
+    assert TextCodec(enabled=False).encode(LONG) == LONG
+    assert TextCodec().encode(None) is None
+
+
+def test_incompressible_text_is_skipped():
+    import os
+    noise = os.urandom(2048).hex()
+    codec = TextCodec(threshold=16, min_saving=0.6)
+    assert codec.encode(noise) == noise
+    assert codec.get_stats()["skipped"] == 1
+
+
+def test_decode_passes_through_plain_values():
+    assert decode_text("düz") == "düz"
+    assert decode_text(None) is None
+    assert decode_text(b"\x00\x01") == b"\x00\x01"
+
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        TextCodec("brotli")
+
+
+def test_compression_is_off_by_default(tmp_path):
+    mm = _manager(tmp_path)
+    try:
+        mm.save_interaction("soru", LONG)
+        row = mm.db.query_one("SELECT typeof(response_text) FROM interactions")
+        assert row[0] == "text"
+        # Fonksiyonsuz bağlantı (sqlite3 komut satırı gibi) yazabilir
+        conn = sqlite3.connect(mm.db_path)
+        conn.execute("INSERT INTO interactions (user_input, response_text) VALUES ('a', 'b')")
+        conn.commit()
+        conn.close()
+    finally:
+        mm.close()
+
+
+def test_compressed_rows_are_searchable(tmp_path):
+    mm = _manager(tmp_path, compression="zlib")
+    try:
+        mm.save_interaction("başkent sorusu", LONG)
+        mm.promote_to_memory("türkiyenin başkenti neresi", LONG)
+        assert mm.db.query_one("SELECT typeof(response_text) FROM interactions")[0] == "blob"
+        assert mm.get_last_interaction()["response"] == LONG
+        assert mm.read_from_memory("türkiyenin başkenti neresi") == LONG
+        assert mm.search_interactions("kalabalık")[0]["response"] == LONG
+        for table in ("memory_fts", "interactions_fts"):
+            mm.db.write(f"INSERT INTO {table}({table}) VALUES ('integrity-check')")
+    finally:
+        mm.close()
+
+
+def test_backfill_runs_in_batches_and_resumes(tmp_path):
+    mm = _manager(tmp_path)
+    for i in range(25):
+        mm.save_interaction(f"soru {i}", LONG + str(i))
+    mm.close()
+
+    mm = _manager(tmp_path, compression="zlib")
+    try:
+        # Açılış eski kayıtlara dokunmaz
+        assert mm.compression_report()["columns"]["interactions.response_text"]["compressed_rows"] == 0
+
+        first = mm.compress_existing(batch_size=10, max_batches=2)
+        assert first["interactions.response_text"]["rows"] == 20 and not first["done"]
+
+        rest = mm.compress_existing(batch_size=10)
+        assert rest["interactions.response_text"]["rows"] == 5 and rest["done"]
+        assert mm.compress_existing() == {"done": True}
+
+        report = mm.compression_report()["columns"]["interactions.response_text"]
+        assert report["compressed_rows"] == 25 and report["ratio"] < 0.2
+        assert mm.search_interactions("soru 7")
+        mm.db.write("INSERT INTO interactions_fts(interactions_fts) VALUES ('integrity-check')")
+    finally:
+        mm.close()
+
+
+def test_registered_connection_can_write_after_compression(tmp_path):
+    mm = _manager(tmp_path, compression="zlib")
+    path = mm.db_path
+    mm.close()
+
+    conn = sqlite3.connect(path)
+    register_sql_functions(conn)
+    conn.execute("INSERT INTO interactions (user_input, response_text) VALUES ('a', 'b')")
+    conn.commit()
+    conn.close()
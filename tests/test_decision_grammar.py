@@ -0,0 +1,84 @@
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+import core.decision_grammar as decision_grammar
+from core.decision_grammar import DecisionGrammarCache, build_decision_schema
+
+NOTE = {
+    "name": "take_note",
+    "parameters": {
+        "type": "object",
+        "properties": {"text": {"type": "string"}},
+        "required": ["text"]
+    }
+}
+TODOS = {"name": "list_todos", "parameters": {}}
+
+
+def test_tool_calls_is_array_of_tool_variants():
+    schema = build_decision_schema([NOTE, TODOS])
+    assert schema["required"] == ["intent", "tool_calls", "response"]
+
+    tool_calls = schema["properties"]["tool_calls"]
+    assert tool_calls["type"] == "array"
+    variants = tool_calls["items"]["anyOf"]
+    assert [v["properties"]["name"] for v in variants] == [
+        {"const": "take_note"}, {"const": "list_todos"}
+    ]
+
+    note = variants[0]
+    assert note["required"] == ["name", "arguments"]
+    assert note["additionalProperties"] is False
+    assert note["properties"]["arguments"]["required"] == ["text"]
+    assert note["properties"]["depends_on"] == {"type": "array", "items": {"type": "integer"}}
+    assert variants[1]["properties"]["arguments"]["properties"] == {}
+
+
+def test_no_tools_allows_only_empty_list():
+    schema = build_decision_schema([])
+    assert schema["properties"]["tool_calls"] == {"type": "array", "maxItems": 0}
+
+
+@pytest.fixture
+def compiled(monkeypatch):
+    calls = []
+
+    def fake_compile(schema_json, verbose=True):
+        calls.append(schema_json)
+        return object()
+
+    monkeypatch.setattr(decision_grammar.LlamaGrammar, "from_json_schema", fake_compile)
+    return calls
+
+
+def test_cache_reuses_grammar_for_same_tool_set(compiled):
+    cache = DecisionGrammarCache()
+    first = cache.get([NOTE, TODOS])
+    assert cache.get([NOTE, TODOS]) is first
+    assert len(compiled) == 1
+
+
+def test_cache_rebuilds_when_tool_set_changes(compiled):
+    cache = DecisionGrammarCache()
+    both = cache.get([NOTE, TODOS])
+    note_only = cache.get([NOTE])
+    assert note_only is not both
+    assert len(compiled) == 2
+    assert cache.get([NOTE]) is note_only
+
+
+def test_cache_evicts_oldest(compiled):
+    cache = DecisionGrammarCache(max_entries=1)
+    first = cache.get([NOTE])
+    cache.get([TODOS])
+    assert cache.get([NOTE]) is not first
+    assert len(compiled) == 3
+
+
+def test_compile_error_returns_none(monkeypatch):
+    def broken(schema_json, verbose=True):
+        raise ValueError("gramer")
+
+    monkeypatch.setattr(decision_grammar.LlamaGrammar, "from_json_schema", broken)
+    assert DecisionGrammarCache().get([NOTE]) is None
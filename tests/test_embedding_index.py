@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from memory.embedding_index import MemoryIndex
+from memory.manager import MemoryManager
+
+
+class FakeEmbedder:
+    """Kelime hash'lerinden normalize vektör; gate açılana kadar bekler"""
+
+    model_name = "fake"
+    available = True
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.threads = set()
+
+    def encode(self, texts):
+        self.gate.wait(5)
+        self.threads.add(threading.current_thread().name)
+        vectors = np.zeros((len(texts), 16), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[i, hash(word) % 16] += 1
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-6)
+
+
+@pytest.fixture
+def memory(tmp_path):
+    mm = MemoryManager(
+        db_path=str(tmp_path / "project.db"),
+        schema_path=str(tmp_path / "yok.sql"),
+        write_behind=False
+    )
+    mm.db.write("INSERT INTO memory (key, value, status) VALUES ('kedi adı', 'pamuk', 'valid')")
+    yield mm
+    mm.close()
+
+
+def test_search_does_not_load_inline(memory):
+    embedder = FakeEmbedder()
+    embedder.gate.clear()
+    index = MemoryIndex(memory, embedder)
+
+    # Yükleme bitmeden arama beklemez, None ile tam metin aramasına düşülür
+    assert index.search("kedi adı") is None
+    future = index.warm_up()
+    assert future is not None and not future.done()
+
+    embedder.gate.set()
+    future.result(5)
+    assert all(name.startswith("memory-index") for name in embedder.threads)
+    assert index.search("kedi adı")[0][0] == "kedi adı"
+    index.shutdown()
+
+
+def test_backfill_is_persisted(memory):
+    index = MemoryIndex(memory, FakeEmbedder())
+    index.warm_up().result(5)
+    assert index.stats["backfilled"] == 1
+    assert memory.db.query_one("SELECT count(*) FROM memory_embeddings")[0] == 1
+    index.shutdown()
+
+
+def test_add_and_remove_run_on_index_thread_in_order(memory):
+    embedder = FakeEmbedder()
+    index = MemoryIndex(memory, embedder)
+    index.warm_up().result(5)
+
+    embedder.gate.clear()
+    added = index.add("köpek adı", "karabaş")
+    removed = index.remove("köpek adı")
+    assert not added.done()  # çağıran kodlamayı beklemez
+
+    embedder.gate.set()
+    added.result(5)
+    removed.result(5)
+    assert len(index) == 1
+    assert index.stats["added"] == 1 and index.stats["removed"] == 1
+    index.shutdown()
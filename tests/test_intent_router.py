@@ -0,0 +1,139 @@
+import pytest
+
+from core.intent_router import IntentRouter
+
+
+@pytest.fixture
+def router():
+    r = IntentRouter(temporal_provider=lambda: {
+        "current_time": "12:00", "current_date": "1 Ocak", "day_of_week": "Pazartesi"
+    })
+    r._apps = ["chrome", "hesap makinesi"]
+    return r
+
+
+def _tool(decision):
+    return decision["tool_calls"][0] if decision and decision["tool_calls"] else None
+
+
+def test_take_note_with_separator(router):
+    call = _tool(router.route("not al: süt almayı unutma"))
+    assert call == {"name": "take_note", "arguments": {"text": "süt almayı unutma"}}
+
+
+def test_take_note_suffix_form(router):
+    call = _tool(router.route("yarın toplantı var diye not al"))
+    assert call["arguments"]["text"] == "yarın toplantı var"
+
+
+@pytest.mark.parametrize("text", [
+    "not almak için hangi uygulamayı önerirsin",
+    "not alırken nelere dikkat etmeliyim",
+    "bir not al",
+    "şunu not al",
+    "not al",
+])
+def test_take_note_negatives(router, text):
+    assert router.route(text) is None
+
+
+@pytest.mark.parametrize("text", ["ekranı oku", "OCR ile oku", "resmi oku"])
+def test_ocr_imperative(router, text):
+    assert _tool(router.route(text))["name"] == "ocr_read"
+
+
+@pytest.mark.parametrize("text", [
+    "OCR nedir?",
+    "ocr nasıl çalışır",
+    "ekranı okuyabilir misin",
+    "ekranı oku kaydet",
+])
+def test_ocr_negatives(router, text):
+    assert router.route(text) is None
+
+
+def test_read_pdf_with_verb(router):
+    call = _tool(router.route("rapor.pdf dosyasını özetle"))
+    assert call == {"name": "read_pdf", "arguments": {"filename": "rapor.pdf"}}
+
+
+def test_read_pdf_strips_suffix(router):
+    call = _tool(router.route("Rapor.pdf'i oku"))
+    assert call["arguments"]["filename"] == "Rapor.pdf"
+
+
+@pytest.mark.parametrize("text", [
+    "rapor.pdf dosyasını sil",
+    "rapor.pdf dosyasını oku ve mail olarak gönder",
+    "rapor.pdf nedir",
+    "rapor.pdf dosyasını aç ve sil",
+])
+def test_read_pdf_negatives(router, text):
+    assert router.route(text) is None
+
+
+def test_add_todo_requires_payload(router):
+    assert _tool(router.route("görev ekle: fatura öde"))["arguments"] == {"task": "fatura öde"}
+    assert router.route("görev ekle: a") is None
+
+
+def test_temporal_and_stats(router):
+    decision = router.route("saat kaç")
+    assert decision["route"] == "temporal" and "12:00" in decision["response"]
+    assert router.get_stats()["routed"] == 1
+
+
+def test_known_app_launch(router):
+    assert _tool(router.route("chrome aç")) == {"name": "launch_app", "arguments": {"app_name": "chrome"}}
+    assert router.route("bilinmeyenuygulama aç") is None
+
+
+@pytest.mark.parametrize("text", [
+    "bugün ayın kaçı",
+    "tarih ne?",
+    "bugünün tarihi nedir",
+    "hangi gündeyiz",
+    "Bugün günlerden ne?",
+])
+def test_temporal_date_whole_utterance(router, text):
+    decision = router.route(text)
+    assert decision["route"] == "temporal" and decision["response"].startswith("📅")
+
+
+@pytest.mark.parametrize("text", [
+    "osmanlı tarihi ne zaman başladı",
+    "türk tarihi ne kadar eski",
+    "sınav tarihi ne zaman açıklanır",
+    "bugün hangi gün maç var",
+    "saat ne zaman ileri alınıyor",
+    "saat kaçta buluşalım",
+])
+def test_temporal_negatives(router, text):
+    assert router.route(text) is None
+
+
+@pytest.mark.parametrize("text", ["panoyu oku", "panoda ne var", "kopyaladığım metni göster"])
+def test_clipboard_imperative(router, text):
+    assert _tool(router.route(text))["name"] == "read_clipboard"
+
+
+@pytest.mark.parametrize("text", ["pano nedir", "clipboard nedir?", "panodaki metni açıkla"])
+def test_clipboard_negatives(router, text):
+    assert router.route(text) is None
+
+
+@pytest.mark.parametrize("text", [
+    "bu görevi listeye ekle",
+    "bunu da listeye ekle",
+    "şu işi görevlere ekle",
+    "bunları yapılacaklara ekle",
+    "bunu da not al",
+    "bu notu da not al",
+])
+def test_deictic_payloads_fall_back(router, text):
+    assert router.route(text) is None
+
+
+def test_payload_starting_with_demonstrative_word_is_kept(router):
+    call = _tool(router.route("bu akşam market alışverişi listeye ekle"))
+    assert call == {"name": "add_todo", "arguments": {"task": "bu akşam market alışverişi"}}
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from core.json_stream import JsonObjectTracker, ResponseFieldStreamer
+
+DECISION = {
+    "action": "tool",
+    "tool": {"name": "web_search", "args": ["hava", 3]},
+    "confidence": 0.8,
+    "ok": True,
+    "response": "Merhaba \"dünya\"\n\\ é ✓",
+}
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_response_streamer_decodes_across_chunks(size):
+    text = json.dumps(DECISION)
+    streamer = ResponseFieldStreamer()
+    out = "".join(streamer.feed(chunk) for chunk in _chunks(text, size))
+    assert out == DECISION["response"]
+    assert streamer.done
+
+
+def test_response_streamer_unicode_escape_split():
+    streamer = ResponseFieldStreamer()
+    parts = ['{"response": "a\\u0', '0e', '9b"}']
+    assert [streamer.feed(p) for p in parts] == ["a", "", "éb"]
+
+
+def test_response_streamer_stops_after_closing_quote():
+    streamer = ResponseFieldStreamer()
+    assert streamer.feed('{"response": "bitti", "x": "sonra"}') == "bitti"
+    assert streamer.feed(' devam') == ""
+
+
+def test_response_streamer_waits_for_key():
+    streamer = ResponseFieldStreamer()
+    assert streamer.feed('{"action": "chat", "resp') == ""
+    assert streamer.feed('onse": "selam"') == "selam"
+
+
+@pytest.mark.parametrize("size", [1, 4, 1000])
+def test_tracker_completes_at_first_object(size):
+    text = "```json\n" + json.dumps(DECISION) + "\n```\nfazladan metin {}"
+    tracker = JsonObjectTracker()
+    for chunk in _chunks(text, size):
+        if tracker.feed(chunk):
+            break
+    assert tracker.complete
+    assert json.loads(tracker.result_text()[tracker.result_text().index("{"):]) == DECISION
+
+
+def test_tracker_ignores_braces_inside_strings():
+    tracker = JsonObjectTracker()
+    assert not tracker.feed('{"response": "kapanmadı } \\" {"')
+    assert tracker.feed("}")
+
+
+def test_tracker_emits_each_field_when_closed():
+    fields = []
+    tracker = JsonObjectTracker(on_field=lambda key, value: fields.append((key, value)))
+    text = json.dumps(DECISION)
+    seen_at = {}
+    for i, ch in enumerate(text):
+        tracker.feed(ch)
+        for key, _ in fields:
+            seen_at.setdefault(key, i)
+
+    assert dict(fields) == DECISION
+    # Alanlar nesne kapanmadan iletilir
+    assert seen_at["tool"] < len(text) - 1
+
+
+def test_tracker_handler_errors_are_swallowed():
+    def boom(key, value):
+        raise RuntimeError("x")
+
+    tracker = JsonObjectTracker(on_field=boom)
+    assert tracker.feed('{"a": 1, "b": "c"}')
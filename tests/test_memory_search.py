@@ -0,0 +1,75 @@
+import pytest
+
+from memory.manager import MemoryManager, _fts_terms
+
+
+@pytest.fixture
+def memory(tmp_path):
+    mm = MemoryManager(
+        db_path=str(tmp_path / "db" / "project.db"),
+        schema_path=str(tmp_path / "yok.sql"),
+        write_behind=False
+    )
+    yield mm
+    mm.close()
+
+
+def test_fts_terms_stem_and_stopwords():
+    assert _fts_terms("Havalar nasıl olacak?") == ["hava", "olac"]
+    assert _fts_terms("Roma ne zaman kuruldu") == ["roma", "zama", "kuru"]
+
+
+def test_fts_terms_strip_apostrophe_suffix():
+    assert _fts_terms("Türkiye'nin başkenti") == ["turk", "baske"]
+    assert _fts_terms("Python’da liste") == ["pyth", "list"]
+    assert "nin" not in _fts_terms("Ankara'nın nüfusu")
+
+
+def test_normalize_query_keeps_stored_key_format(memory):
+    assert memory.normalize_query("Ankara'nın nüfusu?") == "ankara nın nüfusu"
+
+
+def test_existing_row_still_exact_matches(memory):
+    # Daha önce kaydedilmiş anahtar (kesme işareti boşluğa dönüşmüş)
+    memory.db.write(
+        "INSERT INTO memory (key, value, status) VALUES ('ali nin doğum günü', '3 Mayıs', 'valid')"
+    )
+    assert memory.read_from_memory("Ali'nin doğum günü") == "3 Mayıs"
+
+    memory.promote_to_memory("Ali'nin doğum günü", "4 Mayıs")
+    rows = memory.db.query("SELECT key, value FROM memory WHERE status = 'valid'")
+    assert [tuple(row) for row in rows] == [("ali nin doğum günü", "4 Mayıs")]
+
+
+def test_coverage_is_symmetric_f1():
+    terms = _fts_terms("Roma")
+    assert MemoryManager._coverage(terms, "roma ne zaman kuruldu") < 0.6
+    assert MemoryManager._coverage(_fts_terms("roma ne zaman kuruldu"), "roma ne zaman kuruldu") == 1.0
+
+
+def test_exact_and_rephrased_recall(memory):
+    memory.promote_to_memory("Türkiye'nin başkenti neresi", "Ankara")
+    assert memory.read_from_memory("türkiyenin başkenti neresi") == "Ankara"
+    assert memory.read_from_memory("Türkiye'nin başkenti nedir") == "Ankara"
+
+
+@pytest.mark.parametrize("query", [
+    "Java listesi nasıl sıralanır",
+    "Python sözlüğü nasıl sıralanır",
+    "Python listesi nasıl ters çevrilir",
+])
+def test_near_miss_keys_do_not_match(memory, query):
+    memory.promote_to_memory("Python listesi nasıl sıralanır", "sorted(liste)")
+    assert memory.read_from_memory(query) is None
+
+
+def test_search_memory_still_ranks_partial_hits(memory):
+    memory.promote_to_memory("Python listesi nasıl sıralanır", "sorted(liste)")
+    hits = memory.search_memory("Java listesi nasıl sıralanır")
+    assert hits and hits[0]["value"] == "sorted(liste)"
+
+
+def test_invalidated_memory_is_not_recalled(memory):
+    memory.promote_to_memory("kedinin adı ne", "Pamuk")
+    memory.invalidate_last()
+    assert memory.read_from_memory("kedinin adı ne") is None
@@ -0,0 +1,62 @@
+import pytest
+
+from memory.manager import MIGRATIONS, MemoryManager
+
+
+@pytest.fixture
+def memory(tmp_path):
+    mm = MemoryManager(
+        db_path=str(tmp_path / "project.db"),
+        schema_path=str(tmp_path / "yok.sql"),
+        write_behind=False
+    )
+    yield mm
+    mm.close()
+
+
+def _tables(memory):
+    return {row[0] for row in memory.db.query("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_numbers_are_unique_and_increasing():
+    numbers = [number for number, _, _ in MIGRATIONS]
+    assert numbers == sorted(set(numbers))
+
+
+def test_all_migrations_applied_once(memory):
+    assert memory.get_schema_versions() == {number for number, _, _ in MIGRATIONS}
+    assert {"conversation_summaries", "content_summaries", "memory_embeddings"} <= _tables(memory)
+
+    assert memory.run_migrations() == 0
+    rows = memory.db.query("SELECT version FROM versions WHERE component = 'schema'")
+    assert len(rows) == len(MIGRATIONS)
+
+
+def test_reopen_does_not_reapply(tmp_path, memory):
+    memory.close()
+    reopened = MemoryManager(
+        db_path=str(tmp_path / "project.db"),
+        schema_path=str(tmp_path / "yok.sql"),
+        write_behind=False
+    )
+    assert reopened.run_migrations() == 0
+    reopened.close()
+
+
+def test_failed_migration_stops_and_rolls_back(memory):
+    extra = [
+        (101, "ok", ["CREATE TABLE t101 (x)"]),
+        (102, "broken", ["CREATE TABLE t102 (x)", "INSERT INTO yok_tablo VALUES (1)"]),
+        (103, "after", ["CREATE TABLE t103 (x)"]),
+    ]
+    assert memory.run_migrations(extra) == 1
+
+    tables = _tables(memory)
+    assert "t101" in tables
+    assert "t102" not in tables  # yarıda kalan göç geri alınır
+    assert "t103" not in tables  # başarısız göçten sonra durulur
+    assert 102 not in memory.get_schema_versions()
+
+    fixed = [extra[0], (102, "fixed", ["CREATE TABLE t102 (x)"]), extra[2]]
+    assert memory.run_migrations(fixed) == 2
+    assert {101, 102, 103} <= memory.get_schema_versions()
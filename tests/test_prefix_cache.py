@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+from core.qwen_brain import QwenBrain
+
+CONTEXT = {"profile": {"user_name": "Ali", "tone": "dostane"}, "temporal": {}, "conversation": []}
+NOTE = {"name": "take_note", "description": "Not alır", "parameters": {"text": "string"}}
+SEARCH = {"name": "web_search", "description": "Web'de arar", "parameters": {"query": "string"}}
+
+
+@pytest.fixture
+def brain():
+    return QwenBrain(model_path="test.gguf")
+
+
+def test_different_tool_subsets_share_cached_prefix(brain):
+    brain.generate_with_context("not al: süt", CONTEXT, [NOTE])
+    brain.generate_with_context("hava nasıl", CONTEXT, [SEARCH])
+    brain.generate_with_context("not al ve ara", CONTEXT, [NOTE, SEARCH])
+
+    stats = brain.prefix_cache.get_stats()
+    assert stats["prefix_misses"] == 1
+    assert stats["prefix_hits"] == 2
+    assert stats["cached_prefixes"] == 1
+
+
+def test_static_prefix_excludes_tools(brain):
+    static = brain._build_static_prompt(CONTEXT)
+    assert "take_note" not in static
+    tools = brain._build_tools_prompt([NOTE])
+    assert tools.startswith("KULLANILABİLİR ARAÇLAR:") and "take_note" in tools
@@ -0,0 +1,66 @@
+from core.prompt_assembler import PromptAssembler
+
+
+def count_tokens(text):
+    return len(text.split())
+
+
+def truncate_tokens(text, n, keep="start"):
+    words = text.split()
+    return " ".join(words[:n] if keep == "start" else words[-n:])
+
+
+def _words(prefix, n):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def _assembler(min_section_tokens=4):
+    return PromptAssembler(count_tokens, truncate_tokens, min_section_tokens=min_section_tokens)
+
+
+def test_everything_fits_in_insertion_order():
+    pa = _assembler()
+    pa.add("b", "ikinci", priority=2)
+    pa.add("a", "birinci", priority=1)
+    assert pa.build(100) == "ikinci\n\nbirinci"
+    assert pa.report["used"] == 2
+
+
+def test_empty_sections_are_ignored():
+    pa = _assembler()
+    pa.add("bos", "")
+    assert pa.sections == []
+
+
+def test_lower_priority_is_truncated_keeping_requested_end():
+    pa = _assembler()
+    pa.add("profil", _words("p", 5), priority=0)
+    pa.add("gecmis", _words("g", 20), priority=1, keep="end", header="GEÇMİŞ:")
+    prompt = pa.build(15)
+
+    assert pa.report["sections"]["profil"]["status"] == "full"
+    assert pa.report["sections"]["gecmis"]["status"] == "truncated"
+    # Başlık korunur, gövdenin sonu kalır
+    assert prompt.endswith("GEÇMİŞ:\n" + " ".join(_words("g", 20).split()[-8:]))
+    assert count_tokens(prompt) <= 15
+
+
+def test_section_dropped_when_too_little_room():
+    pa = _assembler(min_section_tokens=4)
+    pa.add("ana", _words("a", 8), priority=0)
+    pa.add("ek", _words("e", 10), priority=1)
+    prompt = pa.build(10)
+
+    assert pa.report["sections"]["ek"]["status"] == "dropped"
+    assert "e0" not in prompt
+
+
+def test_required_sections_always_included():
+    pa = _assembler()
+    pa.add("sistem", _words("s", 12), priority=5, required=True)
+    pa.add("opsiyonel", _words("o", 5), priority=0)
+    prompt = pa.build(10)
+
+    assert pa.report["sections"]["sistem"]["status"] == "full"
+    assert pa.report["sections"]["opsiyonel"]["status"] == "dropped"
+    assert prompt == _words("s", 12)
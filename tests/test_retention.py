@@ -0,0 +1,149 @@
+import sqlite3
+
+import pytest
+
+from memory.manager import MemoryManager
+from memory.retention import RetentionManager
+
+
+@pytest.fixture
+def memory(tmp_path):
+    mm = MemoryManager(
+        db_path=str(tmp_path / "db" / "project.db"),
+        schema_path=str(tmp_path / "yok.sql"),
+        write_behind=False
+    )
+    yield mm
+    mm.close()
+
+
+def _seed(memory, count, days_ago=0):
+    ids = []
+    for i in range(count):
+        cursor = memory.db.write(
+            "INSERT INTO interactions (timestamp, user_input, response_text) "
+            "VALUES (datetime('now', ?), ?, ?)",
+            (f"-{days_ago} days", f"soru {i}", f"cevap {i}")
+        )
+        ids.append(cursor.lastrowid)
+    return ids
+
+
+def _count(memory, sql):
+    return memory.db.query_one(sql)[0]
+
+
+def test_move_archives_interactions_with_feedback(memory, tmp_path):
+    ids = _seed(memory, 3)
+    memory.db.write(
+        "INSERT INTO feedback (interaction_id, feedback_type, score) VALUES (?, 'like', 1)",
+        (ids[0],)
+    )
+    retention = RetentionManager(memory, archive_path=str(tmp_path / "archive.db"))
+    retention._prepare_archive()
+
+    assert retention._move(ids[:2]) == 2
+    assert _count(memory, "SELECT count(*) FROM interactions") == 1
+    assert _count(memory, "SELECT count(*) FROM feedback") == 0
+    # Yetim geri bildirim kalmaz
+    assert _count(memory, """
+        SELECT count(*) FROM feedback f
+        LEFT JOIN interactions i ON i.id = f.interaction_id WHERE i.id IS NULL
+    """) == 0
+
+    archive = sqlite3.connect(str(tmp_path / "archive.db"))
+    assert archive.execute("SELECT count(*) FROM interactions").fetchone()[0] == 2
+    assert archive.execute("SELECT interaction_id FROM feedback").fetchone()[0] == ids[0]
+    archive.close()
+
+    memory.db.write("INSERT INTO interactions_fts(interactions_fts) VALUES ('integrity-check')")
+    found = {row["id"] for row in memory.search_interactions("soru", k=10)}
+    assert found == {ids[2]}
+
+
+def test_move_is_idempotent(memory, tmp_path):
+    ids = _seed(memory, 2)
+    retention = RetentionManager(memory, archive_path=str(tmp_path / "archive.db"))
+    retention._prepare_archive()
+    retention._move(ids)
+    assert retention._move(ids) == 0
+
+
+def test_run_once_archives_by_age_and_keeps_recent(memory, tmp_path):
+    _seed(memory, 5, days_ago=200)
+    _seed(memory, 3)
+    retention = RetentionManager(memory, archive_path=str(tmp_path / "archive.db"), max_age_days=90)
+
+    report = retention.run_once()
+    assert report["archived_by_age"] == 5
+    assert _count(memory, "SELECT count(*) FROM interactions") == 3
+    assert retention.run_once()["archived_by_age"] == 0
+
+
+def test_size_cap_keeps_min_keep(memory, tmp_path):
+    _seed(memory, 30)
+    retention = RetentionManager(
+        memory, archive_path=str(tmp_path / "archive.db"), max_db_bytes=1, min_keep=10, batch_size=7
+    )
+    report = retention.run_once()
+    assert report["archived_by_size"] == 20
+    assert _count(memory, "SELECT count(*) FROM interactions") == 10
+
+
+def test_run_once_does_not_vacuum_without_conversion(memory, tmp_path):
+    retention = RetentionManager(memory, archive_path=str(tmp_path / "archive.db"))
+    report = retention.run_once()
+    assert report["incremental_vacuum"] is False
+    assert memory.db.pragma("auto_vacuum") == 0
+
+    assert retention.convert_to_incremental() is True
+    assert memory.db.pragma("auto_vacuum") == 2
+    assert retention.convert_to_incremental() is False
+    assert retention.run_once()["incremental_vacuum"] is True
+
+
+def _archived(tmp_path, table):
+    archive = sqlite3.connect(str(tmp_path / "archive.db"))
+    try:
+        return archive.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+    finally:
+        archive.close()
+
+
+def test_failure_between_copy_and_delete_loses_nothing(memory, tmp_path, monkeypatch):
+    ids = _seed(memory, 4)
+    memory.db.write(
+        "INSERT INTO feedback (interaction_id, feedback_type, score) VALUES (?, 'like', 1)",
+        (ids[1],)
+    )
+    retention = RetentionManager(memory, archive_path=str(tmp_path / "archive.db"))
+    retention._prepare_archive()
+
+    def crash(ids):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(retention, "_delete_archived", crash)
+    with pytest.raises(sqlite3.OperationalError):
+        retention._move(ids)
+
+    # Kopya commit edildi, ana veritabanı dokunulmadı
+    assert _count(memory, "SELECT count(*) FROM interactions") == 4
+    assert _archived(tmp_path, "interactions") == 4
+
+    # Tekrar: çift kayıt yok, satır kaybı yok
+    monkeypatch.undo()
+    assert retention._move(ids) == 4
+    assert _count(memory, "SELECT count(*) FROM interactions") == 0
+    assert _count(memory, "SELECT count(*) FROM feedback") == 0
+    assert _archived(tmp_path, "interactions") == 4
+    assert _archived(tmp_path, "feedback") == 1
+
+
+def test_delete_skipped_when_archive_copy_missing(memory, tmp_path, monkeypatch):
+    ids = _seed(memory, 3)
+    retention = RetentionManager(memory, archive_path=str(tmp_path / "archive.db"))
+    retention._prepare_archive()
+
+    monkeypatch.setattr(retention, "_copy_to_archive", lambda ids: None)
+    assert retention._move(ids) == 0
+    assert _count(memory, "SELECT count(*) FROM interactions") == 3
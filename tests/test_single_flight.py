@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+from modules.single_flight import SingleFlight
+
+
+def _run_concurrently(flight, key, fn, n):
+    results = []
+    errors = []
+
+    def worker():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def test_identical_calls_run_once():
+    flight = SingleFlight("test")
+    gate = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        gate.wait(5)
+        return "sonuç"
+
+    threads, results, errors = _run_concurrently(flight, "k", work, 5)
+    while flight.stats["followers"] < 4:
+        threading.Event().wait(0.01)
+    gate.set()
+    for t in threads:
+        t.join(5)
+
+    assert calls == [1]
+    assert not errors
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == "sonuç" for result, _ in results)
+    assert flight.in_flight() == 0
+
+
+def test_key_is_released_after_completion():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: 1) == (1, False)
+    assert flight.do("k", lambda: 2) == (2, False)
+    assert flight.get_stats()["leaders"] == 2
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: "a") == ("a", False)
+    assert flight.do("b", lambda: "b") == ("b", False)
+    assert flight.stats["followers"] == 0
+
+
+def test_leader_error_is_shared_with_followers():
+    flight = SingleFlight()
+    gate = threading.Event()
+
+    def fail():
+        gate.wait(5)
+        raise ValueError("bozuk")
+
+    threads, results, errors = _run_concurrently(flight, "k", fail, 3)
+    while flight.stats["followers"] < 2:
+        threading.Event().wait(0.01)
+    gate.set()
+    for t in threads:
+        t.join(5)
+
+    assert not results
+    assert len(errors) == 3 and all(isinstance(e, ValueError) for e in errors)
+    assert flight.in_flight() == 0
+
+
+def test_async_calls_coalesce_and_follower_cancel_keeps_leader():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.ado("k", work))
+        cancelled = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await leader, await follower
+
+    assert asyncio.run(main()) == ((42, False), (42, True))
+    assert calls == [1]
+    assert flight.in_flight() == 0
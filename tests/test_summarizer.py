@@ -0,0 +1,120 @@
+import pytest
+
+from core.context_builder import ContextBuilder
+from core.summarizer import ConversationSummarizer
+from memory.manager import MemoryManager
+
+
+class FakeBrain:
+    """QwenBrain.summarize_conversation ile aynı tur biçimini okur"""
+
+    def __init__(self):
+        self.calls = []
+
+    def summarize_conversation(self, previous_summary, turns, priority=None):
+        self.calls.append(turns)
+        lines = [
+            f"{'Kullanıcı' if t['role'] == 'user' else 'Asistan'}: {t['content']}"
+            for t in turns
+        ]
+        return " | ".join(([previous_summary] if previous_summary else []) + lines)
+
+    def truncate_tokens(self, text, max_tokens):
+        return text
+
+
+@pytest.fixture
+def memory(tmp_path):
+    mm = MemoryManager(
+        db_path=str(tmp_path / "project.db"),
+        schema_path=str(tmp_path / "yok.sql"),
+        write_behind=False
+    )
+    yield mm
+    mm.close()
+
+
+def _wait(summarizer):
+    # Tek worker: sıradaki iş bittiğinde önceki özetleme de bitmiştir
+    summarizer._executor.submit(lambda: None).result(5)
+
+
+def _builder(memory, summarizer):
+    builder = ContextBuilder(memory, None, summarizer=summarizer)
+    builder.max_history = 2
+    return builder
+
+
+def _chat(builder, summarizer, user, assistant):
+    builder.add_to_history("user", user)
+    builder.add_to_history("assistant", assistant)
+    _wait(summarizer)
+
+
+def test_evicted_turns_are_folded_with_real_shape(memory):
+    brain = FakeBrain()
+    summarizer = ConversationSummarizer(brain, memory)
+    builder = _builder(memory, summarizer)
+
+    _chat(builder, summarizer, "merhaba", "selam")
+    _chat(builder, summarizer, "adım Ali", "memnun oldum")
+
+    assert [t["role"] for t in brain.calls[0]] == ["user", "assistant"]
+    assert summarizer.summary == "Kullanıcı: merhaba | Asistan: selam"
+    assert summarizer.folded_turns == 2
+    summarizer.shutdown()
+
+
+def test_summary_survives_restart(memory):
+    first = ConversationSummarizer(FakeBrain(), memory)
+    builder = _builder(memory, first)
+    _chat(builder, first, "merhaba", "selam")
+    _chat(builder, first, "hava nasıl", "güneşli")
+    first.shutdown()
+
+    second = ConversationSummarizer(FakeBrain(), memory)
+    assert second.session_id == first.session_id
+    assert second.summary == "Kullanıcı: merhaba | Asistan: selam"
+    assert second.folded_turns == 2
+    second.shutdown()
+
+
+def test_latest_session_is_resumed(memory):
+    old = ConversationSummarizer(FakeBrain(), memory, session_id="eski")
+    old.add_evicted([{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}])
+    _wait(old)
+    new = ConversationSummarizer(FakeBrain(), memory, session_id="yeni")
+    new.add_evicted([{"role": "user", "content": "c"}, {"role": "assistant", "content": "d"}])
+    _wait(new)
+
+    resumed = ConversationSummarizer(FakeBrain(), memory)
+    assert resumed.session_id == "yeni"
+    assert resumed.summary == "Kullanıcı: c | Asistan: d"
+    for s in (old, new, resumed):
+        s.shutdown()
+
+
+def test_below_min_turns_waits_for_more(memory):
+    brain = FakeBrain()
+    summarizer = ConversationSummarizer(brain, memory, min_turns=2)
+    summarizer.add_evicted([{"role": "user", "content": "tek"}])
+    _wait(summarizer)
+    assert brain.calls == []
+    assert summarizer.get_stats()["pending_turns"] == 1
+    summarizer.shutdown()
+
+
+def test_clear_history_starts_empty_session(memory):
+    summarizer = ConversationSummarizer(FakeBrain(), memory)
+    builder = _builder(memory, summarizer)
+    _chat(builder, summarizer, "merhaba", "selam")
+    _chat(builder, summarizer, "nasılsın", "iyiyim")
+    old_session = summarizer.session_id
+
+    builder.clear_history()
+    assert summarizer.summary == ""
+    assert summarizer.folded_turns == 0
+    assert builder.conversation_history == []
+    summarizer.reset(old_session)
+    assert summarizer.summary == "Kullanıcı: merhaba | Asistan: selam"
+    summarizer.shutdown()
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from memory.db import ConnectionManager
+from memory.write_behind import WriteBehindWriter
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "wb.db"))
+    manager.write("CREATE TABLE t (x INTEGER)")
+    yield manager
+    manager.close()
+
+
+def _insert(cursor, x):
+    cursor.execute("INSERT INTO t (x) VALUES (?)", (x,))
+    return cursor.lastrowid
+
+
+def _count(db):
+    return db.query_one("SELECT count(*) FROM t")[0]
+
+
+def test_flush_waits_for_queued_writes(db):
+    writer = WriteBehindWriter(db, max_delay=0.05)
+    committed = []
+    for i in range(5):
+        writer.submit(_insert, i, after_commit=committed.append)
+
+    assert writer.flush(5)
+    assert _count(db) == 5
+    assert len(committed) == 5 and all(isinstance(rowid, int) for rowid in committed)
+    writer.close()
+
+
+def test_writes_are_batched_into_one_commit(db):
+    writer = WriteBehindWriter(db, max_batch=64, max_delay=0.5)
+    for i in range(20):
+        writer.submit(_insert, i)
+    writer.flush(5)
+
+    stats = writer.get_stats()
+    assert stats["written"] == 20
+    assert stats["batches"] < 20
+    assert stats["max_batch_size"] > 1
+    writer.close()
+
+
+def test_failing_op_does_not_drop_the_batch(db):
+    writer = WriteBehindWriter(db, max_delay=0.2)
+    failed_after_commit = []
+
+    def broken(cursor):
+        cursor.execute("INSERT INTO yok (x) VALUES (1)")
+
+    writer.submit(_insert, 1)
+    writer.submit(broken, after_commit=failed_after_commit.append)
+    writer.submit(_insert, 2)
+    writer.flush(5)
+
+    assert _count(db) == 2
+    assert writer.get_stats()["errors"] == 1
+    assert failed_after_commit == []
+    writer.close()
+
+
+def test_close_drains_queue_and_rejects_new_writes(db):
+    writer = WriteBehindWriter(db, max_delay=1.0)
+    gate = threading.Event()
+
+    def slow(cursor):
+        gate.wait(5)
+        return _insert(cursor, 0)
+
+    writer.submit(slow)
+    for i in range(1, 10):
+        writer.submit(_insert, i)
+
+    gate.set()
+    writer.close()
+    assert _count(db) == 10
+
+    with pytest.raises(RuntimeError):
+        writer.submit(_insert, 99)
+    # Thread durduktan sonra flush beklemez
+    assert writer.flush(1)
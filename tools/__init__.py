@@ -3,5 +3,6 @@ ADAM Araçları (Tools)
 Registry Sistemi ile Otomatik Kayıt
 """
 from .registry import registry
+from .selector import ToolSelector
 
-__all__ = ['registry']
\ No newline at end of file
+__all__ = ['registry', 'ToolSelector']
\ No newline at end of file
@@ -6,7 +6,9 @@ import json
 import logging
 import subprocess
 from datetime import datetime
-from typing import Dict, List, Callable, Optional
+from typing import Dict, List, Callable, Optional, Tuple
+from modules.tracing import tracer
+from modules.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +18,15 @@ class ToolRegistry:
     
     def __init__(self):
         self._tools: Dict[str, Dict] = {}
+        self._version = 0  # Araç seti her değiştiğinde artar
+        self._schema_json_cache: Dict[Tuple, str] = {}
+        # Aynı anda gelen özdeş yan etkisiz çağrılar tek çalıştırılır
+        self._flight = SingleFlight("tools")
         logger.info("🔧 Tool Registry başlatılıyor...")
         
         # Araçları kaydet
         self._register_all_tools()
+        self._version += 1
         
         logger.info(f"✅ {len(self._tools)} araç kaydedildi")
     
@@ -30,6 +37,7 @@ class ToolRegistry:
         self._tools["take_note"] = {
             "name": "take_note",
             "description": "Kullanıcının verdiği metni not defterine kaydeder",
+            "keywords": ["not", "kaydet", "yaz", "hatırla", "unutma"],
             "function": self._take_note,
             "parameters": {
                 "type": "object",
@@ -44,6 +52,7 @@ class ToolRegistry:
         self._tools["add_todo"] = {
             "name": "add_todo",
             "description": "Yapılacaklar listesine görev ekler",
+            "keywords": ["görev", "yapılacak", "ekle", "hatırlat", "liste"],
             "function": self._add_todo,
             "parameters": {
                 "type": "object",
@@ -58,7 +67,9 @@ class ToolRegistry:
         self._tools["list_todos"] = {
             "name": "list_todos",
             "description": "Yapılacaklar listesini gösterir",
+            "keywords": ["görev", "yapılacak", "liste", "listele", "göster", "neler"],
             "function": self._list_todos,
+            "read_only": True,
             "parameters": {"type": "object", "properties": {}}
         }
         
@@ -66,6 +77,7 @@ class ToolRegistry:
         self._tools["launch_app"] = {
             "name": "launch_app",
             "description": "Belirtilen uygulamayı başlatır (brave, spotify, notepad vb.)",
+            "keywords": ["aç", "başlat", "çalıştır", "uygulama", "program"],
             "function": self._launch_app,
             "parameters": {
                 "type": "object",
@@ -80,7 +92,9 @@ class ToolRegistry:
         self._tools["read_clipboard"] = {
             "name": "read_clipboard",
             "description": "Panodaki (clipboard) metni okur",
+            "keywords": ["pano", "kopyala", "clipboard", "yapıştır", "metin"],
             "function": self._read_clipboard,
+            "read_only": True,
             "parameters": {"type": "object", "properties": {}}
         }
         
@@ -88,7 +102,9 @@ class ToolRegistry:
         self._tools["read_pdf"] = {
             "name": "read_pdf",
             "description": "Belirtilen PDF dosyasını okur",
+            "keywords": ["pdf", "dosya", "belge", "döküman", "oku"],
             "function": self._read_pdf,
+            "read_only": True,
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -102,7 +118,9 @@ class ToolRegistry:
         self._tools["ocr_read"] = {
             "name": "ocr_read",
             "description": "Panodaki resmi OCR ile okur",
+            "keywords": ["ocr", "resim", "görüntü", "ekran", "oku"],
             "function": self._ocr_read,
+            "read_only": True,
             "parameters": {"type": "object", "properties": {}}
         }
     
@@ -251,35 +269,95 @@ class ToolRegistry:
     # === REGISTRY YÖNETİM FONKSİYONLARI ===
     
     def execute_tool(self, name: str, arguments: Dict) -> str:
-        """Aracı çalıştırır"""
+        """
+        Aracı çalıştırır.
+        Yan etkisiz (read_only) bir araç aynı argümanlarla zaten çalışıyorsa
+        ikinci çağrı onun sonucunu bekler. Yan etkili araçlar her zaman çalışır.
+        """
         
+        if not self.is_read_only(name):
+            return self._execute_tool_now(name, arguments)
+        
+        try:
+            key = (name, json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str))
+        except (TypeError, ValueError):
+            return self._execute_tool_now(name, arguments)
+        
+        result, _ = self._flight.do(key, self._execute_tool_now, name, arguments)
+        return result
+    
+    def _execute_tool_now(self, name: str, arguments: Dict) -> str:
         tool = self._tools.get(name)
         
         if not tool:
             logger.error(f"Bilinmeyen araç: {name}")
             return f"❌ '{name}' adlı araç bulunamadı."
         
-        try:
-            func = tool["function"]
-            result = func(**arguments)
+        with tracer.span(f"tool.{name}") as span:
+            try:
+                func = tool["function"]
+                result = func(**arguments)
+                
+                logger.info(f"✅ Tool başarılı: {name}")
+                span.set(status="ok")
+                return str(result)
             
-            logger.info(f"✅ Tool başarılı: {name}")
-            return str(result)
-        
-        except TypeError as e:
-            logger.error(f"Parametre hatası ({name}): {e}")
-            return f"❌ {name} aracına yanlış parametreler gönderildi."
-        
-        except Exception as e:
-            logger.error(f"Tool hatası ({name}): {e}")
-            return f"❌ {name} çalıştırılırken hata oluştu: {e}"
+            except TypeError as e:
+                logger.error(f"Parametre hatası ({name}): {e}")
+                span.set(status="bad_arguments")
+                return f"❌ {name} aracına yanlış parametreler gönderildi."
+            
+            except Exception as e:
+                logger.error(f"Tool hatası ({name}): {e}")
+                span.set(status="error")
+                return f"❌ {name} çalıştırılırken hata oluştu: {e}"
     
-    def get_tools_schema(self) -> List[Dict]:
-        """LLM için JSON Schema döndürür"""
+    @property
+    def version(self) -> int:
+        """Araç seti sürümü (önbellek anahtarı)"""
+        return self._version
+    
+    def register_tool(
+        self,
+        name: str,
+        description: str,
+        function: Callable,
+        parameters: Optional[Dict] = None,
+        keywords: Optional[List[str]] = None,
+        read_only: bool = False
+    ):
+        """Çalışma anında yeni araç ekler (aynı isim varsa üzerine yazar)"""
+        self._tools[name] = {
+            "name": name,
+            "description": description,
+            "keywords": keywords or [],
+            "function": function,
+            "read_only": read_only,
+            "parameters": parameters or {"type": "object", "properties": {}}
+        }
+        self._version += 1
+        self._schema_json_cache.clear()
+        logger.info(f"🔧 Araç kaydedildi: {name}")
+    
+    def get_tool_info(self, name: str) -> Optional[Dict]:
+        """Aracın kayıt bilgisi (fonksiyon hariç)"""
+        tool = self._tools.get(name)
+        if not tool:
+            return None
+        return {k: v for k, v in tool.items() if k != "function"}
+    
+    def get_tools_schema(self, names: Optional[List[str]] = None) -> List[Dict]:
+        """
+        LLM için JSON Schema döndürür.
+        names verilirse sadece o araçlar (kayıt sırasıyla) döner.
+        """
         
         schemas = []
+        wanted = set(names) if names is not None else None
         
         for tool_name, tool_data in self._tools.items():
+            if wanted is not None and tool_name not in wanted:
+                continue
             schemas.append({
                 "name": tool_data["name"],
                 "description": tool_data["description"],
@@ -288,6 +366,30 @@ class ToolRegistry:
         
         return schemas
     
+    def get_tools_schema_json(self, names: Optional[List[str]] = None) -> str:
+        """
+        Boşluksuz (compact) şema JSON'u.
+        Araç sürümü + isim kümesi başına bir kez serileştirilir; aynı alt küme
+        her turda byte-byte aynı metni üretir (prefix cache için önemli).
+        """
+        key = (self._version, tuple(sorted(names)) if names is not None else None)
+        cached = self._schema_json_cache.get(key)
+        if cached is None:
+            cached = json.dumps(
+                self.get_tools_schema(names),
+                ensure_ascii=False,
+                separators=(",", ":")
+            )
+            if len(self._schema_json_cache) >= 64:
+                self._schema_json_cache.clear()
+            self._schema_json_cache[key] = cached
+        return cached
+    
+    def is_read_only(self, name: str) -> bool:
+        """Araç yan etkisiz mi? (erken/paralel çalıştırma için güvenli)"""
+        tool = self._tools.get(name)
+        return bool(tool and tool.get("read_only"))
+    
     def list_tools(self) -> List[str]:
         """Tüm araç isimlerini döndürür"""
         return list(self._tools.keys())
@@ -0,0 +1,167 @@
+"""
+Tool Selector - İsteğe Göre Araç Alt Kümesi Seçimi
+Her turda tüm araç şemalarını prompt'a koymak yerine, kullanıcı girdisiyle
+en ilgili top-k aracı seçer
+"""
+import re
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+
+def _normalize(text: str) -> str:
+    """Türkçe büyük/küçük harf dönüşümü (İ/I)"""
+    return text.replace("İ", "i").replace("I", "ı").lower()
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(_normalize(text))
+
+
+class ToolSelector:
+    """
+    Araçları kullanıcı girdisine göre sıralar.
+    Skor = anahtar kelime eşleşmesi + (varsa) embedding benzerliği.
+    Araç tarafındaki kelime kümeleri ve vektörler, registry sürümü başına
+    bir kez hesaplanır.
+    """
+
+    def __init__(
+        self,
+        registry,
+        embedder=None,
+        top_k: int = 4,
+        min_score: float = 0.25,
+        keyword_weight: float = 0.6
+    ):
+        """
+        Args:
+            registry: ToolRegistry örneği
+            embedder: memory.embeddings.TextEmbedder (opsiyonel)
+            top_k: En fazla kaç araç seçileceği
+            min_score: Bu skorun altındaki araçlar seçilmez
+            keyword_weight: Embedding varken anahtar kelime skorunun ağırlığı
+        """
+        self.registry = registry
+        self.embedder = embedder
+        self.top_k = top_k
+        self.min_score = min_score
+        self.keyword_weight = keyword_weight
+
+        self._version: Optional[int] = None
+        self._names: List[str] = []
+        self._keywords: Dict[str, List[str]] = {}
+        self._vectors = None
+
+        self.stats = {
+            "selections": 0,
+            "fallback_all": 0,
+            "tools_sent": 0,
+            "tools_total": 0
+        }
+
+    def _refresh(self):
+        """Registry değiştiyse araç tarafı özellikleri yeniden hesaplar"""
+        if self._version == self.registry.version:
+            return
+
+        self._names = self.registry.list_tools()
+        self._keywords = {}
+        descriptions = []
+
+        for name in self._names:
+            info = self.registry.get_tool_info(name) or {}
+            words = set(info.get("keywords", []))
+            words.update(_words(info.get("description", "")))
+            words.update(_words(name.replace("_", " ")))
+            for param in info.get("parameters", {}).get("properties", {}).values():
+                words.update(_words(param.get("description", "")))
+
+            # Çok kısa kelimeler ("ve", "ile") gürültü üretir
+            self._keywords[name] = sorted(w for w in words if len(w) >= 2)
+            descriptions.append(f"{name.replace('_', ' ')}: {info.get('description', '')}")
+
+        self._vectors = None
+        if self.embedder is not None and self.embedder.available:
+            self._vectors = self.embedder.encode(descriptions)
+
+        self._version = self.registry.version
+        logger.info(
+            f"🧰 Araç seçici hazır ({len(self._names)} araç, "
+            f"embedding: {'var' if self._vectors is not None else 'yok'})"
+        )
+
+    def _keyword_score(self, words: List[str], keywords: List[str]) -> float:
+        """
+        Kelime kökü eşleşmesi: "notlarımı" -> "not", "görevleri" -> "görev".
+        İki eşleşme tam puandır.
+        """
+        hits = 0
+        for keyword in keywords:
+            for word in words:
+                if word == keyword or (
+                    len(keyword) >= 3 and word.startswith(keyword)
+                ):
+                    hits += 1
+                    break
+        return min(1.0, hits / 2)
+
+    def score(self, user_input: str) -> Dict[str, float]:
+        """Tüm araçların ilgililik skorları"""
+        self._refresh()
+
+        words = _words(user_input)
+        scores = {
+            name: self._keyword_score(words, self._keywords[name])
+            for name in self._names
+        }
+
+        if self._vectors is not None:
+            query = self.embedder.encode([user_input])
+            if query is not None:
+                similarities = self._vectors @ query[0]
+                w = self.keyword_weight
+                for i, name in enumerate(self._names):
+                    scores[name] = w * scores[name] + (1 - w) * float(similarities[i])
+
+        return scores
+
+    def select(self, user_input: str) -> List[str]:
+        """
+        En ilgili araç isimleri (registry sırasıyla).
+        Sıra sabit tutulur ki aynı alt küme aynı prompt önekini üretsin.
+        Hiçbir araç eşiği geçmezse tüm araçlar döner (eski davranış).
+        """
+        scores = self.score(user_input)
+
+        ranked = sorted(
+            (name for name in self._names if scores[name] >= self.min_score),
+            key=lambda name: scores[name],
+            reverse=True
+        )[:self.top_k]
+
+        self.stats["selections"] += 1
+        self.stats["tools_total"] += len(self._names)
+
+        if not ranked:
+            self.stats["fallback_all"] += 1
+            self.stats["tools_sent"] += len(self._names)
+            return list(self._names)
+
+        chosen = set(ranked)
+        selected = [name for name in self._names if name in chosen]
+        self.stats["tools_sent"] += len(selected)
+
+        logger.info(f"🧰 Seçilen araçlar: {', '.join(selected)}")
+        return selected
+
+    def get_stats(self) -> Dict:
+        """Ortalama gönderilen araç oranı"""
+        total = self.stats["tools_total"]
+        return {
+            **self.stats,
+            "sent_ratio": round(self.stats["tools_sent"] / total, 3) if total else 0.0
+        }